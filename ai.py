@@ -0,0 +1,216 @@
+# Lookahead battle AI: expectimax over both sides' actions within a time budget
+#
+# Every battle gets a damage table, computed once: the expected damage of each
+# combatant's ability on each other combatant, from the exact distributions in
+# damage.py (accuracy, variance roll, truncation and type chart included). The
+# search never calls calculate_damage. It plays whole turns for every pair of joint
+# actions at once in NumPy, using expected damage and the engine's speed order and
+# retargeting. The AI maximizes over its own joint actions. The other side is a
+# chance node that picks uniformly, like random_ai.
+#
+# The search measures its own throughput as it goes and only starts work that it
+# predicts will finish before the deadline. A search depth that can't finish is
+# dropped rather than started: without time for depth 1, the AI plays the greedy
+# choice, and depth 2 is only used if it finished.
+from dataclasses import dataclass, field
+from itertools import product
+from typing import List, Optional
+import time
+import weakref
+
+import numpy as np
+
+from creature import Creature
+from damage import ability_damage
+from engine import Action, Battle
+
+DEFAULT_BUDGET_MS = 20.0
+FIRST_CHUNK_ROWS = 1 << 9  # joint-action pairs played first, to measure throughput
+CHUNK_ROWS = 1 << 12  # joint-action pairs played per NumPy pass between deadline checks
+ALIVE_BONUS = 0.5  # score per creature still standing, on top of its HP fraction
+
+
+@dataclass
+class DamageTable:
+    """Expected damage of every (attacker slot, ability, defender slot) in one battle."""
+    expected: np.ndarray  # (slots, abilities, slots)
+    max_hp: np.ndarray  # (slots,)
+    speed_order: List[int]  # slots in the order they act, as Battle.step sorts them
+
+
+def build_damage_table(battle: Battle) -> DamageTable:
+    combatants = battle.combatants
+    n = len(combatants)
+    n_abilities = max(len(c.abilities) for c in combatants)
+    expected = np.zeros((n, n_abilities, n))
+    for a, attacker in enumerate(combatants):
+        for k, ability in enumerate(attacker.abilities):
+            for d, defender in enumerate(combatants):
+                expected[a, k, d] = ability_damage(attacker, ability, defender).expected
+    speed_order = sorted(range(n), key=lambda slot: combatants[slot].spd, reverse=True)  # stable, like step()
+    return DamageTable(expected, np.array([c.max_hp for c in combatants], dtype=np.float64), speed_order)
+
+
+# Levels and species don't change during a battle, so each battle's table is built once
+g_damage_tables: "weakref.WeakKeyDictionary[Battle, DamageTable]" = weakref.WeakKeyDictionary()
+
+
+def get_damage_table(battle: Battle) -> DamageTable:
+    table = g_damage_tables.get(battle)
+    if table is None:
+        table = g_damage_tables[battle] = build_damage_table(battle)
+    return table
+
+
+class _Side:
+    """One side's slots and its joint actions: one (ability, target slot) option per creature."""
+
+    def __init__(self, battle: Battle, team: List[Creature], offset: int, opponent_offset: int,
+                 opponents: List[Creature]):
+        self.team = team
+        self.offset, self.opponent_offset = offset, opponent_offset
+        self.slots = list(range(offset, offset + len(team)))
+        self.opponent_slots = np.arange(opponent_offset, opponent_offset + len(opponents))
+        alive_targets = [opponent_offset + i for i, o in enumerate(opponents) if o.is_alive()]
+        per_creature = []
+        for creature in team:
+            if creature.is_alive() and alive_targets and creature.abilities:
+                per_creature.append([(k, t) for k in range(len(creature.abilities)) for t in alive_targets])
+            else:
+                per_creature.append([(-1, -1)])
+        joint = list(product(*per_creature))
+        self.abilities = np.array([[k for k, _ in j] for j in joint], dtype=np.int64)  # (J, team size)
+        self.targets = np.array([[t for _, t in j] for j in joint], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.abilities)
+
+    def actions(self, joint: int) -> List[Optional[Action]]:
+        return [None if k < 0 else Action(creature.abilities[k], t - self.opponent_offset)
+                for creature, k, t in zip(self.team, self.abilities[joint], self.targets[joint])]
+
+    def greedy(self, table: "DamageTable") -> int:
+        """The joint action where every creature deals its highest expected damage."""
+        expected = np.where(self.abilities >= 0,
+                            table.expected[self.slots, np.maximum(self.abilities, 0), np.maximum(self.targets, 0)], 0)
+        return int(np.argmax(expected.sum(axis=1)))
+
+
+def play_turns(table: DamageTable, hp: np.ndarray, abilities: np.ndarray, targets: np.ndarray,
+               opponent_slots: List[np.ndarray]) -> np.ndarray:
+    """Play one turn for every row at once with expected damage.
+
+    `hp` is (rows, slots); `abilities` and `targets` are (rows, slots), -1 for no
+    action. `opponent_slots[s]` are the slots slot s may retarget to.
+    """
+    hp = hp.copy()
+    rows = np.arange(len(hp))
+    for slot in table.speed_order:
+        ability, target = abilities[:, slot], targets[:, slot]
+        acting = (hp[:, slot] > 0) & (ability >= 0)
+        # A fainted target is swapped for the first alive opponent, as the engine retargets
+        opponents = opponent_slots[slot]
+        alive = hp[:, opponents] > 0
+        target_dead = hp[rows, np.maximum(target, 0)] <= 0
+        target = np.where(target_dead, opponents[np.argmax(alive, axis=1)], target)
+        acting &= alive.any(axis=1)
+        damage = table.expected[slot, np.maximum(ability, 0), target] * acting
+        hp[rows, target] = np.maximum(hp[rows, target] - damage, 0.0)
+    return hp
+
+
+def score(table: DamageTable, hp: np.ndarray, own: List[int], opponents: np.ndarray) -> np.ndarray:
+    """Position value for `own` slots: HP fraction plus a bonus per creature standing, minus the opponents'."""
+    frac = hp / table.max_hp
+    value = frac[:, own].sum(axis=1) + ALIVE_BONUS * (hp[:, own] > 0).sum(axis=1)
+    return value - frac[:, opponents].sum(axis=1) - ALIVE_BONUS * (hp[:, opponents] > 0).sum(axis=1)
+
+
+@dataclass
+class LookaheadAI:
+    """AIFunction that searches one or two turns ahead within `budget_ms` per decision.
+
+    The budget is kept by prediction, so timing noise can still push a decision a
+    little past it. A battle's first decision also builds its damage table.
+    """
+    budget_ms: float = DEFAULT_BUDGET_MS
+    max_depth: int = 2
+
+    # Stats of the last decision, for tuning and the benchmark suite
+    last_depth: int = field(default=0, init=False)
+    last_elapsed_ms: float = field(default=0.0, init=False)
+
+    def __call__(self, battle: Battle, team: List[Creature], opponents: List[Creature]) -> List[Optional[Action]]:
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000
+        table = get_damage_table(battle)
+        n_player = len(battle.player_team)
+        offset, opponent_offset = (0, n_player) if team is battle.player_team else (n_player, 0)
+        me = _Side(battle, team, offset, opponent_offset, opponents)
+        them = _Side(battle, opponents, opponent_offset, offset, team)
+        n_slots = len(battle.combatants)
+        retarget = [them.slots if slot in me.slots else me.slots for slot in range(n_slots)]
+        retarget = [np.array(s) for s in retarget]
+        own, opp = me.slots, np.array(them.slots)
+
+        def joint_rows(mine: np.ndarray, theirs: np.ndarray):
+            """Full (rows, slots) ability/target arrays for pairs of joint-action indices."""
+            abilities = np.full((len(mine), n_slots), -1, dtype=np.int64)
+            targets = np.full((len(mine), n_slots), -1, dtype=np.int64)
+            abilities[:, me.slots], targets[:, me.slots] = me.abilities[mine], me.targets[mine]
+            abilities[:, them.slots], targets[:, them.slots] = them.abilities[theirs], them.targets[theirs]
+            return abilities, targets
+
+        hp0 = np.array([[c.current_hp for c in battle.combatants]], dtype=np.float64)
+        n_me, n_them = len(me), len(them)
+        best, depth = me.greedy(table), 0
+        rate = None  # rows per second through play_turns, measured on the first chunk
+
+        def fits(rows: int) -> bool:
+            """Predicted to finish playing `rows` more rows before the deadline."""
+            return time.perf_counter() + (rows / rate if rate else 0.0) < deadline
+
+        # Depth 1: every (my joint action, their joint action) pair, a chunk of my actions at a time
+        hp1 = np.empty((n_me, n_them, n_slots))
+        values = np.empty(n_me)
+        lo = 0
+        while lo < n_me:
+            if not fits((n_me - lo) * n_them):
+                break  # depth 1 can't finish in time: stay with the greedy choice
+            per_chunk = (FIRST_CHUNK_ROWS if rate is None else CHUNK_ROWS) // n_them
+            hi = min(lo + max(1, per_chunk), n_me)
+            chunk_start = time.perf_counter()
+            mine, theirs = np.repeat(np.arange(lo, hi), n_them), np.tile(np.arange(n_them), hi - lo)
+            hp = play_turns(table, np.repeat(hp0, len(mine), axis=0), *joint_rows(mine, theirs), retarget)
+            hp1[lo:hi] = hp.reshape(hi - lo, n_them, n_slots)
+            values[lo:hi] = score(table, hp, own, opp).reshape(hi - lo, n_them).mean(axis=1)
+            rate = len(mine) / max(time.perf_counter() - chunk_start, 1e-9)
+            lo = hi
+        else:
+            best, depth = int(np.argmax(values)), 1
+
+        # Depth 2, one first-turn action of mine at a time, while the rest is predicted to fit
+        rows2 = n_them * n_me * n_them
+        if depth == 1 and self.max_depth >= 2 and rows2 <= CHUNK_ROWS:
+            mine2 = np.tile(np.repeat(np.arange(n_me), n_them), n_them)
+            theirs2 = np.tile(np.arange(n_them), n_me * n_them)
+            abilities2, targets2 = joint_rows(mine2, theirs2)
+            values2 = np.empty(n_me)
+            for m1 in range(n_me):
+                if not fits((n_me - m1) * rows2):
+                    break
+                chunk_start = time.perf_counter()
+                after_first = np.repeat(hp1[m1], n_me * n_them, axis=0)  # (their turn-1 reply, my, their) rows
+                hp2 = play_turns(table, after_first, abilities2, targets2, retarget)
+                v = score(table, hp2, own, opp).reshape(n_them, n_me, n_them).mean(axis=2)
+                values2[m1] = v.max(axis=1).mean()  # best follow-up against each reply, averaged over replies
+                rate = rows2 / max(time.perf_counter() - chunk_start, 1e-9)
+            else:
+                best, depth = int(np.argmax(values2)), 2
+
+        self.last_depth = depth
+        return self._finish(start, me.actions(best))
+
+    def _finish(self, start: float, actions: List[Optional[Action]]) -> List[Optional[Action]]:
+        self.last_elapsed_ms = (time.perf_counter() - start) * 1000
+        return actions
@@ -0,0 +1,453 @@
+# Multiplayer battle server (asyncio, TCP on localhost) and load-test client
+#
+#   python battle_server.py serve [--port 8765] [--turn-timeout 30]
+#   python battle_server.py loadtest --spawn [--players 2000] [--battles 5]
+#
+# Players who join with the same team size and level are paired into a double
+# battle, with the first as side 0 (Battle.player_team) and the second as side 1
+# (Battle.enemy_team). Each turn waits for both sides' actions, then resolves them
+# with Battle.step, as execute_turn does in the game, and pushes the result to both
+# players. A side that hasn't acted when the turn timeout expires gets random_ai's
+# actions. A JOIN from a player who is already waiting or in a battle is ignored.
+#
+# Messages are length-prefixed binary frames: a 3-byte header (payload length,
+# message type), then a struct-packed payload. Slots are battle slots: side 0's
+# creatures first, then side 1's. Targets in ACTIONS index the opposing team, as
+# Action.target does.
+#
+#   JOIN     client  level u8, team size u8, species id u16 per creature
+#   ACTIONS  client  turn u16, (ability index u8, target u8) per creature; 0xFF = no action
+#   STATS    client  (empty)
+#   MATCHED  server  battle id u32, side u8, team size u8, level u8, turn timeout ms u32,
+#                    species id u16 per slot, current HP u16 per slot
+#   TURN     server  turn u16, outcome u8, event count u8, then per attack
+#                    (attacker slot u8, defender slot u8, ability id u16, damage u16, flags u8),
+#                    then current HP u16 per slot
+#   STATS    server  JSON object (not on the hot path)
+from typing import Dict, List, Optional, Sequence, Tuple
+import argparse
+import asyncio
+import json
+import random
+import struct
+import subprocess
+import sys
+import time
+
+from creature import MAX_LEVEL, Creature, g_species_by_id, g_species_ids
+from engine import EVENT_ATTACK, SIDE_PLAYER, Action, Battle, random_ai
+from profiling import Histogram
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_TURN_TIMEOUT = 30.0  # seconds a side has to act
+MAX_TURNS = 200  # a battle still going after this many turns is a draw
+LISTEN_BACKLOG = 4096  # load tests open thousands of connections at once
+
+g_frame = struct.Struct("<HB")  # payload length, message type
+g_join = struct.Struct("<BB")  # level, team size
+g_actions = struct.Struct("<H")  # turn, followed by (ability, target) byte pairs
+g_matched = struct.Struct("<IBBBI")  # battle id, side, team size, level, turn timeout ms
+g_turn = struct.Struct("<HBB")  # turn, outcome, event count
+g_event = struct.Struct("<BBHHB")  # attacker slot, defender slot, ability id, damage, flags
+
+# Message types
+MSG_JOIN = 1
+MSG_ACTIONS = 2
+MSG_STATS = 3
+MSG_MATCHED = 16
+MSG_TURN = 17
+MSG_STATS_REPLY = 18
+
+NO_ACTION = 0xFF
+
+# TURN outcomes
+OUTCOME_ONGOING = 0
+OUTCOME_SIDE0_WINS = 1
+OUTCOME_SIDE1_WINS = 2
+OUTCOME_OPPONENT_LEFT = 3  # the receiving player wins by forfeit
+OUTCOME_DRAW = 4  # MAX_TURNS reached
+
+FLAG_HIT = 1
+FLAG_FAINTED = 2
+
+
+def frame(kind: int, payload: bytes = b"") -> bytes:
+    return g_frame.pack(len(payload), kind) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    length, kind = g_frame.unpack(await reader.readexactly(g_frame.size))
+    return kind, await reader.readexactly(length)
+
+
+def _pack_u16s(values: Sequence[int]) -> bytes:
+    return struct.pack(f"<{len(values)}H", *values)
+
+
+def _unpack_u16s(payload: bytes, offset: int, count: int) -> Tuple[int, ...]:
+    return struct.unpack_from(f"<{count}H", payload, offset)
+
+
+# Server
+
+class Player:
+    """One connection; in at most one battle at a time."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.room: Optional["BattleRoom"] = None
+        self.waiting_for: Optional[Tuple[int, int]] = None  # BattleServer.waiting key while queued
+        self.side = 0
+        self.team: List[int] = []  # species ids it joined with
+
+    def send(self, kind: int, payload: bytes = b""):
+        if not self.writer.is_closing():
+            self.writer.write(frame(kind, payload))
+
+
+class BattleRoom:
+    """A double battle between two connected players, resolved a turn at a time."""
+
+    def __init__(self, server: "BattleServer", battle_id: int, players: List[Player], teams: List[List[int]],
+                 level: int):
+        self.server = server
+        self.battle_id = battle_id
+        self.players = players
+        self.battle = Battle(*[[Creature(g_species_by_id[s], level=level) for s in team] for team in teams])
+        self.pending: List[Optional[list]] = [None, None]
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.closed = False
+        for side, player in enumerate(players):
+            player.room, player.side = self, side
+
+    def start(self):
+        battle = self.battle
+        combatants = battle.combatants
+        species = _pack_u16s([g_species_ids[c.species] for c in combatants])
+        hp = _pack_u16s([c.current_hp for c in combatants])
+        for player in self.players:
+            header = g_matched.pack(self.battle_id, player.side, len(battle.player_team), combatants[0].level,
+                                    int(self.server.turn_timeout * 1000))
+            player.send(MSG_MATCHED, header + species + hp)
+        self._arm_timer()
+
+    def _arm_timer(self):
+        self.timer = asyncio.get_running_loop().call_later(self.server.turn_timeout, self._on_timeout)
+
+    def _on_timeout(self):
+        self.server.timeouts += 1
+        self.resolve()
+
+    def submit(self, side: int, turn: int, choices: List[Tuple[int, int]]):
+        if self.closed or turn != self.battle.turn or self.pending[side] is not None:
+            return  # late or duplicate actions for a turn that is already resolved or queued
+        self.pending[side] = self._decode_actions(side, choices)
+        if all(actions is not None for actions in self.pending):
+            self.resolve()
+
+    def _decode_actions(self, side: int, choices: List[Tuple[int, int]]) -> list:
+        team, opponents = self._teams(side)
+        actions = []
+        for creature, (ability, target) in zip(team, choices):
+            if ability < len(creature.abilities) and target < len(opponents):
+                actions.append(Action(creature.abilities[ability], target))
+            else:
+                actions.append(None)
+        return actions
+
+    def _teams(self, side: int):
+        battle = self.battle
+        return (battle.player_team, battle.enemy_team) if side == 0 else (battle.enemy_team, battle.player_team)
+
+    def resolve(self):
+        """Play the turn with the queued actions (random_ai's for a side that didn't act) and push the result."""
+        if self.timer is not None:
+            self.timer.cancel()
+        battle = self.battle
+        for side in (0, 1):
+            if self.pending[side] is None:
+                self.pending[side] = random_ai(battle, *self._teams(side))
+
+        start = time.perf_counter()
+        turn = battle.turn
+        events = [e for e in battle.step(self.pending[0], self.pending[1]) if e["type"] == EVENT_ATTACK]
+        self.pending = [None, None]
+        if battle.is_over:
+            outcome = OUTCOME_SIDE0_WINS if battle.winner == SIDE_PLAYER else OUTCOME_SIDE1_WINS
+        elif battle.turn > MAX_TURNS:
+            outcome = OUTCOME_DRAW
+        else:
+            outcome = OUTCOME_ONGOING
+
+        payload = b"".join([
+            g_turn.pack(turn, outcome, len(events)),
+            *(g_event.pack(e["attacker_slot"], e["defender_slot"], e["ability_id"] & 0xFFFF, e["damage"],
+                           FLAG_HIT * e["hit"] | FLAG_FAINTED * e["defender_fainted"]) for e in events),
+            _pack_u16s([c.current_hp for c in battle.combatants]),
+        ])
+        for player in self.players:
+            player.send(MSG_TURN, payload)
+        self.server.turns += 1
+        self.server.turn_times.add(time.perf_counter() - start)
+
+        if outcome == OUTCOME_ONGOING:
+            self._arm_timer()
+        else:
+            self.close()
+
+    def leave(self, player: Player):
+        """`player` disconnected: the other side wins by forfeit."""
+        if self.closed:
+            return
+        for other in self.players:
+            if other is not player:
+                other.send(MSG_TURN, g_turn.pack(self.battle.turn, OUTCOME_OPPONENT_LEFT, 0)
+                           + _pack_u16s([c.current_hp for c in self.battle.combatants]))
+        self.close()
+
+    def close(self):
+        self.closed = True
+        if self.timer is not None:
+            self.timer.cancel()
+        for player in self.players:
+            player.room = None
+        self.server.rooms.pop(self.battle_id, None)
+        self.server.battles_finished += 1
+
+
+class BattleServer:
+    """Accepts players, pairs them into battles and relays each battle's turns."""
+
+    def __init__(self, turn_timeout: float = DEFAULT_TURN_TIMEOUT):
+        self.turn_timeout = turn_timeout
+        self.waiting: Dict[Tuple[int, int], Player] = {}  # (team size, level) -> player waiting for an opponent
+        self.rooms: Dict[int, BattleRoom] = {}
+        self.next_battle_id = 1
+        self.players = 0
+        self.battles_started = 0
+        self.battles_finished = 0
+        self.turns = 0
+        self.timeouts = 0
+        self.turn_times = Histogram()  # server time to resolve and encode a turn
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        player = Player(writer)
+        self.players += 1
+        try:
+            while True:
+                kind, payload = await read_frame(reader)
+                if kind == MSG_JOIN:
+                    self.join(player, payload)
+                elif kind == MSG_ACTIONS and player.room is not None:
+                    (turn,) = g_actions.unpack_from(payload)
+                    body = payload[g_actions.size:]
+                    player.room.submit(player.side, turn, list(zip(body[0::2], body[1::2])))
+                elif kind == MSG_STATS:
+                    player.send(MSG_STATS_REPLY, json.dumps(self.stats()).encode())
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error):
+            pass  # disconnected, or sent a malformed frame
+        finally:
+            self.players -= 1
+            if player.room is not None:
+                player.room.leave(player)
+            if player.waiting_for is not None:
+                del self.waiting[player.waiting_for]
+            writer.close()
+
+    def join(self, player: Player, payload: bytes):
+        if player.room is not None or player.waiting_for is not None:
+            return
+        level, team_size = g_join.unpack_from(payload)
+        team = list(_unpack_u16s(payload, g_join.size, team_size))
+        if not 1 <= level <= MAX_LEVEL or not team or any(s >= len(g_species_by_id) for s in team):
+            return
+        player.team = team
+        key = (team_size, level)
+        opponent = self.waiting.pop(key, None)
+        if opponent is not None:
+            opponent.waiting_for = None
+        if opponent is None or opponent is player or opponent.writer.is_closing():
+            self.waiting[key], player.waiting_for = player, key
+            return
+        room = BattleRoom(self, self.next_battle_id, [opponent, player], [opponent.team, team], level)
+        self.rooms[room.battle_id] = room
+        self.next_battle_id += 1
+        self.battles_started += 1
+        room.start()
+
+    def stats(self) -> dict:
+        return {
+            "cpu_seconds": time.process_time(),
+            "players": self.players,
+            "open_battles": len(self.rooms),
+            "battles_started": self.battles_started,
+            "battles_finished": self.battles_finished,
+            "turns": self.turns,
+            "timeouts": self.timeouts,
+            "turn_resolve_p50_ms": self.turn_times.percentile(0.5) * 1e3,
+            "turn_resolve_p99_ms": self.turn_times.percentile(0.99) * 1e3,
+        }
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, turn_timeout: float = DEFAULT_TURN_TIMEOUT):
+    server = BattleServer(turn_timeout)
+    listener = await asyncio.start_server(server.handle_client, host, port, backlog=LISTEN_BACKLOG)
+    print(f"Battle server listening on {host}:{port}", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+# Load test
+
+class LoadStats:
+    def __init__(self):
+        self.battles = 0  # battles finished, counted once per player
+        self.turns = 0
+        self.errors = 0
+        self.turn_latency = Histogram()  # from sending a turn's actions to receiving its result
+
+
+async def simulated_player(host: str, port: int, battles: int, team_size: int, level: int, think: float,
+                           stats: LoadStats, rng: random.Random):
+    """Join `battles` battles in a row, acting randomly (after `think` seconds, on average) every turn."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(battles):
+            team = rng.sample(range(len(g_species_by_id)), team_size)
+            writer.write(frame(MSG_JOIN, g_join.pack(level, team_size) + _pack_u16s(team)))
+            kind, payload = await read_frame(reader)
+            if kind != MSG_MATCHED:
+                raise ValueError(f"Expected MATCHED, got message type {kind}")
+            _, side, size, _, _ = g_matched.unpack_from(payload)
+            species = _unpack_u16s(payload, g_matched.size, 2 * size)
+            hp = list(_unpack_u16s(payload, g_matched.size + 4 * size, 2 * size))
+            own = range(side * size, side * size + size)
+            opposing = range((1 - side) * size, (1 - side) * size + size)
+            turn = 1
+            while True:
+                if think:
+                    await asyncio.sleep(rng.uniform(0, 2 * think))
+                alive_targets = [i for i, slot in enumerate(opposing) if hp[slot] > 0]
+                choices = []
+                for slot in own:
+                    if hp[slot] > 0 and alive_targets:
+                        choices += [rng.randrange(len(g_species_by_id[species[slot]].abilities)),
+                                    rng.choice(alive_targets)]
+                    else:
+                        choices += [NO_ACTION, NO_ACTION]
+                writer.write(frame(MSG_ACTIONS, g_actions.pack(turn) + bytes(choices)))
+                sent = time.perf_counter()
+                kind, payload = await read_frame(reader)
+                stats.turn_latency.add(time.perf_counter() - sent)
+                stats.turns += 1
+                turn, outcome, n_events = g_turn.unpack_from(payload)
+                hp = list(_unpack_u16s(payload, g_turn.size + n_events * g_event.size, 2 * size))
+                turn += 1
+                if outcome != OUTCOME_ONGOING:
+                    stats.battles += 1
+                    break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        stats.errors += 1
+    finally:
+        writer.close()
+
+
+async def request_stats(host: str, port: int) -> dict:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(frame(MSG_STATS))
+    _, payload = await read_frame(reader)
+    writer.close()
+    return json.loads(payload)
+
+
+async def load_test(host: str, port: int, players: int, battles: int, team_size: int = 2, level: int = 5,
+                    think: float = 0.0, seed: Optional[int] = None) -> dict:
+    """Run `players` simulated players against a server; returns throughput and latency figures."""
+    rng = random.Random(seed)
+    stats = LoadStats()
+    before = await request_stats(host, port)
+    start = time.perf_counter()
+    await asyncio.gather(*(simulated_player(host, port, battles, team_size, level, think, stats,
+                                            random.Random(rng.getrandbits(64))) for _ in range(players)))
+    elapsed = time.perf_counter() - start
+    after = await request_stats(host, port)
+
+    server_cpu = after["cpu_seconds"] - before["cpu_seconds"]
+    server_battles = after["battles_finished"] - before["battles_finished"]
+    return {
+        "players": players,
+        "seconds": elapsed,
+        "battles": server_battles,
+        "turns": after["turns"] - before["turns"],
+        "errors": stats.errors,
+        "timeouts": after["timeouts"] - before["timeouts"],
+        "server_cpu_seconds": server_cpu,
+        "battles_per_second": server_battles / elapsed,
+        "battles_per_core_second": server_battles / server_cpu if server_cpu else 0.0,
+        "turn_latency_p50_ms": stats.turn_latency.percentile(0.5) * 1e3,
+        "turn_latency_p99_ms": stats.turn_latency.percentile(0.99) * 1e3,
+        "turn_latency_max_ms": stats.turn_latency.max * 1e3,
+        "server_turn_resolve_p99_ms": after["turn_resolve_p99_ms"],
+    }
+
+
+async def wait_for_server(host: str, port: int, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multiplayer battle server and load-test client.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_parser = sub.add_parser("serve")
+    load_parser = sub.add_parser("loadtest")
+    for p in (serve_parser, load_parser):
+        p.add_argument("--host", default=DEFAULT_HOST)
+        p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--turn-timeout", type=float, default=DEFAULT_TURN_TIMEOUT, help="seconds")
+    load_parser.add_argument("--spawn", action="store_true", help="start a server in a child process for the test")
+    load_parser.add_argument("--players", type=int, default=2000)
+    load_parser.add_argument("--battles", type=int, default=5, help="battles per player")
+    load_parser.add_argument("--team-size", type=int, default=2)
+    load_parser.add_argument("--level", type=int, default=5)
+    load_parser.add_argument("--think-ms", type=float, default=0.0, help="mean delay before each turn's actions")
+    load_parser.add_argument("--seed", type=int, default=None)
+    load_parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(serve(args.host, args.port, args.turn_timeout))
+        return
+    if args.players * args.battles % 2:
+        parser.error("players x battles must be even, or the last player to join never gets an opponent")
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, __file__, "serve", "--host", args.host, "--port", str(args.port)],
+                                  stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_for_server(args.host, args.port))
+        results = asyncio.run(load_test(args.host, args.port, args.players, args.battles, args.team_size,
+                                        args.level, args.think_ms / 1000, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    for name, value in results.items():
+        print(f"{name:<28} {value:>12.2f}" if isinstance(value, float) else f"{name:<28} {value:>12}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
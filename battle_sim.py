@@ -0,0 +1,196 @@
+# Vectorized battle simulation for balance sweeps
+from dataclasses import dataclass
+from typing import Optional, Sequence
+import argparse
+import random
+
+import numpy as np
+
+from creature import g_species, create_creature, get_type_multipliers
+from engine import SIDE_ENEMY, SIDE_PLAYER, Battle
+
+
+@dataclass
+class BatchResult:
+    winner: np.ndarray  # (N,) 1 = player side won, -1 = enemy side won, 0 = unfinished
+    turns: np.ndarray  # (N,) turns played
+    hp: np.ndarray  # (N, C) final HP of every combatant
+
+    @property
+    def player_win_rate(self) -> float:
+        return float(np.mean(self.winner == 1))
+
+
+class BattleBatch:
+    """N parallel double (or single) battles held column-wise in NumPy arrays.
+
+    Combatant slots are ordered player team first, then enemy team, matching the
+    action order `main.execute_turn` builds before its stable speed sort. Both
+    sides use the random enemy AI: a random ability on a random alive opponent.
+    """
+
+    def __init__(self, player_team: Sequence[str], enemy_team: Sequence[str], n_battles: int,
+                 level: int = 5, rng: Optional[np.random.Generator] = None):
+        creatures = [create_creature(name, level) for name in list(player_team) + list(enemy_team)]
+        if any(c is None for c in creatures):
+            raise ValueError(f"Unknown species in teams: {list(player_team) + list(enemy_team)}")
+
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.n_battles = n_battles
+        self.team_size = len(player_team)
+        n_slots = len(creatures)
+
+        def per_battle(values, dtype):
+            return np.tile(np.asarray(values, dtype=dtype), (n_battles, 1))
+
+        # Per-combatant stats, (N, C)
+        self.max_hp = per_battle([c.max_hp for c in creatures], np.int64)
+        self.hp = self.max_hp.copy()
+        self.atk = per_battle([c.atk for c in creatures], np.int64)
+        self.defense = per_battle([c.defense for c in creatures], np.int64)
+        self.spd = per_battle([c.spd for c in creatures], np.int64)
+        self.level = per_battle([c.level for c in creatures], np.int64)
+        self.element = per_battle([c.element_id for c in creatures], np.int64)
+        self.side = np.array([0] * len(player_team) + [1] * len(enemy_team), dtype=np.int64)
+
+        # Abilities padded to the largest move set, (N, C, A)
+        n_abilities = max(len(c.abilities) for c in creatures)
+        power = np.zeros((n_slots, n_abilities), dtype=np.int64)
+        accuracy = np.zeros((n_slots, n_abilities), dtype=np.int64)
+        ability_element = np.zeros((n_slots, n_abilities), dtype=np.int64)
+        for slot, c in enumerate(creatures):
+            for i, ability in enumerate(c.abilities):
+                power[slot, i] = ability.power
+                accuracy[slot, i] = ability.accuracy
+                ability_element[slot, i] = ability.element_id
+        self.ability_power = np.broadcast_to(power, (n_battles,) + power.shape)
+        self.ability_accuracy = np.broadcast_to(accuracy, (n_battles,) + accuracy.shape)
+        self.ability_element = np.broadcast_to(ability_element, (n_battles,) + ability_element.shape)
+        self.ability_count = per_battle([len(c.abilities) for c in creatures], np.int64)
+
+        self.turn = np.ones(n_battles, dtype=np.int64)
+        self.winner = np.zeros(n_battles, dtype=np.int64)
+
+    @property
+    def active(self) -> np.ndarray:
+        return self.winner == 0
+
+    def _random_alive(self, rows: np.ndarray, side: np.ndarray) -> np.ndarray:
+        """Pick a uniformly random alive slot on `side` for each row (-1 if none)."""
+        candidates = (self.hp[rows] > 0) & (self.side[None, :] == side[:, None])
+        counts = candidates.sum(axis=1)
+        pick = (self.rng.random(len(rows)) * counts).astype(np.int64)
+        # Index of the pick-th True in each row
+        ranks = np.cumsum(candidates, axis=1) - 1
+        chosen = np.argmax(candidates & (ranks == pick[:, None]), axis=1)
+        return np.where(counts > 0, chosen, -1)
+
+    def step(self):
+        """Resolve one turn for every battle still in progress."""
+        rows = np.flatnonzero(self.active)
+        if len(rows) == 0:
+            return
+        n_slots = self.hp.shape[1]
+        alive_at_start = self.hp[rows] > 0
+
+        # Action selection: random ability and random alive opposing target
+        ability = (self.rng.random((len(rows), n_slots)) * self.ability_count[rows]).astype(np.int64)
+        targets = np.empty((len(rows), n_slots), dtype=np.int64)
+        for slot in range(n_slots):
+            targets[:, slot] = self._random_alive(rows, np.full(len(rows), 1 - self.side[slot]))
+
+        # Faster goes first; stable so ties keep player-then-enemy order
+        order = np.argsort(-self.spd[rows], axis=1, kind="stable")
+
+        for k in range(n_slots):
+            attacker = order[:, k]
+            acting = alive_at_start[np.arange(len(rows)), attacker] & (self.hp[rows, attacker] > 0)
+            target = targets[np.arange(len(rows)), attacker]
+            acting &= target >= 0
+
+            # Retarget to another alive opponent if the chosen target fainted
+            target_dead = acting & (self.hp[rows, np.maximum(target, 0)] <= 0)
+            if target_dead.any():
+                retarget = self._random_alive(rows[target_dead], 1 - self.side[attacker[target_dead]])
+                target[target_dead] = retarget
+                acting &= target >= 0
+
+            idx = np.flatnonzero(acting)
+            if len(idx) == 0:
+                continue
+            r, a, t = rows[idx], attacker[idx], target[idx]
+            move = ability[idx, a]
+            power = self.ability_power[r, a, move]
+
+            # Accuracy check
+            hit = self.rng.integers(1, 101, size=len(idx)) <= self.ability_accuracy[r, a, move]
+
+            # Same formula as Creature.calculate_damage
+            level_factor = 1 + self.level[r, a] * 0.1
+            stat_ratio = (self.atk[r, a] + 50) / (self.defense[r, t] + 50)
+            base_damage = power * stat_ratio * level_factor * 0.5
+            type_mult = get_type_multipliers(self.ability_element[r, a, move], self.element[r, t])
+            variance = self.rng.uniform(0.90, 1.0, size=len(idx))
+            damage = np.where(power == 0, 0, np.maximum(1, (base_damage * type_mult * variance).astype(np.int64)))
+
+            # Creature.take_damage: minimum 1 damage on a hit
+            r, t = r[hit], t[hit]
+            self.hp[r, t] = np.maximum(0, self.hp[r, t] - np.maximum(1, damage[hit]))
+
+        # Check win/lose conditions
+        hp = self.hp[rows]
+        player_alive = (hp[:, self.side == 0] > 0).any(axis=1)
+        enemy_alive = (hp[:, self.side == 1] > 0).any(axis=1)
+        self.winner[rows] = np.where(~enemy_alive, 1, np.where(~player_alive, -1, 0))
+        self.turn[rows[self.winner[rows] == 0]] += 1
+
+    def run(self, max_turns: int = 200) -> BatchResult:
+        for _ in range(max_turns):
+            if not self.active.any():
+                break
+            self.step()
+        return BatchResult(winner=self.winner.copy(), turns=np.minimum(self.turn, max_turns), hp=self.hp.copy())
+
+
+def simulate_battles(player_team: Sequence[str], enemy_team: Sequence[str], n_battles: int,
+                     level: int = 5, max_turns: int = 200, seed: Optional[int] = None) -> BatchResult:
+    """Run `n_battles` independent battles between the two teams."""
+    batch = BattleBatch(player_team, enemy_team, n_battles, level=level, rng=np.random.default_rng(seed))
+    return batch.run(max_turns)
+
+
+def simulate_battles_scalar(player_team: Sequence[str], enemy_team: Sequence[str], n_battles: int,
+                            level: int = 5, max_turns: int = 200, seed: Optional[int] = None) -> BatchResult:
+    """Reference path: the same battles played one hit at a time through the scalar engine."""
+    rng = random.Random(seed)
+    winners, turns, hps = [], [], []
+    for _ in range(n_battles):
+        players = [create_creature(name, level) for name in player_team]
+        enemies = [create_creature(name, level) for name in enemy_team]
+        battle = Battle(players, enemies, rng=rng)
+        winner = battle.run(max_turns=max_turns)
+        winners.append({SIDE_PLAYER: 1, SIDE_ENEMY: -1}.get(winner, 0))
+        turns.append(min(battle.turn, max_turns))
+        hps.append([c.current_hp for c in players + enemies])
+    return BatchResult(winner=np.array(winners), turns=np.array(turns), hp=np.array(hps))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare vectorized and scalar battle simulation.")
+    parser.add_argument("--player", nargs="+", default=["emberling", "bubblefin"], choices=list(g_species))
+    parser.add_argument("--enemy", nargs="+", default=["pebblehog", "sparkrat"], choices=list(g_species))
+    parser.add_argument("--battles", type=int, default=10000)
+    parser.add_argument("--level", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    for label, simulate in (("vectorized", simulate_battles), ("scalar", simulate_battles_scalar)):
+        result = simulate(args.player, args.enemy, args.battles, level=args.level, seed=args.seed)
+        # Binomial standard error, so the two paths can be compared at a glance
+        p = result.player_win_rate
+        stderr = (p * (1 - p) / args.battles) ** 0.5
+        print(f"{label:>10}: player win rate {p:.4f} ± {stderr:.4f}, mean turns {result.turns.mean():.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# World map rendering: viewport renderer vs. drawing the whole generated map
+#
+# Run from the repository root: python benchmarks/bench_world_render.py
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from world import CHUNK_SIZE, get_chunk, get_region, render_viewport  # noqa: E402
+
+SEED = 1234
+VIEW_RADIUS = 5
+g_terrain_symbols = {0: "🟩", 1: "🟦", 2: "🌲"}
+
+
+def render_full_grid(grid, px: int, py: int) -> str:
+    """The old show_world renderer: a nested loop over every cell of the map."""
+    grid_display = []
+    for y in range(grid.shape[0]):
+        row = []
+        for x in range(grid.shape[1]):
+            if x == px and y == py:
+                row.append("🧍")
+            else:
+                row.append(g_terrain_symbols[grid[y, x]])
+        grid_display.append(" ".join(row))
+    return "\n".join(grid_display)
+
+
+def best_time(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number
+
+
+def main():
+    print(f"{'world size':>12} {'chunks':>7} {'viewport (us)':>14} {'full grid (us)':>15}")
+    for chunks_per_side in (1, 4, 16, 32, 64):
+        size = chunks_per_side * CHUNK_SIZE
+        # Generate (and cache) the whole explored area first
+        for cy in range(chunks_per_side):
+            for cx in range(chunks_per_side):
+                get_chunk(SEED, cx, cy)
+        center = size // 2
+        grid = get_region(SEED, 0, 0, size, size)
+
+        # Step back and forth so each render is a fresh one-tile move
+        moves = iter(range(10 ** 9))
+        viewport = best_time(lambda: render_viewport(SEED, center + next(moves) % 2, center, VIEW_RADIUS), 2000)
+        full = best_time(lambda: render_full_grid(grid, center, center), 1 if size >= 512 else 20)
+        print(f"{size:>5}x{size:<6} {chunks_per_side ** 2:>7} {viewport * 1e6:>14.1f} {full * 1e6:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
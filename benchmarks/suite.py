@@ -0,0 +1,325 @@
+# Benchmark suite for the core hot paths, with saved baselines and regression thresholds
+#
+# Run from the repository root:
+#   python benchmarks/suite.py                       # run everything, compare with the baseline
+#   python benchmarks/suite.py -k battle             # only cases whose name contains "battle"
+#   python benchmarks/suite.py --update-baseline     # accept the current timings as the new baseline
+#
+# Results are written as JSON (--output). The exit status is 1 if any case is slower
+# than its baseline by more than its threshold. Everything runs headless: the
+# Streamlit screens are benchmarked through the functions they call each rerun.
+#
+# Timings on a shared machine drift by 2x between runs, so a single best-of-N is not
+# compared directly. The selected cases are timed in several interleaved passes,
+# each pass also timing a fixed pure-Python reference workload, and each case's
+# time is the median over passes of its best run relative to that pass's
+# reference. A slow stretch then moves the reference along with the cases, and one
+# noisy pass can't decide the result. Baselines are recorded with three times as
+# many passes, since every later run is compared against them.
+from typing import Callable, Dict, Optional
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np  # noqa: E402
+
+from collection import CreatureCollection, g_stats_by_level  # noqa: E402
+from creature import (TYPE_FIRE, TYPE_NATURE, create_creature, get_creature_templates,  # noqa: E402
+                      get_type_multiplier)
+from ai import LookaheadAI  # noqa: E402
+from damage import damage_distribution, damage_outlook  # noqa: E402
+from engine import Battle, random_ai  # noqa: E402
+from world import get_chunk, render_viewport  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25  # allowed slowdown over the baseline, as a fraction
+MIN_SLACK_US = 0.25  # a regression must also be this much slower in absolute terms (sub-microsecond cases)
+PASSES = 9  # interleaved passes over the selected cases
+BASELINE_PASSES = 3 * PASSES  # a baseline is compared against many runs, so it gets more passes
+REPEATS = 3  # timed runs of a case per pass; the best is kept
+RUN_SECONDS = 0.03  # minimum length of one timed run
+CONFIRM_RUNS = 2  # re-times (PASSES more passes each) of a case that looks like a regression
+SEED = 1234
+
+# name -> (setup returning the callable to time, allowed slowdown)
+g_cases: Dict[str, tuple] = {}
+
+
+def case(name: str, threshold: float = DEFAULT_THRESHOLD):
+    def register(setup: Callable[[], Callable[[], object]]):
+        g_cases[name] = (setup, threshold)
+        return setup
+    return register
+
+
+@case("calculate_damage", threshold=0.4)
+def bench_calculate_damage():
+    attacker, defender = create_creature("emberling", 20), create_creature("sproutling", 20)
+    ability, rng = attacker.abilities[0], random.Random(SEED)
+    return lambda: attacker.calculate_damage(ability, defender, rng)
+
+
+@case("use_ability")
+def bench_use_ability():
+    attacker, defender = create_creature("emberling", 20), create_creature("glacialbear", 50)
+    ability, rng = attacker.abilities[0], random.Random(SEED)
+
+    def use():
+        defender.current_hp = defender.max_hp
+        attacker.use_ability(ability, defender, rng)
+    return use
+
+
+@case("gain_experience_large", threshold=0.5)
+def bench_gain_experience():
+    creature = create_creature("emberling", 1)
+
+    def gain():
+        creature.level, creature.experience = 1, 0
+        creature.gain_experience(400_000)  # most of the way to the level cap
+    return gain
+
+
+@case("create_creature")
+def bench_create_creature():
+    return lambda: create_creature("thunderwolf", 30)
+
+
+@case("get_creature_templates")
+def bench_get_creature_templates():
+    return get_creature_templates
+
+
+@case("get_type_multiplier", threshold=0.5)
+def bench_get_type_multiplier():
+    return lambda: get_type_multiplier(TYPE_FIRE, TYPE_NATURE)
+
+
+@case("execute_turn", threshold=0.4)
+def bench_execute_turn():
+    """One turn of a double battle, as main.execute_turn plays it (minus the session bookkeeping)."""
+    rng = random.Random(SEED)
+    state = {"battle": Battle.random_battle(rng=rng)}
+
+    def turn():
+        battle = state["battle"]
+        if battle.is_over:
+            battle = state["battle"] = Battle.random_battle(rng=rng)
+        battle.step(random_ai(battle, battle.player_team, battle.enemy_team))
+    return turn
+
+
+@case("damage_distribution")
+def bench_damage_distribution():
+    """Building one distribution from scratch (the memoized lookup is damage_outlook_hint)."""
+    return lambda: damage_distribution.__wrapped__(90, 90, 120, 30, 80, 2.0)
+
+
+@case("damage_outlook_hint", threshold=0.5)
+def bench_damage_outlook_hint():
+    """The hint show_action_panel computes for each target button on a rerun."""
+    attacker, defender = create_creature("thunderwolf", 30), create_creature("thunderwolf", 5)
+    ability = attacker.abilities[0]
+    return lambda: damage_outlook(attacker, ability, defender)
+
+
+@case("lookahead_decision")
+def bench_lookahead_decision():
+    """One enemy decision of the lookahead AI, depth 1 only (depth 2 runs until its time budget)."""
+    battle = Battle.random_battle(seed=SEED)
+    ai = LookaheadAI(max_depth=1)
+    return lambda: ai(battle, battle.enemy_team, battle.player_team)
+
+
+@case("snapshot_restore")
+def bench_battle_snapshot_restore():
+    battle = Battle.random_battle(seed=SEED)
+    return lambda: battle.restore(battle.snapshot())
+
+
+@case("snapshot_restore_no_rng")
+def bench_battle_snapshot_restore_no_rng():
+    """Branching with its own RNG, as Battle.preview does: O(team size)."""
+    battle = Battle.random_battle(seed=SEED)
+    return lambda: battle.restore(battle.snapshot(include_rng=False))
+
+
+@case("battle_deepcopy")
+def bench_battle_deepcopy():
+    """What branching a battle cost before snapshots: copying the session's battle dict."""
+    state = {"engine": Battle.random_battle(seed=SEED), "phase": "select_action", "player_actions": [None, None]}
+    return lambda: copy.deepcopy(state)
+
+
+@case("battle_to_completion", threshold=0.4)
+def bench_battle_to_completion():
+    seeds = iter(range(10 ** 9))
+    return lambda: Battle.random_battle(team_size=2, level=5, seed=next(seeds)).run()
+
+
+@case("collection_query")
+def bench_collection_query():
+    """A filtered, sorted collection-screen query over 10k owned creatures."""
+    rng = np.random.default_rng(SEED)
+    n = 10000
+    creatures = CreatureCollection.from_columns(rng.integers(0, len(g_stats_by_level), n), rng.integers(1, 60, n), np.zeros(n),
+                                                np.ones(n))
+    creatures.index()
+    return lambda: creatures.index().query("fire", 10, 40, "spd", True)
+
+
+@case("show_world_render")
+def bench_show_world_render():
+    """The map show_world draws on every rerun, one tile further each time."""
+    radius = 5
+    for cy in range(-2, 3):
+        for cx in range(-2, 3):
+            get_chunk(SEED, cx, cy)
+    moves = iter(range(10 ** 9))
+    return lambda: render_viewport(SEED, next(moves) % 2, 0, radius)
+
+
+def reference_workload():
+    """Fixed pure-Python work that every pass also times, to factor out machine speed."""
+    total = 0
+    for i in range(2000):
+        total += i * i % 7
+    return total
+
+
+def calibrated_timer(fn: Callable[[], object]) -> timeit.Timer:
+    """A Timer for `fn` with `number` set so one run takes at least RUN_SECONDS."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < RUN_SECONDS:
+        number *= 2
+    timer.number = number
+    return timer
+
+
+def best_run(timer: timeit.Timer, repeats: int) -> float:
+    """Best of `repeats` runs, in seconds per call."""
+    return min(timer.repeat(repeat=repeats, number=timer.number)) / timer.number
+
+
+def time_cases(timers: Dict[str, timeit.Timer], passes: int = PASSES, repeats: int = REPEATS) -> dict:
+    """Time every case in `passes` interleaved passes; microseconds relative to the reference, per case."""
+    reference = calibrated_timer(reference_workload)
+    references, relative = [], {name: [] for name in timers}
+    for _ in range(passes):
+        ref = best_run(reference, repeats)
+        references.append(ref)
+        for name, timer in timers.items():
+            relative[name].append(best_run(timer, repeats) / ref)
+    reference_us = float(np.median(references)) * 1e6
+    results = {}
+    for name, ratios in relative.items():
+        ratios = np.array(ratios)
+        results[name] = {
+            "relative": float(np.median(ratios)),  # case time / reference time, median over passes
+            "time_us": float(np.median(ratios)) * reference_us,
+            "spread": float(ratios.max() / ratios.min()),  # max/min over passes, a noise gauge
+            "calls": timers[name].number, "passes": passes, "repeats": repeats,
+        }
+    return {"reference_us": reference_us, "cases": results}
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def load_baseline(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results: dict, baseline: Optional[dict]) -> dict:
+    """Add each case's ratio to its baseline and flag regressions beyond the case threshold."""
+    for name, result in results.items():
+        base = (baseline or {}).get("cases", {}).get(name)
+        if base is None or "relative" not in base:
+            result["status"] = "new"
+            continue
+        result["baseline_us"] = base["time_us"]
+        result["ratio"] = result["relative"] / base["relative"]
+        reference_us = result["time_us"] / result["relative"]  # this run's reference time
+        slower_us = (result["relative"] - base["relative"]) * reference_us
+        if result["ratio"] > 1 + result["threshold"] and slower_us > MIN_SLACK_US:
+            result["status"] = "regression"
+        elif result["ratio"] < 1 / (1 + result["threshold"]):
+            result["status"] = "improvement"
+        else:
+            result["status"] = "ok"
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the core hot paths against a saved baseline.")
+    parser.add_argument("-k", "--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="save these timings as the new baseline")
+    parser.add_argument("--passes", type=int, help=f"default {PASSES}, or {BASELINE_PASSES} with --update-baseline")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    args = parser.parse_args()
+    if args.passes is None:
+        args.passes = BASELINE_PASSES if args.update_baseline else PASSES
+
+    baseline = load_baseline(args.baseline)
+    selected = {name: entry for name, entry in g_cases.items() if args.filter in name}
+    timers = {name: calibrated_timer(setup()) for name, (setup, _) in selected.items()}
+    timed = time_cases(timers, args.passes, args.repeats)
+    results = {name: {**r, "threshold": selected[name][1]} for name, r in timed["cases"].items()}
+    compare(results, baseline)
+    for _ in range(CONFIRM_RUNS):
+        suspects = {name: timers[name] for name, r in results.items() if r["status"] == "regression"}
+        if not suspects:
+            break
+        retry = time_cases(suspects, args.passes, args.repeats)["cases"]
+        for name, r in retry.items():
+            if r["relative"] < results[name]["relative"]:
+                results[name] = {**r, "threshold": selected[name][1]}
+        compare(results, baseline)
+
+    print(f"{'case':<24} {'time (us)':>10} {'spread':>7} {'baseline':>10} {'ratio':>6}  status")
+    for name, r in results.items():
+        base = f"{r['baseline_us']:>10.2f} {r['ratio']:>6.2f}" if "ratio" in r else f"{'-':>10} {'-':>6}"
+        print(f"{name:<24} {r['time_us']:>10.2f} {r['spread']:>7.2f} {base}  {r['status']}")
+
+    report = {"environment": environment(), "reference_us": timed["reference_us"], "cases": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        merged = {**(baseline or {}).get("cases", {}),
+                  **{name: {"time_us": round(r["time_us"], 3), "relative": round(r["relative"], 6)}
+                     for name, r in results.items()}}
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": environment(), "cases": merged}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    regressions = [name for name, r in results.items() if r["status"] == "regression"]
+    if regressions:
+        print(f"Regressions beyond threshold: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Markdown for creature and species cards, built once per process
+#
+# Streamlit re-executes main.py on every rerun, so caches defined there would be
+# rebuilt each time; these live in an imported module and are shared by every
+# rerun and session instead.
+from functools import lru_cache
+from typing import Tuple
+
+from creature import (TYPE_AIR, TYPE_EARTH, TYPE_FIRE, TYPE_ICE, TYPE_LIGHTNING, TYPE_NATURE, TYPE_SHADOW,
+                      TYPE_WATER, Species, g_elements, g_species)
+
+g_element_icons = {
+    TYPE_FIRE: "🔥", TYPE_WATER: "💧", TYPE_EARTH: "🌍", TYPE_AIR: "💨",
+    TYPE_LIGHTNING: "⚡", TYPE_SHADOW: "🌑", TYPE_NATURE: "🌿", TYPE_ICE: "❄️",
+}
+
+
+@lru_cache(maxsize=4096)
+def creature_card_markdown(species: Species, level: int, current_hp: int, max_hp: int,
+                           atk: int, defense: int, spd: int) -> str:
+    """Markdown of a creature's status card in battle."""
+    hp_bar_filled = int(current_hp / max_hp * 10)
+    hp_bar = "█" * hp_bar_filled + "░" * (10 - hp_bar_filled)
+    status = "💀" if current_hp <= 0 else ""
+    return (f"### {species.sprite_path} {species.name} {status}\n\n"
+            f":gray[{g_element_icons.get(species.element, '')} {species.element.capitalize()} | Lv.{level}]\n\n"
+            f"```\nHP: [{hp_bar}] {current_hp}/{max_hp}\nATK: {atk}  DEF: {defense}  SPD: {spd}\n```")
+
+
+def species_card_markdown(species: Species) -> str:
+    abilities_str = ", ".join([a.name for a in species.abilities])
+    return (f"### {species.sprite_path} {species.name}\n\n:gray[{species.description}]\n\n"
+            f"```\nHP: {species.base_hp}  ATK: {species.base_atk}\nDEF: {species.base_def}  SPD: {species.base_spd}\n"
+            f"Moves: {abilities_str}\n```")
+
+
+@lru_cache(maxsize=None)
+def collection_sections() -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """(element, markdown of each of the 3 columns) for every element with species."""
+    creatures_by_element = {e: [] for e in g_elements}
+    for species in g_species.values():
+        creatures_by_element[species.element].append(species)
+    return tuple(
+        (element, tuple("\n\n---\n\n".join(species_card_markdown(s) for s in creatures[col::3]) for col in range(3)))
+        for element, creatures in creatures_by_element.items() if creatures
+    )
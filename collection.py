@@ -0,0 +1,334 @@
+# Struct-of-arrays storage for owned creatures
+#
+# A collection keeps one typed NumPy column per creature field (species id, level,
+# XP, current HP) instead of one Creature object per creature. Stats come from a
+# per-process table indexed [species id, level], so bulk operations like healing,
+# filtering by element and sorting by a stat are single array expressions.
+# `Creature` objects are only created on demand, as views onto a row.
+#
+# A collection's CollectionIndex keeps rows sorted by element, level and each stat,
+# for filter and sort queries that don't sort the whole collection. It is built on
+# first use and kept up to date by the collection's own mutators.
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from creature import MAX_LEVEL, Creature, Species, g_element_ids, g_species_by_id
+from fusion import N_BASE_SPECIES, g_fusion_table, get_species_by_id, get_species_id
+
+STAT_HP = 0
+STAT_ATK = 1
+STAT_DEF = 2
+STAT_SPD = 3
+g_stat_columns = {"hp": STAT_HP, "atk": STAT_ATK, "def": STAT_DEF, "spd": STAT_SPD}
+
+# Stats and element of every species ID (base species, then every fusion result), computed once per process
+g_stats_by_level = np.concatenate([
+    np.array([list(zip(s.hp_by_level, s.atk_by_level, s.def_by_level, s.spd_by_level)) for s in g_species_by_id],
+             dtype=np.int32),
+    g_fusion_table.stats_by_level.reshape(-1, MAX_LEVEL + 1, 4),
+])  # (species id, level, stat)
+g_species_element_ids = np.concatenate([
+    np.array([g_element_ids[s.element] for s in g_species_by_id]),
+    g_fusion_table.element_ids.ravel(),
+])
+assert len(g_stats_by_level) == len(g_species_element_ids) == N_BASE_SPECIES * (N_BASE_SPECIES + 1)
+
+
+class CreatureView(Creature):
+    """A Creature whose level, XP and HP live in a row of a CreatureCollection.
+
+    Reads and writes go straight to the collection's arrays. A view is only valid
+    until creatures are removed from or reordered in its collection.
+    """
+
+    def __init__(self, collection: "CreatureCollection", index: int):
+        self._collection = collection
+        self._index = index
+
+    @property
+    def species(self) -> Species:
+        return get_species_by_id(int(self._collection.species_ids[self._index]))
+
+    @property
+    def level(self) -> int:
+        return int(self._collection.levels[self._index])
+
+    @level.setter
+    def level(self, value: int):
+        self._collection.set_level(self._index, value)
+
+    @property
+    def experience(self) -> int:
+        return int(self._collection.experience[self._index])
+
+    @experience.setter
+    def experience(self, value: int):
+        self._collection.experience[self._index] = value
+
+    @property
+    def current_hp(self) -> int:
+        return int(self._collection.current_hp[self._index])
+
+    @current_hp.setter
+    def current_hp(self, value: int):
+        self._collection.current_hp[self._index] = value
+
+
+class CreatureCollection:
+    """Owned creatures stored column-wise, indexed by position."""
+
+    def __init__(self, capacity: int = 16):
+        self._size = 0
+        self._index: Optional["CollectionIndex"] = None  # built by index()
+        self._species_ids = np.zeros(capacity, dtype=np.int32)
+        self._levels = np.zeros(capacity, dtype=np.int16)
+        self._experience = np.zeros(capacity, dtype=np.int32)
+        self._current_hp = np.zeros(capacity, dtype=np.int32)
+
+    @classmethod
+    def from_creatures(cls, creatures: Iterable[Creature]) -> "CreatureCollection":
+        collection = cls()
+        collection.extend(creatures)
+        return collection
+
+    @classmethod
+    def from_columns(cls, species_ids, levels, experience, current_hp) -> "CreatureCollection":
+        collection = cls(max(16, len(species_ids)))
+        collection.extend_columns(species_ids, levels, experience, current_hp)
+        return collection
+
+    # Columns (views of the first len(self) entries; writes go through, but level
+    # changes should use set_level so the index sees them)
+    @property
+    def species_ids(self) -> np.ndarray:
+        return self._species_ids[:self._size]
+
+    @property
+    def levels(self) -> np.ndarray:
+        return self._levels[:self._size]
+
+    @property
+    def experience(self) -> np.ndarray:
+        return self._experience[:self._size]
+
+    @property
+    def current_hp(self) -> np.ndarray:
+        return self._current_hp[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> CreatureView:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(f"Creature index out of range: {index}")
+        return CreatureView(self, index)
+
+    def __iter__(self) -> Iterator[CreatureView]:
+        return (CreatureView(self, i) for i in range(self._size))
+
+    def to_creatures(self) -> List[Creature]:
+        """Independent Creature copies of every row."""
+        return [Creature(get_species_by_id(s), level=lv, experience=xp, current_hp=hp)
+                for s, lv, xp, hp in zip(self.species_ids.tolist(), self.levels.tolist(),
+                                         self.experience.tolist(), self.current_hp.tolist())]
+
+    # Adding and removing
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed <= len(self._species_ids):
+            return
+        capacity = max(needed, 2 * len(self._species_ids))
+        for name in ("_species_ids", "_levels", "_experience", "_current_hp"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def extend_columns(self, species_ids, levels, experience, current_hp):
+        n = len(species_ids)
+        self._reserve(n)
+        end = self._size + n
+        self._species_ids[self._size:end] = species_ids
+        self._levels[self._size:end] = levels
+        self._experience[self._size:end] = experience
+        self._current_hp[self._size:end] = current_hp
+        start, self._size = self._size, end
+        if self._index is not None:
+            self._index.added(self, start, end)
+
+    def extend(self, creatures: Iterable[Creature]):
+        creatures = list(creatures)
+        species_ids = [get_species_id(c.species) for c in creatures]
+        if None in species_ids:
+            unknown = creatures[species_ids.index(None)]
+            raise ValueError(f"Species has no ID and can't be stored: {unknown.name}")
+        self.extend_columns(species_ids, [c.level for c in creatures], [c.experience for c in creatures],
+                            [c.current_hp for c in creatures])
+
+    def append(self, creature: Creature):
+        self.extend([creature])
+
+    def remove(self, indices):
+        """Remove the creatures at `indices`; later creatures move up, keeping their order."""
+        indices = np.asarray(indices, dtype=np.int64)
+        keep = np.ones(self._size, dtype=bool)
+        keep[indices] = False
+        self._apply(np.flatnonzero(keep))
+        if self._index is not None:
+            self._index.removed(indices)
+
+    def set_level(self, index: int, level: int):
+        if not 1 <= level <= MAX_LEVEL:
+            raise ValueError(f"Creature level must be between 1 and MAX_LEVEL ({MAX_LEVEL}): {level}")
+        self._levels[index] = level
+        if self._index is not None:
+            self._index.level_changed(self, index)
+
+    def _apply(self, order: np.ndarray):
+        """Keep only the rows in `order`, in that order."""
+        n = len(order)
+        for column in (self._species_ids, self._levels, self._experience, self._current_hp):
+            column[:n] = column[:self._size][order]
+        self._size = n
+
+    def take(self, indices) -> "CreatureCollection":
+        """A new collection holding copies of the rows at `indices`."""
+        indices = np.asarray(indices, dtype=np.int64)
+        return CreatureCollection.from_columns(self.species_ids[indices], self.levels[indices],
+                                               self.experience[indices], self.current_hp[indices])
+
+    # Vectorized queries and bulk operations
+    def stats(self) -> np.ndarray:
+        """(N, 4) array of every creature's current HP max, ATK, DEF and SPD."""
+        return g_stats_by_level[self.species_ids, self.levels]
+
+    def max_hp(self) -> np.ndarray:
+        return self.stats()[:, STAT_HP]
+
+    def element_ids(self) -> np.ndarray:
+        return g_species_element_ids[self.species_ids]
+
+    def heal_all(self):
+        self.current_hp[:] = self.max_hp()
+
+    def filter_by_element(self, element: str) -> np.ndarray:
+        """Indices of every creature of `element`."""
+        return np.flatnonzero(self.element_ids() == g_element_ids[element])
+
+    def sort_key(self, key: str) -> np.ndarray:
+        """Values of "level", "experience", "current_hp", a stat ("hp", "atk", "def", "spd") or "total"."""
+        if key in g_stat_columns:
+            return self.stats()[:, g_stat_columns[key]]
+        if key == "total":
+            return self.stats().sum(axis=1)
+        if key in ("level", "experience", "current_hp"):
+            return getattr(self, key if key != "level" else "levels")
+        raise ValueError(f"Unknown sort key: {key}")
+
+    def argsort(self, key: str, descending: bool = True, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """Indices ordered by `key` (only those in `indices`, if given); ties keep collection order."""
+        values = self.sort_key(key)
+        if indices is None:
+            indices = np.arange(self._size)
+        values = values[indices].astype(np.int64)
+        return indices[np.argsort(-values if descending else values, kind="stable")]
+
+    def sort_by(self, key: str, descending: bool = True):
+        """Reorder the collection in place by `key`."""
+        self._apply(self.argsort(key, descending))
+        self._index = None  # every row moved; rebuilt on next use
+
+    def index(self) -> "CollectionIndex":
+        """The collection's search index, built on first use."""
+        if self._index is None:
+            self._index = CollectionIndex(self)
+        return self._index
+
+
+g_index_keys = ("element", "level", *g_stat_columns)
+g_level_keys = ("level", *g_stat_columns)  # keys whose values change with level
+
+
+class CollectionIndex:
+    """Sorted secondary indexes over a collection's rows, one per key in g_index_keys.
+
+    Each index holds the row numbers ordered by (value, row) with the values
+    alongside, so a value range is two binary searches and a sort order is already
+    there. Adding, removing and leveling up creatures update the indexes in place
+    instead of re-sorting.
+    """
+
+    def __init__(self, collection: CreatureCollection):
+        self._rows = {}
+        self._values = {}
+        for key in g_index_keys:
+            values = self._key_values(collection, key, np.arange(len(collection)))
+            order = np.argsort(values, kind="stable")
+            self._rows[key], self._values[key] = order, values[order]
+
+    @staticmethod
+    def _key_values(collection: CreatureCollection, key: str, rows: np.ndarray) -> np.ndarray:
+        species_ids = collection.species_ids[rows]
+        if key == "element":
+            return g_species_element_ids[species_ids].astype(np.int64)
+        levels = collection.levels[rows]
+        if key == "level":
+            return levels.astype(np.int64)
+        return g_stats_by_level[species_ids, levels, g_stat_columns[key]].astype(np.int64)
+
+    # Incremental updates, called by the collection
+    def added(self, collection: CreatureCollection, start: int, end: int):
+        rows = np.arange(start, end)
+        for key in g_index_keys:
+            values = self._key_values(collection, key, rows)
+            order = np.argsort(values, kind="stable")
+            # New rows come after every existing one, so they go after existing equal values
+            positions = np.searchsorted(self._values[key], values[order], side="right")
+            self._rows[key] = np.insert(self._rows[key], positions, rows[order])
+            self._values[key] = np.insert(self._values[key], positions, values[order])
+
+    def removed(self, indices: np.ndarray):
+        removed = np.unique(indices)
+        for key in g_index_keys:
+            keep = ~np.isin(self._rows[key], removed)
+            rows = self._rows[key][keep]
+            self._rows[key] = rows - np.searchsorted(removed, rows)  # later rows moved up
+            self._values[key] = self._values[key][keep]
+
+    def level_changed(self, collection: CreatureCollection, row: int):
+        for key in g_level_keys:
+            rows, values = self._rows[key], self._values[key]
+            old = int(np.flatnonzero(rows == row)[0])
+            rows, values = np.delete(rows, old), np.delete(values, old)
+            value = int(self._key_values(collection, key, np.array([row]))[0])
+            lo, hi = np.searchsorted(values, value, side="left"), np.searchsorted(values, value, side="right")
+            position = lo + int(np.searchsorted(rows[lo:hi], row))
+            self._rows[key], self._values[key] = np.insert(rows, position, row), np.insert(values, position, value)
+
+    # Queries
+    def _rows_between(self, key: str, low: int, high: int) -> np.ndarray:
+        """Rows whose `key` value is in [low, high]."""
+        values = self._values[key]
+        return self._rows[key][np.searchsorted(values, low, side="left"):np.searchsorted(values, high, side="right")]
+
+    def query(self, element: Optional[str] = None, min_level: Optional[int] = None, max_level: Optional[int] = None,
+              sort: str = "level", descending: bool = True) -> np.ndarray:
+        """Rows matching every given filter, ordered by `sort` (a key in g_index_keys).
+
+        Ties are in collection order, or reverse collection order (newest first)
+        when descending.
+        """
+        order = self._rows[sort]
+        selected = None
+        if element is not None:
+            selected = np.zeros(len(order), dtype=bool)
+            selected[self._rows_between("element", g_element_ids[element], g_element_ids[element])] = True
+        if min_level is not None or max_level is not None:
+            in_range = np.zeros(len(order), dtype=bool)
+            in_range[self._rows_between("level", min_level or 0, MAX_LEVEL if max_level is None else max_level)] = True
+            selected = in_range if selected is None else selected & in_range
+        rows = order if selected is None else order[selected[order]]
+        return rows[::-1] if descending else rows
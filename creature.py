@@ -1,8 +1,17 @@
 # Creature base class and type system
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import List, Optional
+from types import MappingProxyType
+from typing import Optional, Tuple
 import random
 
+import numpy as np
+
+MAX_LEVEL = 100
+
+# Total experience needed to reach each level from level 1 (index = level, 0..MAX_LEVEL)
+g_cumulative_exp = tuple(50 * lv * (lv - 1) for lv in range(MAX_LEVEL + 1))
+
 # Elemental types
 TYPE_FIRE = "fire"
 TYPE_WATER = "water"
@@ -28,11 +37,64 @@ g_type_chart = {
     TYPE_ICE: {TYPE_ICE: 0.5, TYPE_FIRE: 0.5, TYPE_AIR: 2.0, TYPE_LIGHTNING: 2.0},       # weak to: Fire, Nature
 }
 
+# Integer element IDs, in chart order
+g_elements = (TYPE_FIRE, TYPE_WATER, TYPE_EARTH, TYPE_AIR, TYPE_LIGHTNING, TYPE_SHADOW, TYPE_NATURE, TYPE_ICE)
+g_element_ids = {element: i for i, element in enumerate(g_elements)}
+
+
+def validate_type_chart(chart: dict):
+    """Raise ValueError unless every type has exactly 2 strengths and 2 weaknesses (2.0x and 0.5x entries)."""
+    for attacker, row in chart.items():
+        if attacker not in g_element_ids:
+            raise ValueError(f"Unknown attacking type in type chart: {attacker}")
+        for defender, mult in row.items():
+            if defender not in g_element_ids:
+                raise ValueError(f"Unknown defending type in type chart: {attacker} -> {defender}")
+            if mult not in (0.5, 1.0, 2.0):
+                raise ValueError(f"Invalid multiplier in type chart: {attacker} -> {defender} = {mult}")
+        strengths = sum(1 for mult in row.values() if mult == 2.0)
+        weaknesses = sum(1 for mult in row.values() if mult == 0.5)
+        if strengths != 2 or weaknesses != 2:
+            raise ValueError(f"Unbalanced type chart: {attacker} has {strengths} strengths and {weaknesses} weaknesses")
+    missing = set(g_elements) - set(chart)
+    if missing:
+        raise ValueError(f"Type chart is missing attacking types: {sorted(missing)}")
+
+
+def build_type_matrix(chart: dict) -> Tuple[Tuple[float, ...], ...]:
+    """Dense attacker x defender multiplier matrix, indexed by element ID."""
+    return tuple(tuple(chart.get(a, {}).get(d, 1.0) for d in g_elements) for a in g_elements)
+
+
+# Precomputed from g_type_chart; replaced together by load_type_chart()
+g_type_matrix = build_type_matrix(g_type_chart)
+g_type_matrix_np = np.array(g_type_matrix, dtype=np.float64)
+
+
+def load_type_chart(chart: dict):
+    """Validate and install a custom type chart, rebuilding the precomputed matrices."""
+    global g_type_matrix
+    validate_type_chart(chart)
+    g_type_chart.clear()
+    g_type_chart.update({attacker: dict(row) for attacker, row in chart.items()})
+    g_type_matrix = build_type_matrix(g_type_chart)
+    g_type_matrix_np[...] = g_type_matrix  # in place, so imported references stay current
+
+
 def get_type_multiplier(attacker_type: str, defender_type: str) -> float:
-    return g_type_chart.get(attacker_type, {}).get(defender_type, 1.0)
+    a = g_element_ids.get(attacker_type)
+    d = g_element_ids.get(defender_type)
+    if a is None or d is None:
+        return 1.0
+    return g_type_matrix[a][d]
 
 
-@dataclass
+def get_type_multipliers(attacker_ids, defender_ids) -> np.ndarray:
+    """Look up a whole array of attacker/defender element ID pairs at once."""
+    return g_type_matrix_np[attacker_ids, defender_ids]
+
+
+@dataclass(frozen=True)
 class Ability:
     name: str
     power: int  # base damage (0 for status moves)
@@ -40,42 +102,113 @@ class Ability:
     element: str  # elemental type of the ability
     description: str = ""
 
+    @property
+    def element_id(self) -> int:
+        return g_element_ids[self.element]
 
-@dataclass
-class Creature:
+
+@dataclass(frozen=True)
+class Species:
+    """Immutable per-species data, shared by every creature of that species."""
     name: str
     element: str
     base_hp: int
     base_atk: int
     base_def: int
     base_spd: int
-    abilities: List[Ability] = field(default_factory=list)
+    abilities: Tuple[Ability, ...] = ()
     sprite_path: Optional[str] = None  # path to sprite image
     description: str = ""
 
+    # Stat tables indexed directly by level (0..MAX_LEVEL), computed once per species
+    hp_by_level: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    atk_by_level: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    def_by_level: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+    spd_by_level: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        levels = range(MAX_LEVEL + 1)
+        object.__setattr__(self, "hp_by_level", tuple(int(self.base_hp * (1 + (lv - 1) * 0.1)) for lv in levels))  # 10% increase per level
+        object.__setattr__(self, "atk_by_level", tuple(int(self.base_atk * (1 + (lv - 1) * 0.08)) for lv in levels))  # 8% increase per level
+        object.__setattr__(self, "def_by_level", tuple(int(self.base_def * (1 + (lv - 1) * 0.08)) for lv in levels))
+        object.__setattr__(self, "spd_by_level", tuple(int(self.base_spd * (1 + (lv - 1) * 0.05)) for lv in levels))  # 5% increase per level
+
+    @property
+    def element_id(self) -> int:
+        return g_element_ids[self.element]
+
+
+@dataclass
+class Creature:
+    species: Species
+
     # Instance-specific stats (set when creature is created/caught)
     level: int = 1
     experience: int = 0
-    current_hp: int = field(init=False)
+    current_hp: Optional[int] = None  # defaults to max_hp
 
     def __post_init__(self):
-        self.current_hp = self.max_hp
+        if not 1 <= self.level <= MAX_LEVEL:
+            raise ValueError(f"Creature level must be between 1 and MAX_LEVEL ({MAX_LEVEL}): {self.level}")
+        if self.current_hp is None:
+            self.current_hp = self.max_hp
+
+    # Species data is shared, not copied per instance
+    @property
+    def name(self) -> str:
+        return self.species.name
+
+    @property
+    def element(self) -> str:
+        return self.species.element
+
+    @property
+    def element_id(self) -> int:
+        return g_element_ids[self.species.element]
+
+    @property
+    def base_hp(self) -> int:
+        return self.species.base_hp
+
+    @property
+    def base_atk(self) -> int:
+        return self.species.base_atk
+
+    @property
+    def base_def(self) -> int:
+        return self.species.base_def
+
+    @property
+    def base_spd(self) -> int:
+        return self.species.base_spd
+
+    @property
+    def abilities(self) -> Tuple[Ability, ...]:
+        return self.species.abilities
+
+    @property
+    def sprite_path(self) -> Optional[str]:
+        return self.species.sprite_path
+
+    @property
+    def description(self) -> str:
+        return self.species.description
 
     @property
     def max_hp(self) -> int:
-        return int(self.base_hp * (1 + (self.level - 1) * 0.1))  # 10% increase per level
+        return self.species.hp_by_level[self.level]
 
     @property
     def atk(self) -> int:
-        return int(self.base_atk * (1 + (self.level - 1) * 0.08))  # 8% increase per level
+        return self.species.atk_by_level[self.level]
 
     @property
     def defense(self) -> int:
-        return int(self.base_def * (1 + (self.level - 1) * 0.08))
+        return self.species.def_by_level[self.level]
 
     @property
     def spd(self) -> int:
-        return int(self.base_spd * (1 + (self.level - 1) * 0.05))  # 5% increase per level
+        return self.species.spd_by_level[self.level]
 
     def is_alive(self) -> bool:
         return self.current_hp > 0
@@ -94,20 +227,21 @@ class Creature:
         self.current_hp = self.max_hp
 
     def gain_experience(self, amount: int) -> bool:
-        self.experience += amount
-        exp_needed = self.exp_to_next_level()
-        leveled_up = False
-        while self.experience >= exp_needed and self.level < 100:  # max level 100
-            self.experience -= exp_needed
-            self.level += 1
-            leveled_up = True
-            exp_needed = self.exp_to_next_level()
+        if self.level >= MAX_LEVEL:
+            self.experience += amount
+            return False
+        # Jump straight to the new level via the cumulative table instead of looping level by level
+        total = g_cumulative_exp[self.level] + self.experience + amount
+        new_level = max(self.level, min(MAX_LEVEL, bisect_right(g_cumulative_exp, total) - 1))
+        leveled_up = new_level > self.level
+        self.level = new_level
+        self.experience = total - g_cumulative_exp[new_level]
         return leveled_up
 
     def exp_to_next_level(self) -> int:
         return self.level * 100  # simple linear scaling
 
-    def calculate_damage(self, ability: Ability, defender: 'Creature') -> int:
+    def calculate_damage(self, ability: Ability, defender: 'Creature', rng: Optional[random.Random] = None) -> int:
         if ability.power == 0:
             return 0  # status move
 
@@ -124,11 +258,11 @@ class Creature:
         type_mult = get_type_multiplier(ability.element, defender.element)
 
         # Random variance (90-100%) - tighter range for consistency
-        variance = random.uniform(0.90, 1.0)
+        variance = (rng or random).uniform(0.90, 1.0)
 
         return max(1, int(base_damage * type_mult * variance))
 
-    def use_ability(self, ability: Ability, defender: 'Creature') -> dict:
+    def use_ability(self, ability: Ability, defender: 'Creature', rng: Optional[random.Random] = None) -> dict:
         result = {
             "attacker": self.name,
             "defender": defender.name,
@@ -140,12 +274,12 @@ class Creature:
         }
 
         # Accuracy check
-        if random.randint(1, 100) > ability.accuracy:
+        if (rng or random).randint(1, 100) > ability.accuracy:
             return result  # missed
 
         result["hit"] = True
         result["type_effectiveness"] = get_type_multiplier(ability.element, defender.element)
-        result["damage"] = self.calculate_damage(ability, defender)
+        result["damage"] = self.calculate_damage(ability, defender, rng)
         defender.take_damage(result["damage"])
         result["defender_fainted"] = not defender.is_alive()
 
@@ -175,229 +309,233 @@ g_abilities = {
     "frost_bite": Ability("Frost Bite", power=20, accuracy=100, element=TYPE_ICE, description="A freezing cold bite"),
     "blizzard": Ability("Blizzard", power=35, accuracy=90, element=TYPE_ICE, description="A devastating snowstorm"),
 }
+g_ability_ids = {ability: i for i, ability in enumerate(g_abilities.values())}  # stable IDs for binary formats
+
+
+# Starter species (emoji placeholders for sprites)
+# All creatures normalized to 200 base stat total
+g_species = MappingProxyType({
+    # Fire creatures
+    "emberling": Species(  # Balanced speedster (200 total)
+        name="Emberling",
+        element=TYPE_FIRE,
+        base_hp=50, base_atk=50, base_def=40, base_spd=60,
+        abilities=(g_abilities["ember"], g_abilities["tackle"]),
+        sprite_path="🦎",
+        description="A small salamander with a flame-tipped tail.",
+    ),
+    "phoenixlet": Species(  # Glass cannon (200 total)
+        name="Phoenixlet",
+        element=TYPE_FIRE,
+        base_hp=40, base_atk=60, base_def=30, base_spd=70,
+        abilities=(g_abilities["ember"], g_abilities["gust"]),
+        sprite_path="🐦",
+        description="A young firebird still learning to control its flames.",
+    ),
+    "infernoboar": Species(  # Slow bruiser (200 total)
+        name="Infernoboar",
+        element=TYPE_FIRE,
+        base_hp=65, base_atk=55, base_def=50, base_spd=30,
+        abilities=(g_abilities["flame_burst"], g_abilities["tackle"]),
+        sprite_path="🐗",
+        description="A fierce boar wreathed in flames.",
+    ),
+
+    # Water creatures
+    "bubblefin": Species(  # Balanced (200 total)
+        name="Bubblefin",
+        element=TYPE_WATER,
+        base_hp=55, base_atk=45, base_def=45, base_spd=55,
+        abilities=(g_abilities["water_gun"], g_abilities["tackle"]),
+        sprite_path="🐟",
+        description="A cheerful fish that blows bubbles when happy.",
+    ),
+    "shellsnap": Species(  # Defensive tank (200 total)
+        name="Shellsnap",
+        element=TYPE_WATER,
+        base_hp=55, base_atk=50, base_def=65, base_spd=30,
+        abilities=(g_abilities["water_gun"], g_abilities["tackle"]),
+        sprite_path="🦀",
+        description="A tough crab with pincers that can crack stone.",
+    ),
+    "tidalserpent": Species(  # Offensive (200 total)
+        name="Tidalserpent",
+        element=TYPE_WATER,
+        base_hp=50, base_atk=65, base_def=40, base_spd=45,
+        abilities=(g_abilities["tidal_wave"], g_abilities["water_gun"]),
+        sprite_path="🐍",
+        description="A sea serpent that commands the waves.",
+    ),
+
+    # Earth creatures
+    "pebblehog": Species(  # Defensive (200 total)
+        name="Pebblehog",
+        element=TYPE_EARTH,
+        base_hp=55, base_atk=45, base_def=65, base_spd=35,
+        abilities=(g_abilities["tackle"], g_abilities["earthquake"]),
+        sprite_path="🦔",
+        description="A hedgehog with stone spines.",
+    ),
+    "boulderback": Species(  # Ultra tank (200 total)
+        name="Boulderback",
+        element=TYPE_EARTH,
+        base_hp=70, base_atk=45, base_def=60, base_spd=25,
+        abilities=(g_abilities["earthquake"], g_abilities["tackle"]),
+        sprite_path="🐢",
+        description="An ancient turtle with a mountain on its shell.",
+    ),
+    "tunnelmole": Species(  # Balanced attacker (200 total)
+        name="Tunnelmole",
+        element=TYPE_EARTH,
+        base_hp=50, base_atk=55, base_def=50, base_spd=45,
+        abilities=(g_abilities["tackle"], g_abilities["earthquake"]),
+        sprite_path="🐀",
+        description="A mole that digs through solid rock.",
+    ),
+
+    # Air creatures
+    "breezewing": Species(  # Speed glass cannon (200 total)
+        name="Breezewing",
+        element=TYPE_AIR,
+        base_hp=40, base_atk=50, base_def=35, base_spd=75,
+        abilities=(g_abilities["gust"], g_abilities["tackle"]),
+        sprite_path="🦅",
+        description="A swift eagle that rides the wind currents.",
+    ),
+    "cloudhopper": Species(  # Balanced speedster (200 total)
+        name="Cloudhopper",
+        element=TYPE_AIR,
+        base_hp=50, base_atk=45, base_def=40, base_spd=65,
+        abilities=(g_abilities["gust"], g_abilities["tackle"]),
+        sprite_path="🐰",
+        description="A fluffy rabbit that can leap into the clouds.",
+    ),
+    "stormbat": Species(  # Fast attacker (200 total)
+        name="Stormbat",
+        element=TYPE_AIR,
+        base_hp=45, base_atk=55, base_def=35, base_spd=65,
+        abilities=(g_abilities["hurricane"], g_abilities["gust"]),
+        sprite_path="🦇",
+        description="A bat that summons thunderstorms.",
+    ),
+
+    # Lightning creatures
+    "sparkrat": Species(  # Ultra speed (200 total)
+        name="Sparkrat",
+        element=TYPE_LIGHTNING,
+        base_hp=40, base_atk=50, base_def=35, base_spd=75,
+        abilities=(g_abilities["spark"], g_abilities["tackle"]),
+        sprite_path="🐁",
+        description="A tiny mouse crackling with static electricity.",
+    ),
+    "thunderwolf": Species(  # Fast attacker (200 total)
+        name="Thunderwolf",
+        element=TYPE_LIGHTNING,
+        base_hp=50, base_atk=60, base_def=40, base_spd=50,
+        abilities=(g_abilities["thunderbolt"], g_abilities["spark"]),
+        sprite_path="🐺",
+        description="A fierce wolf with lightning in its fur.",
+    ),
+    "stormeel": Species(  # Balanced (200 total)
+        name="Stormeel",
+        element=TYPE_LIGHTNING,
+        base_hp=50, base_atk=55, base_def=45, base_spd=50,
+        abilities=(g_abilities["thunderbolt"], g_abilities["spark"]),
+        sprite_path="🐉",
+        description="An eel that generates massive electric shocks.",
+    ),
+
+    # Shadow creatures
+    "duskcat": Species(  # Fast attacker (200 total)
+        name="Duskcat",
+        element=TYPE_SHADOW,
+        base_hp=45, base_atk=55, base_def=35, base_spd=65,
+        abilities=(g_abilities["shadow_bite"], g_abilities["tackle"]),
+        sprite_path="🐈‍⬛",
+        description="A sleek cat that melts into shadows.",
+    ),
+    "nightowl": Species(  # Balanced (200 total)
+        name="Nightowl",
+        element=TYPE_SHADOW,
+        base_hp=50, base_atk=50, base_def=50, base_spd=50,
+        abilities=(g_abilities["dark_pulse"], g_abilities["shadow_bite"]),
+        sprite_path="🦉",
+        description="An owl that hunts in complete darkness.",
+    ),
+    "voidspider": Species(  # Slow bruiser (200 total)
+        name="Voidspider",
+        element=TYPE_SHADOW,
+        base_hp=55, base_atk=60, base_def=50, base_spd=35,
+        abilities=(g_abilities["dark_pulse"], g_abilities["shadow_bite"]),
+        sprite_path="🕷️",
+        description="A spider that weaves webs of pure darkness.",
+    ),
+
+    # Nature creatures
+    "sproutling": Species(  # Balanced (200 total)
+        name="Sproutling",
+        element=TYPE_NATURE,
+        base_hp=50, base_atk=50, base_def=50, base_spd=50,
+        abilities=(g_abilities["vine_whip"], g_abilities["tackle"]),
+        sprite_path="🐛",
+        description="A small creature with leaves growing from its back.",
+    ),
+    "thornbear": Species(  # Slow tank (200 total)
+        name="Thornbear",
+        element=TYPE_NATURE,
+        base_hp=65, base_atk=55, base_def=50, base_spd=30,
+        abilities=(g_abilities["solar_beam"], g_abilities["vine_whip"]),
+        sprite_path="🐻",
+        description="A bear covered in thorny vines.",
+    ),
+    "florafox": Species(  # Fast attacker (200 total)
+        name="Florafox",
+        element=TYPE_NATURE,
+        base_hp=45, base_atk=55, base_def=35, base_spd=65,
+        abilities=(g_abilities["vine_whip"], g_abilities["solar_beam"]),
+        sprite_path="🦊",
+        description="A graceful fox with flowers in its fur.",
+    ),
+
+    # Ice creatures
+    "frostpup": Species(  # Balanced (200 total)
+        name="Frostpup",
+        element=TYPE_ICE,
+        base_hp=50, base_atk=50, base_def=45, base_spd=55,
+        abilities=(g_abilities["frost_bite"], g_abilities["tackle"]),
+        sprite_path="🐕",
+        description="A playful pup with icy breath.",
+    ),
+    "glacialbear": Species(  # Slow tank (200 total)
+        name="Glacialbear",
+        element=TYPE_ICE,
+        base_hp=70, base_atk=55, base_def=50, base_spd=25,
+        abilities=(g_abilities["blizzard"], g_abilities["frost_bite"]),
+        sprite_path="🐻‍❄️",
+        description="A massive bear from the frozen tundra.",
+    ),
+    "crystalbird": Species(  # Fast glass cannon (200 total)
+        name="Crystalbird",
+        element=TYPE_ICE,
+        base_hp=40, base_atk=55, base_def=35, base_spd=70,
+        abilities=(g_abilities["blizzard"], g_abilities["frost_bite"]),
+        sprite_path="🐧",
+        description="A bird with feathers made of ice crystals.",
+    ),
+})
+
+g_species_ids = {species: i for i, species in enumerate(g_species.values())}  # stable IDs for binary formats
+g_species_by_id = tuple(g_species.values())
 
 
-# Starter creatures (emoji placeholders for sprites)
 def create_creature(template_name: str, level: int = 1) -> Optional[Creature]:
     """Factory function to create a creature from a template."""
-    templates = get_creature_templates()
-    if template_name not in templates:
+    species = g_species.get(template_name)
+    if species is None:
         return None
-    creature = templates[template_name]
-    creature.level = level
-    creature.current_hp = creature.max_hp
-    return creature
+    return Creature(species, level=level)
 
 
 def get_creature_templates() -> dict:
-    """Returns a dict of creature templates (creates fresh instances each call)."""
-    # All creatures normalized to 200 base stat total
-    return {
-        # Fire creatures
-        "emberling": Creature(  # Balanced speedster (200 total)
-            name="Emberling",
-            element=TYPE_FIRE,
-            base_hp=50, base_atk=50, base_def=40, base_spd=60,
-            abilities=[g_abilities["ember"], g_abilities["tackle"]],
-            sprite_path="🦎",
-            description="A small salamander with a flame-tipped tail.",
-        ),
-        "phoenixlet": Creature(  # Glass cannon (200 total)
-            name="Phoenixlet",
-            element=TYPE_FIRE,
-            base_hp=40, base_atk=60, base_def=30, base_spd=70,
-            abilities=[g_abilities["ember"], g_abilities["gust"]],
-            sprite_path="🐦",
-            description="A young firebird still learning to control its flames.",
-        ),
-        "infernoboar": Creature(  # Slow bruiser (200 total)
-            name="Infernoboar",
-            element=TYPE_FIRE,
-            base_hp=65, base_atk=55, base_def=50, base_spd=30,
-            abilities=[g_abilities["flame_burst"], g_abilities["tackle"]],
-            sprite_path="🐗",
-            description="A fierce boar wreathed in flames.",
-        ),
-
-        # Water creatures
-        "bubblefin": Creature(  # Balanced (200 total)
-            name="Bubblefin",
-            element=TYPE_WATER,
-            base_hp=55, base_atk=45, base_def=45, base_spd=55,
-            abilities=[g_abilities["water_gun"], g_abilities["tackle"]],
-            sprite_path="🐟",
-            description="A cheerful fish that blows bubbles when happy.",
-        ),
-        "shellsnap": Creature(  # Defensive tank (200 total)
-            name="Shellsnap",
-            element=TYPE_WATER,
-            base_hp=55, base_atk=50, base_def=65, base_spd=30,
-            abilities=[g_abilities["water_gun"], g_abilities["tackle"]],
-            sprite_path="🦀",
-            description="A tough crab with pincers that can crack stone.",
-        ),
-        "tidalserpent": Creature(  # Offensive (200 total)
-            name="Tidalserpent",
-            element=TYPE_WATER,
-            base_hp=50, base_atk=65, base_def=40, base_spd=45,
-            abilities=[g_abilities["tidal_wave"], g_abilities["water_gun"]],
-            sprite_path="🐍",
-            description="A sea serpent that commands the waves.",
-        ),
-
-        # Earth creatures
-        "pebblehog": Creature(  # Defensive (200 total)
-            name="Pebblehog",
-            element=TYPE_EARTH,
-            base_hp=55, base_atk=45, base_def=65, base_spd=35,
-            abilities=[g_abilities["tackle"], g_abilities["earthquake"]],
-            sprite_path="🦔",
-            description="A hedgehog with stone spines.",
-        ),
-        "boulderback": Creature(  # Ultra tank (200 total)
-            name="Boulderback",
-            element=TYPE_EARTH,
-            base_hp=70, base_atk=45, base_def=60, base_spd=25,
-            abilities=[g_abilities["earthquake"], g_abilities["tackle"]],
-            sprite_path="🐢",
-            description="An ancient turtle with a mountain on its shell.",
-        ),
-        "tunnelmole": Creature(  # Balanced attacker (200 total)
-            name="Tunnelmole",
-            element=TYPE_EARTH,
-            base_hp=50, base_atk=55, base_def=50, base_spd=45,
-            abilities=[g_abilities["tackle"], g_abilities["earthquake"]],
-            sprite_path="🐀",
-            description="A mole that digs through solid rock.",
-        ),
-
-        # Air creatures
-        "breezewing": Creature(  # Speed glass cannon (200 total)
-            name="Breezewing",
-            element=TYPE_AIR,
-            base_hp=40, base_atk=50, base_def=35, base_spd=75,
-            abilities=[g_abilities["gust"], g_abilities["tackle"]],
-            sprite_path="🦅",
-            description="A swift eagle that rides the wind currents.",
-        ),
-        "cloudhopper": Creature(  # Balanced speedster (200 total)
-            name="Cloudhopper",
-            element=TYPE_AIR,
-            base_hp=50, base_atk=45, base_def=40, base_spd=65,
-            abilities=[g_abilities["gust"], g_abilities["tackle"]],
-            sprite_path="🐰",
-            description="A fluffy rabbit that can leap into the clouds.",
-        ),
-        "stormbat": Creature(  # Fast attacker (200 total)
-            name="Stormbat",
-            element=TYPE_AIR,
-            base_hp=45, base_atk=55, base_def=35, base_spd=65,
-            abilities=[g_abilities["hurricane"], g_abilities["gust"]],
-            sprite_path="🦇",
-            description="A bat that summons thunderstorms.",
-        ),
-
-        # Lightning creatures
-        "sparkrat": Creature(  # Ultra speed (200 total)
-            name="Sparkrat",
-            element=TYPE_LIGHTNING,
-            base_hp=40, base_atk=50, base_def=35, base_spd=75,
-            abilities=[g_abilities["spark"], g_abilities["tackle"]],
-            sprite_path="🐁",
-            description="A tiny mouse crackling with static electricity.",
-        ),
-        "thunderwolf": Creature(  # Fast attacker (200 total)
-            name="Thunderwolf",
-            element=TYPE_LIGHTNING,
-            base_hp=50, base_atk=60, base_def=40, base_spd=50,
-            abilities=[g_abilities["thunderbolt"], g_abilities["spark"]],
-            sprite_path="🐺",
-            description="A fierce wolf with lightning in its fur.",
-        ),
-        "stormeel": Creature(  # Balanced (200 total)
-            name="Stormeel",
-            element=TYPE_LIGHTNING,
-            base_hp=50, base_atk=55, base_def=45, base_spd=50,
-            abilities=[g_abilities["thunderbolt"], g_abilities["spark"]],
-            sprite_path="🐉",
-            description="An eel that generates massive electric shocks.",
-        ),
-
-        # Shadow creatures
-        "duskcat": Creature(  # Fast attacker (200 total)
-            name="Duskcat",
-            element=TYPE_SHADOW,
-            base_hp=45, base_atk=55, base_def=35, base_spd=65,
-            abilities=[g_abilities["shadow_bite"], g_abilities["tackle"]],
-            sprite_path="🐈‍⬛",
-            description="A sleek cat that melts into shadows.",
-        ),
-        "nightowl": Creature(  # Balanced (200 total)
-            name="Nightowl",
-            element=TYPE_SHADOW,
-            base_hp=50, base_atk=50, base_def=50, base_spd=50,
-            abilities=[g_abilities["dark_pulse"], g_abilities["shadow_bite"]],
-            sprite_path="🦉",
-            description="An owl that hunts in complete darkness.",
-        ),
-        "voidspider": Creature(  # Slow bruiser (200 total)
-            name="Voidspider",
-            element=TYPE_SHADOW,
-            base_hp=55, base_atk=60, base_def=50, base_spd=35,
-            abilities=[g_abilities["dark_pulse"], g_abilities["shadow_bite"]],
-            sprite_path="🕷️",
-            description="A spider that weaves webs of pure darkness.",
-        ),
-
-        # Nature creatures
-        "sproutling": Creature(  # Balanced (200 total)
-            name="Sproutling",
-            element=TYPE_NATURE,
-            base_hp=50, base_atk=50, base_def=50, base_spd=50,
-            abilities=[g_abilities["vine_whip"], g_abilities["tackle"]],
-            sprite_path="🐛",
-            description="A small creature with leaves growing from its back.",
-        ),
-        "thornbear": Creature(  # Slow tank (200 total)
-            name="Thornbear",
-            element=TYPE_NATURE,
-            base_hp=65, base_atk=55, base_def=50, base_spd=30,
-            abilities=[g_abilities["solar_beam"], g_abilities["vine_whip"]],
-            sprite_path="🐻",
-            description="A bear covered in thorny vines.",
-        ),
-        "florafox": Creature(  # Fast attacker (200 total)
-            name="Florafox",
-            element=TYPE_NATURE,
-            base_hp=45, base_atk=55, base_def=35, base_spd=65,
-            abilities=[g_abilities["vine_whip"], g_abilities["solar_beam"]],
-            sprite_path="🦊",
-            description="A graceful fox with flowers in its fur.",
-        ),
-
-        # Ice creatures
-        "frostpup": Creature(  # Balanced (200 total)
-            name="Frostpup",
-            element=TYPE_ICE,
-            base_hp=50, base_atk=50, base_def=45, base_spd=55,
-            abilities=[g_abilities["frost_bite"], g_abilities["tackle"]],
-            sprite_path="🐕",
-            description="A playful pup with icy breath.",
-        ),
-        "glacialbear": Creature(  # Slow tank (200 total)
-            name="Glacialbear",
-            element=TYPE_ICE,
-            base_hp=70, base_atk=55, base_def=50, base_spd=25,
-            abilities=[g_abilities["blizzard"], g_abilities["frost_bite"]],
-            sprite_path="🐻‍❄️",
-            description="A massive bear from the frozen tundra.",
-        ),
-        "crystalbird": Creature(  # Fast glass cannon (200 total)
-            name="Crystalbird",
-            element=TYPE_ICE,
-            base_hp=40, base_atk=55, base_def=35, base_spd=70,
-            abilities=[g_abilities["blizzard"], g_abilities["frost_bite"]],
-            sprite_path="🐧",
-            description="A bird with feathers made of ice crystals.",
-        ),
-    }
+    """Returns a dict of level 1 creatures (fresh instances sharing the registry's species each call)."""
+    return {name: Creature(species) for name, species in g_species.items()}
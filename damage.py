@@ -0,0 +1,91 @@
+# Exact damage distributions, without sampling
+#
+# calculate_damage draws a variance v uniformly from [0.90, 1.0) and deals
+# max(1, int(x * v)) where x = base damage * type multiplier. So the damage is d
+# exactly when v falls in [d / x, (d + 1) / x), and P(d) is that interval's share
+# of [0.90, 1.0). Misses (accuracy) add a 0, and take_damage's minimum of 1 applies
+# to every hit, status moves included. Distributions are memoized per attacker
+# stats, defender stats and ability, so the battle screen's hints cost a lookup.
+from dataclasses import dataclass
+from functools import lru_cache
+from math import floor
+from typing import Tuple
+
+from creature import Ability, Creature, get_type_multiplier
+
+VARIANCE_LOW = 0.90  # calculate_damage's uniform variance range
+VARIANCE_HIGH = 1.0
+
+
+@dataclass(frozen=True)
+class DamageDistribution:
+    """P(damage = d) of one use of an ability; d = 0 is a miss."""
+    damage: Tuple[int, ...]  # ascending
+    probability: Tuple[float, ...]
+
+    @property
+    def expected(self) -> float:
+        return sum(d * p for d, p in zip(self.damage, self.probability))
+
+    def at_least(self, hp: int) -> float:
+        """P(damage >= hp)."""
+        return sum((p for d, p in zip(self.damage, self.probability) if d >= hp), 0.0)
+
+    def ko_in_two(self, hp: int) -> float:
+        """P(two uses deal at least `hp` in total)."""
+        return sum((p * self.at_least(hp - d) for d, p in zip(self.damage, self.probability)), 0.0)
+
+
+def _hit_distribution(x: float) -> dict:
+    """P(max(1, int(x * v))) for v uniform over the variance range."""
+    if x <= 0:
+        return {1: 1.0}
+    width = VARIANCE_HIGH - VARIANCE_LOW
+    hits = {}
+    for d in range(floor(x * VARIANCE_LOW), floor(x * VARIANCE_HIGH) + 1):
+        share = (min(VARIANCE_HIGH, (d + 1) / x) - max(VARIANCE_LOW, d / x)) / width
+        if share > 0:
+            hits[max(1, d)] = hits.get(max(1, d), 0.0) + share
+    return hits
+
+
+@lru_cache(maxsize=65536)
+def damage_distribution(power: int, accuracy: int, atk: int, level: int, defense: int,
+                        type_mult: float) -> DamageDistribution:
+    """Distribution of one use of a `power`/`accuracy` ability, by the calculate_damage formula."""
+    hit_chance = min(max(accuracy, 0), 100) / 100
+    if power == 0:
+        hits = {1: 1.0}  # calculate_damage gives 0, which take_damage raises to 1
+    else:
+        base_damage = power * ((atk + 50) / (defense + 50)) * (1 + level * 0.1) * 0.5
+        hits = _hit_distribution(base_damage * type_mult)
+    outcomes = {d: p * hit_chance for d, p in hits.items()}
+    if hit_chance < 1:
+        outcomes[0] = 1 - hit_chance
+    damage = tuple(sorted(outcomes))
+    return DamageDistribution(damage, tuple(outcomes[d] for d in damage))
+
+
+def ability_damage(attacker: Creature, ability: Ability, defender: Creature) -> DamageDistribution:
+    return damage_distribution(ability.power, ability.accuracy, attacker.atk, attacker.level, defender.defense,
+                               get_type_multiplier(ability.element, defender.element))
+
+
+@dataclass(frozen=True)
+class DamageOutlook:
+    expected: float
+    ko_one_hit: float  # P(this use knocks the target out)
+    ko_two_hits: float  # P(two uses in a row knock it out)
+
+
+@lru_cache(maxsize=65536)
+def _outlook(power: int, accuracy: int, atk: int, level: int, defense: int, type_mult: float,
+             hp: int) -> DamageOutlook:
+    distribution = damage_distribution(power, accuracy, atk, level, defense, type_mult)
+    return DamageOutlook(distribution.expected, distribution.at_least(hp), distribution.ko_in_two(hp))
+
+
+def damage_outlook(attacker: Creature, ability: Ability, defender: Creature) -> DamageOutlook:
+    """Expected damage and KO chances of `ability` on `defender` at its current HP."""
+    return _outlook(ability.power, ability.accuracy, attacker.atk, attacker.level, defender.defense,
+                    get_type_multiplier(ability.element, defender.element), defender.current_hp)
@@ -0,0 +1,73 @@
+# Wild encounter tables per terrain, sampled with the alias method
+from dataclasses import dataclass
+from typing import List, Tuple
+import random
+
+import numpy as np
+
+from creature import (Creature, TYPE_AIR, TYPE_EARTH, TYPE_FIRE, TYPE_ICE, TYPE_LIGHTNING, TYPE_NATURE,
+                      TYPE_SHADOW, TYPE_WATER, g_species_by_id, g_species_ids)
+from sampling import AliasTable
+from world import TERRAIN_FOREST, TERRAIN_GRASS, TERRAIN_WATER
+
+
+# How likely each element is to appear on each terrain (elements not listed don't appear)
+g_terrain_element_weights = {
+    TERRAIN_GRASS: {TYPE_NATURE: 4, TYPE_EARTH: 3, TYPE_AIR: 3, TYPE_LIGHTNING: 2, TYPE_FIRE: 1},
+    TERRAIN_WATER: {TYPE_WATER: 6, TYPE_ICE: 3, TYPE_LIGHTNING: 1},
+    TERRAIN_FOREST: {TYPE_NATURE: 4, TYPE_SHADOW: 3, TYPE_EARTH: 2, TYPE_FIRE: 2, TYPE_AIR: 1},
+}
+
+# Wild level range per terrain; levels near the middle are the most common
+g_terrain_levels = {
+    TERRAIN_GRASS: (2, 6),
+    TERRAIN_WATER: (3, 8),
+    TERRAIN_FOREST: (4, 10),
+}
+
+
+@dataclass(frozen=True)
+class EncounterTable:
+    terrain: int
+    species_ids: np.ndarray  # global species ids (see creature.g_species_ids)
+    species_alias: AliasTable
+    levels: np.ndarray
+    level_alias: AliasTable
+
+    def draw(self, rng: random.Random) -> Tuple[int, int]:
+        """One (species id, level) encounter."""
+        return (int(self.species_ids[self.species_alias.sample(rng)]),
+                int(self.levels[self.level_alias.sample(rng)]))
+
+    def draw_many(self, rng: np.random.Generator, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """`size` encounters at once, as (species ids, levels) arrays."""
+        return (self.species_ids[self.species_alias.sample_many(rng, size)],
+                self.levels[self.level_alias.sample_many(rng, size)])
+
+    def spawn(self, rng: random.Random) -> Creature:
+        species_id, level = self.draw(rng)
+        return Creature(g_species_by_id[species_id], level=level)
+
+
+def build_encounter_table(terrain: int) -> EncounterTable:
+    element_weights = g_terrain_element_weights[terrain]
+    species = [s for s in g_species_by_id if s.element in element_weights]
+    low, high = g_terrain_levels[terrain]
+    levels = np.arange(low, high + 1)
+    level_weights = 1 + np.minimum(levels - low, high - levels)  # triangular
+    return EncounterTable(
+        terrain=terrain,
+        species_ids=np.array([g_species_ids[s] for s in species]),
+        species_alias=AliasTable([element_weights[s.element] for s in species]),
+        levels=levels,
+        level_alias=AliasTable(level_weights),
+    )
+
+
+# Built once per process and shared by every session
+g_encounter_tables = {terrain: build_encounter_table(terrain) for terrain in g_terrain_element_weights}
+
+
+def spawn_wild_team(terrain: int, size: int, rng: random.Random) -> List[Creature]:
+    table = g_encounter_tables[terrain]
+    return [table.spawn(rng) for _ in range(size)]
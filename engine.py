@@ -0,0 +1,337 @@
+# Headless double battle engine (no Streamlit imports)
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence, TextIO, Tuple
+import json
+import os
+import random
+
+from creature import Ability, Creature, g_ability_ids, g_species, create_creature
+
+SIDE_PLAYER = "player"
+SIDE_ENEMY = "enemy"
+
+# Event types recorded in the battle log
+EVENT_START = "start"
+EVENT_ATTACK = "attack"
+EVENT_FAINT = "faint"
+EVENT_VICTORY = "victory"
+EVENT_DEFEAT = "defeat"
+
+
+class CountingRandom(random.Random):
+    """random.Random that counts primitive draws, so a position in the stream can be recorded."""
+
+    def __init__(self, seed=None):
+        self.draws = 0
+        super().__init__(seed)
+
+    def random(self) -> float:
+        self.draws += 1
+        return super().random()
+
+    def getrandbits(self, k: int) -> int:
+        self.draws += 1
+        return super().getrandbits(k)
+
+
+@dataclass
+class Action:
+    ability: Ability
+    target: int  # index into the opposing team
+
+
+# An AI picks one action (or None) per creature on its team
+AIFunction = Callable[["Battle", List[Creature], List[Creature]], List[Optional[Action]]]
+
+
+def random_ai(battle: "Battle", team: List[Creature], opponents: List[Creature]) -> List[Optional[Action]]:
+    """Random ability on a random alive opponent, for every alive creature."""
+    actions = []
+    for creature in team:
+        alive_targets = [i for i, o in enumerate(opponents) if o.is_alive()]
+        if creature.is_alive() and alive_targets and creature.abilities:
+            target = battle.rng.choice(alive_targets)
+            ability = battle.rng.choice(creature.abilities)
+            actions.append(Action(ability, target))
+        else:
+            actions.append(None)
+    return actions
+
+
+def format_event(event: dict) -> str:
+    """Turn a battle log event into its display text."""
+    kind = event["type"]
+    if kind == EVENT_ATTACK:
+        if not event["hit"]:
+            return f"{event['attacker']}'s {event['ability']} missed!"
+        effectiveness = ""
+        if event["type_effectiveness"] > 1:
+            effectiveness = " It's super effective!"
+        elif event["type_effectiveness"] < 1:
+            effectiveness = " It's not very effective..."
+        return f"{event['attacker']} used {event['ability']} on {event['defender']} for {event['damage']} damage!{effectiveness}"
+    if kind == EVENT_FAINT:
+        return f"{event['creature']} fainted!"
+    if kind == EVENT_VICTORY:
+        return "🎉 Victory! You won the battle!"
+    if kind == EVENT_DEFEAT:
+        return "💀 Defeat... Your team was wiped out."
+    return "Battle started!"
+
+
+class BattleLog:
+    """The last `maxlen` battle events, formatted into text only when read.
+
+    Events go into a list that is cut back to its last `maxlen` entries whenever it
+    reaches twice that, by replacing the list rather than editing it. A snapshot can
+    therefore keep a reference to the list and its length, and rewinding only
+    drops the events recorded since.
+
+    With `spill_path`, every event is also appended to that file as a JSON line,
+    keeping the full history outside session memory.
+    """
+
+    def __init__(self, maxlen: int = 50, spill_path: Optional[str] = None):
+        self.maxlen = maxlen
+        self.buffer: List[dict] = []  # the retained events are its last `maxlen`
+        self.total = 0  # events ever recorded, including those dropped from the buffer
+        self.spill_path = spill_path
+        self.spilled = os.path.getsize(spill_path) if spill_path and os.path.exists(spill_path) else 0  # bytes
+        self._spill: Optional[TextIO] = open(spill_path, "a") if spill_path else None
+
+    @property
+    def events(self) -> List[dict]:
+        return self.buffer[-self.maxlen:]
+
+    def append(self, event: dict):
+        self.buffer.append(event)
+        if len(self.buffer) >= 2 * self.maxlen:
+            self.buffer = self.buffer[-self.maxlen:]  # a new list: snapshots keep the old one
+        self.total += 1
+        if self._spill is not None:
+            line = json.dumps(event) + "\n"  # ASCII, so one byte per character
+            self._spill.write(line)
+            self.spilled += len(line)
+
+    def rewind(self, buffer: List[dict], length: int, total: int, spilled: int):
+        """Go back to when `buffer` held `length` events (see Battle.restore); the spill file is cut back too."""
+        if len(buffer) < length:
+            raise ValueError("The log was already rewound past this point")
+        del buffer[length:]  # only the events recorded since
+        self.buffer = buffer
+        self.total = total
+        if self.spill_path and spilled != self.spilled:
+            self.close()
+            os.truncate(self.spill_path, spilled)
+            self._spill = open(self.spill_path, "a")
+            self.spilled = spilled
+
+    def tail(self, n: int) -> List[str]:
+        """The last `n` retained events as display text."""
+        return [format_event(event) for event in self.buffer[-min(n, self.maxlen):]] if n > 0 else []
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def __len__(self) -> int:
+        return min(len(self.buffer), self.maxlen)
+
+    def __iter__(self) -> Iterator[str]:
+        return (format_event(event) for event in self.events)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [format_event(event) for event in self.events[index]]
+        return format_event(self.events[index])
+
+
+def read_spilled_log(path: str) -> Iterator[dict]:
+    """Events from a BattleLog spill file, oldest first."""
+    with open(path) as f:
+        for line in f:
+            yield json.loads(line)
+
+
+@dataclass(frozen=True)
+class BattleSnapshot:
+    """The mutable state of a Battle at one point; everything else is shared with the live battle."""
+    creatures: Tuple[Tuple[int, int, int], ...]  # (current HP, level, experience) per slot
+    turn: int
+    winner: Optional[str]
+    rng_state: Optional[tuple]  # None if the snapshot leaves the RNG alone
+    rng_draws: Optional[int]  # CountingRandom's position, if the battle uses one
+    log_buffer: List[dict]  # the log's event list (shared, see BattleLog) and its length at the time
+    log_length: int
+    log_total: int
+    log_spilled: int
+
+
+class Battle:
+    """A double battle between two teams with its own RNG, resolved one turn per `step()`."""
+
+    def __init__(self, player_team: List[Creature], enemy_team: List[Creature],
+                 rng: Optional[random.Random] = None, seed: Optional[int] = None,
+                 enemy_ai: AIFunction = random_ai, log_size: int = 50, log_spill_path: Optional[str] = None):
+        self.player_team = player_team
+        self.enemy_team = enemy_team
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.enemy_ai = enemy_ai
+        self.turn = 1
+        self.winner: Optional[str] = None
+        self.log = BattleLog(log_size, log_spill_path)
+        self.listeners: List[Callable[[dict], None]] = []  # called with every event as it happens
+        self._record({"type": EVENT_START})
+
+    @classmethod
+    def random_battle(cls, team_size: int = 2, level: int = 5, seed: Optional[int] = None,
+                      rng: Optional[random.Random] = None, **kwargs) -> "Battle":
+        """A battle between two teams of randomly picked species."""
+        rng = rng if rng is not None else random.Random(seed)
+        names = list(g_species)
+        player_picks = rng.sample(names, team_size)
+        enemy_picks = rng.sample(names, team_size)
+        return cls(
+            [create_creature(name, level) for name in player_picks],
+            [create_creature(name, level) for name in enemy_picks],
+            rng=rng, **kwargs,
+        )
+
+    @property
+    def is_over(self) -> bool:
+        return self.winner is not None
+
+    @property
+    def combatants(self) -> List[Creature]:
+        """Every creature by slot: player team first, then enemy team."""
+        return self.player_team + self.enemy_team
+
+    def _record(self, event: dict) -> dict:
+        event["turn"] = self.turn
+        self.log.append(event)
+        for listener in self.listeners:
+            listener(event)
+        return event
+
+    def step(self, player_actions: Sequence[Optional[Action]],
+             enemy_actions: Optional[Sequence[Optional[Action]]] = None) -> List[dict]:
+        """Resolve one turn and return its events.
+
+        `player_actions` has one entry per player creature (None to skip). Enemy
+        actions come from `enemy_ai` unless given explicitly.
+        """
+        if self.is_over:
+            return []
+        if enemy_actions is None:
+            enemy_actions = self.enemy_ai(self, self.enemy_team, self.player_team)
+
+        # Gather all combatants with their actions, as (attacker slot, ability, target slot, opposing slots)
+        combatants = self.combatants
+        player_slots = range(len(self.player_team))
+        enemy_slots = range(len(self.player_team), len(combatants))
+        actions = []
+        for slots, opponent_slots, team_actions in ((player_slots, enemy_slots, player_actions),
+                                                    (enemy_slots, player_slots, enemy_actions)):
+            for slot, action in zip(slots, team_actions):
+                if action and action.ability is not None and combatants[slot].is_alive():
+                    actions.append((slot, action.ability, opponent_slots[action.target], opponent_slots))
+
+        # Sort by speed (faster goes first)
+        actions.sort(key=lambda x: combatants[x[0]].spd, reverse=True)
+
+        events = []
+        for attacker_slot, ability, defender_slot, opponent_slots in actions:
+            attacker = combatants[attacker_slot]
+            if not attacker.is_alive():
+                continue  # skip if attacker fainted
+            if not combatants[defender_slot].is_alive():
+                # Retarget to another alive opponent
+                alive_targets = [s for s in opponent_slots if combatants[s].is_alive()]
+                if not alive_targets:
+                    continue
+                defender_slot = self.rng.choice(alive_targets)
+            defender = combatants[defender_slot]
+
+            result = attacker.use_ability(ability, defender, self.rng)
+            result["type"] = EVENT_ATTACK
+            result["attacker_slot"] = attacker_slot
+            result["defender_slot"] = defender_slot
+            result["ability_id"] = g_ability_ids.get(ability, -1)
+            events.append(self._record(result))
+            if result["defender_fainted"]:
+                events.append(self._record({"type": EVENT_FAINT, "creature": defender.name, "slot": defender_slot}))
+
+        # Check win/lose conditions
+        if not any(c.is_alive() for c in self.enemy_team):
+            self.winner = SIDE_PLAYER
+            events.append(self._record({"type": EVENT_VICTORY}))
+        elif not any(c.is_alive() for c in self.player_team):
+            self.winner = SIDE_ENEMY
+            events.append(self._record({"type": EVENT_DEFEAT}))
+        else:
+            self.turn += 1
+        if self.is_over:
+            self.log.close()
+        return events
+
+    def snapshot(self, include_rng: bool = True) -> BattleSnapshot:
+        """Copy of the state step() changes: per-creature fields, turn, winner, log position and RNG.
+
+        Species, abilities and the log's events are shared, not copied, so without
+        the RNG a snapshot is O(team size). Copying the RNG's 625-word state costs
+        more than the rest together; branches that draw from their own RNG can leave
+        it out.
+        """
+        rng, log = self.rng, self.log
+        return BattleSnapshot(
+            tuple((c.current_hp, c.level, c.experience) for c in self.combatants),
+            self.turn, self.winner,
+            rng.getstate() if include_rng else None, getattr(rng, "draws", None) if include_rng else None,
+            log.buffer, len(log.buffer), log.total, log.spilled,
+        )
+
+    def restore(self, snapshot: BattleSnapshot):
+        """Put the battle back to `snapshot`, taken from this battle.
+
+        Restoring only goes back: a snapshot taken after `snapshot` can't be
+        restored once `snapshot` has been.
+        """
+        for creature, (hp, level, experience) in zip(self.combatants, snapshot.creatures):
+            creature.current_hp, creature.level, creature.experience = hp, level, experience
+        self.turn, self.winner = snapshot.turn, snapshot.winner
+        if snapshot.rng_state is not None:
+            self.rng.setstate(snapshot.rng_state)
+        if snapshot.rng_draws is not None:
+            self.rng.draws = snapshot.rng_draws
+        self.log.rewind(snapshot.log_buffer, snapshot.log_length, snapshot.log_total, snapshot.log_spilled)
+
+    def preview(self, player_actions: Sequence[Optional[Action]],
+                enemy_actions: Optional[Sequence[Optional[Action]]] = None,
+                rng: Optional[random.Random] = None) -> Tuple[List[dict], List[int]]:
+        """Play one turn on a branch and roll it back; returns its events and every slot's HP after it.
+
+        The branch draws from `rng` (a fresh, unseeded one by default), so a preview
+        shows one possible outcome, not the rolls the real turn will get. Enemy
+        actions default to random_ai's picks rather than `enemy_ai`'s, which keeps a
+        preview cheap and doesn't give away what a search AI will do. Listeners
+        aren't told about the branch's events.
+        """
+        snapshot = self.snapshot(include_rng=False)
+        real_rng, listeners = self.rng, self.listeners
+        self.rng, self.listeners = rng if rng is not None else random.Random(), []
+        try:
+            if enemy_actions is None:
+                enemy_actions = random_ai(self, self.enemy_team, self.player_team)
+            events = self.step(player_actions, enemy_actions)
+            hp = [c.current_hp for c in self.combatants]
+        finally:
+            self.rng, self.listeners = real_rng, listeners
+            self.restore(snapshot)
+        return events, hp
+
+    def run(self, player_ai: AIFunction = random_ai, max_turns: int = 200) -> Optional[str]:
+        """Play to completion with AIs on both sides; returns the winner (None if unfinished)."""
+        while not self.is_over and self.turn <= max_turns:
+            self.step(player_ai(self, self.player_team, self.enemy_team))
+        return self.winner
@@ -0,0 +1,260 @@
+# Deterministic creature fusion backed by a precomputed species x species table
+#
+# Fusing species A (primary) with species B gives:
+#   - a special species, for the combinations listed in g_special_fusions, or
+#   - a derived species: A's element, the average of both parents' base stats plus
+#     a 10% fusion bonus, A's first ability plus B's strongest ability (preferring one
+#     of another element), a name spliced from both parents and both sprites. The
+#     splice is moved off the middle of the names when needed so that no two species
+#     share a name.
+# Every result is computed once into NumPy arrays indexed [A id, B id], including
+# its stat totals at every level, so looking up or scoring a fusion is an array read.
+# Only base species can be fused; fusion results get IDs after the base species.
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from creature import (MAX_LEVEL, TYPE_AIR, TYPE_EARTH, TYPE_ICE, TYPE_LIGHTNING, TYPE_NATURE, TYPE_SHADOW,
+                      TYPE_WATER, Creature, Species, g_abilities, g_element_ids, g_elements, g_species,
+                      g_species_by_id, g_species_ids)
+
+FUSION_STAT_BONUS = 1.1
+
+# Special combinations (in either order) and the species they produce
+g_special_fusions = {
+    ("emberling", "frostpup"): Species(
+        name="Steamwhelp", element=TYPE_WATER,
+        base_hp=60, base_atk=60, base_def=55, base_spd=65,
+        abilities=(g_abilities["tidal_wave"], g_abilities["ember"]),
+        sprite_path="♨️", description="A pup wreathed in scalding steam, born of fire and frost.",
+    ),
+    ("phoenixlet", "duskcat"): Species(
+        name="Eclipsewing", element=TYPE_SHADOW,
+        base_hp=50, base_atk=70, base_def=40, base_spd=80,
+        abilities=(g_abilities["dark_pulse"], g_abilities["flame_burst"]),
+        sprite_path="🌘", description="A black firebird that blots out the sun.",
+    ),
+    ("thunderwolf", "stormbat"): Species(
+        name="Tempestwolf", element=TYPE_LIGHTNING,
+        base_hp=55, base_atk=70, base_def=45, base_spd=70,
+        abilities=(g_abilities["thunderbolt"], g_abilities["hurricane"]),
+        sprite_path="🌩️", description="A winged wolf that runs ahead of the storm.",
+    ),
+    ("sproutling", "pebblehog"): Species(
+        name="Mossgolem", element=TYPE_NATURE,
+        base_hp=75, base_atk=55, base_def=75, base_spd=35,
+        abilities=(g_abilities["solar_beam"], g_abilities["earthquake"]),
+        sprite_path="🗿", description="A boulder giant overgrown with ancient moss.",
+    ),
+    ("glacialbear", "boulderback"): Species(
+        name="Permafrost", element=TYPE_ICE,
+        base_hp=85, base_atk=55, base_def=75, base_spd=25,
+        abilities=(g_abilities["blizzard"], g_abilities["earthquake"]),
+        sprite_path="🏔️", description="A living glacier that grinds mountains flat.",
+    ),
+    ("breezewing", "cloudhopper"): Species(
+        name="Skysovereign", element=TYPE_AIR,
+        base_hp=55, base_atk=60, base_def=45, base_spd=80,
+        abilities=(g_abilities["hurricane"], g_abilities["gust"]),
+        sprite_path="🪽", description="It has never once touched the ground.",
+    ),
+    ("tunnelmole", "voidspider"): Species(
+        name="Abyssdigger", element=TYPE_EARTH,
+        base_hp=60, base_atk=70, base_def=60, base_spd=40,
+        abilities=(g_abilities["earthquake"], g_abilities["dark_pulse"]),
+        sprite_path="🕳️", description="It tunnels so deep that light never follows.",
+    ),
+}
+
+g_ability_list = tuple(g_abilities.values())
+g_ability_index = {ability: i for i, ability in enumerate(g_ability_list)}
+
+N_BASE_SPECIES = len(g_species_by_id)
+
+
+@lru_cache(maxsize=None)
+def _splice_points(len_a: int, len_b: int) -> Tuple[Tuple[int, int], ...]:
+    """(A prefix length, B suffix start) pairs, nearest to both names' middles first."""
+    middle = ((len_a + 1) // 2, len_b // 2)
+    points = [(i, j) for i in range(2, len_a) for j in range(1, len_b - 1)]
+    return tuple(sorted(points, key=lambda p: (abs(p[0] - middle[0]) + abs(p[1] - middle[1]), p)))
+
+
+def fused_name(a: Species, b: Species, taken: Set[str]) -> str:
+    """A's first half plus B's second half, spliced elsewhere if that name is in `taken` (lowercase)."""
+    for i, j in _splice_points(len(a.name), len(b.name)):
+        name = a.name[:i] + b.name[j:].lower()
+        if name.lower() not in taken:
+            return name
+    name = a.name[:(len(a.name) + 1) // 2] + b.name[len(b.name) // 2:].lower()
+    return next(f"{name}{n}" for n in range(2, len(taken) + 3) if f"{name}{n}".lower() not in taken)
+
+
+def inherited_abilities(a: Species, b: Species) -> tuple:
+    """A's first ability plus B's strongest, preferring one of an element A's ability doesn't cover."""
+    first = a.abilities[0]
+    candidates = sorted(b.abilities, key=lambda ab: (ab.element == first.element, -ab.power))
+    second = next((ab for ab in candidates if ab != first), None)
+    return (first,) if second is None else (first, second)
+
+
+class FusionTable:
+    """Every species x species fusion result, precomputed into arrays indexed [A id, B id]."""
+
+    def __init__(self):
+        n = N_BASE_SPECIES
+        names = list(g_species)
+        base = np.array([[s.base_hp, s.base_atk, s.base_def, s.base_spd] for s in g_species_by_id])
+
+        # Derived fusions, all pairs at once
+        self.base_stats = (((base[:, None, :] + base[None, :, :]) / 2) * FUSION_STAT_BONUS).astype(np.int16)
+        self.element_ids = np.repeat(np.array([g_element_ids[s.element] for s in g_species_by_id])[:, None], n, axis=1)
+        self.ability_ids = np.full((n, n, 2), -1, dtype=np.int16)
+        self.special = np.zeros((n, n), dtype=bool)
+        self.species = [[None] * n for _ in range(n)]  # special species objects, else None until materialized
+        for i, a in enumerate(g_species_by_id):
+            for j, b in enumerate(g_species_by_id):
+                for k, ability in enumerate(inherited_abilities(a, b)):
+                    self.ability_ids[i, j, k] = g_ability_index[ability]
+
+        # Derived names, unique among base species, special results and each other
+        taken = {s.name.lower() for s in g_species_by_id} | {s.name.lower() for s in g_special_fusions.values()}
+        self.names = [[None] * n for _ in range(n)]
+        special_pairs = set(g_special_fusions) | {(second, first) for first, second in g_special_fusions}
+        for i, a in enumerate(g_species_by_id):
+            for j, b in enumerate(g_species_by_id):
+                if (names[i], names[j]) not in special_pairs:
+                    self.names[i][j] = fused_name(a, b, taken)
+                    taken.add(self.names[i][j].lower())
+
+        # Special combination overrides
+        for (first, second), result in g_special_fusions.items():
+            for i, j in ((names.index(first), names.index(second)), (names.index(second), names.index(first))):
+                self.special[i, j] = True
+                self.species[i][j] = result
+                self.base_stats[i, j] = (result.base_hp, result.base_atk, result.base_def, result.base_spd)
+                self.element_ids[i, j] = g_element_ids[result.element]
+                self.ability_ids[i, j] = -1
+                for k, ability in enumerate(result.abilities[:2]):
+                    self.ability_ids[i, j, k] = g_ability_index[ability]
+
+        # Stats at every level, same growth as Species: HP 10%, ATK/DEF 8%, SPD 5% per level
+        growth = np.array([0.1, 0.08, 0.08, 0.05])
+        levels = np.arange(MAX_LEVEL + 1)
+        scale = 1 + (levels[:, None] - 1) * growth[None, :]  # (level, stat)
+        self.stats_by_level = (self.base_stats[:, :, None, :] * scale[None, None, :, :]).astype(np.int32)
+        self.totals_by_level = self.stats_by_level.sum(axis=3)  # (A, B, level)
+
+    def result_species(self, a: int, b: int) -> Species:
+        """The species produced by fusing base species `a` (primary) with `b`."""
+        return _materialize(a, b)
+
+    def score_pairs(self, species_ids: np.ndarray, levels: np.ndarray) -> np.ndarray:
+        """Stat total of every fusion in a collection, as an (N, N) matrix.
+
+        Entry [i, j] is creature i fused with creature j (i primary). Pairs that
+        can't be fused (the same creature, or either one already a fusion) are -1.
+        """
+        species_ids = np.asarray(species_ids)
+        levels = np.asarray(levels)
+        fusable = species_ids < N_BASE_SPECIES
+        safe = np.where(fusable, species_ids, 0)
+        fused_levels = fusion_level(levels[:, None], levels[None, :])
+        scores = self.totals_by_level[safe[:, None], safe[None, :], fused_levels]
+        valid = fusable[:, None] & fusable[None, :]
+        np.fill_diagonal(valid, False)
+        return np.where(valid, scores, -1)
+
+    def best_fusions(self, species_ids: np.ndarray, levels: np.ndarray, count: int = 5) -> List[Tuple[int, int, int]]:
+        """The `count` highest-scoring (i, j, score) fusions in a collection.
+
+        A fusion's stats never drop as either parent's level rises, so every pair in
+        the top `count` uses one of the `count + 1` highest-level creatures of each
+        species. Only those candidates are scored, which keeps this fast for
+        collections of any size.
+        """
+        species_ids = np.asarray(species_ids)
+        levels = np.asarray(levels)
+        order = np.lexsort((-levels, species_ids))
+        sorted_species = species_ids[order]
+        group_start = np.searchsorted(sorted_species, sorted_species, side="left")
+        rank = np.arange(len(order)) - group_start
+        candidates = np.sort(order[rank <= count])
+
+        scores = self.score_pairs(species_ids[candidates], levels[candidates])
+        flat = scores.ravel()
+        count = min(count, int((flat >= 0).sum()))
+        if count == 0:
+            return []
+        top = np.argpartition(-flat, count - 1)[:count]
+        top = top[np.argsort(-flat[top], kind="stable")]
+        n = len(candidates)
+        return [(int(candidates[k // n]), int(candidates[k % n]), int(flat[k])) for k in top]
+
+
+def fusion_level(level_a, level_b):
+    """Level of a fusion: the parents' average, rounded down."""
+    return (level_a + level_b) // 2
+
+
+# IDs of fusion results materialized so far (special results map to their first ID)
+g_fused_species_ids = {}
+
+
+@lru_cache(maxsize=None)
+def _materialize(a: int, b: int) -> Species:
+    table = g_fusion_table
+    if table.special[a, b]:
+        species = table.species[a][b]
+    else:
+        species = _derived_species(a, b)
+    g_fused_species_ids.setdefault(species, fusion_species_id(a, b))
+    return species
+
+
+def _derived_species(a: int, b: int) -> Species:
+    table = g_fusion_table
+    first, second = g_species_by_id[a], g_species_by_id[b]
+    hp, atk, defense, spd = (int(v) for v in table.base_stats[a, b])
+    return Species(
+        name=table.names[a][b],
+        element=g_elements[table.element_ids[a, b]],
+        base_hp=hp, base_atk=atk, base_def=defense, base_spd=spd,
+        abilities=tuple(g_ability_list[k] for k in table.ability_ids[a, b] if k >= 0),
+        sprite_path=f"{first.sprite_path}{second.sprite_path}",
+        description=f"A fusion of {first.name} and {second.name}.",
+    )
+
+
+def fusion_species_id(a: int, b: int) -> int:
+    """ID of a fusion result, placed after the base species IDs."""
+    return N_BASE_SPECIES + a * N_BASE_SPECIES + b
+
+
+def get_species_by_id(species_id: int) -> Species:
+    """Base species or fusion result by ID."""
+    if species_id < N_BASE_SPECIES:
+        return g_species_by_id[species_id]
+    a, b = divmod(species_id - N_BASE_SPECIES, N_BASE_SPECIES)
+    return _materialize(a, b)
+
+
+def get_species_id(species: Species) -> Optional[int]:
+    """ID of a base species or fusion result (None if unknown)."""
+    species_id = g_species_ids.get(species)
+    if species_id is not None:
+        return species_id
+    return g_fused_species_ids.get(species)
+
+
+def fuse(primary: Creature, secondary: Creature) -> Creature:
+    """Fuse two creatures of base species into a new one at their average level."""
+    a, b = g_species_ids.get(primary.species), g_species_ids.get(secondary.species)
+    if a is None or b is None:
+        raise ValueError(f"Only base species can be fused: {primary.name} + {secondary.name}")
+    return Creature(_materialize(a, b), level=fusion_level(primary.level, secondary.level))
+
+
+# Built once per process and shared by every session
+g_fusion_table = FusionTable()
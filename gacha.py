@@ -0,0 +1,213 @@
+# Item gacha: banners, rarity rates, pity and vectorized multi-pulls
+#
+# Only the top rarity has pity. Its rate on the n-th pull since the last top-rarity
+# item is the base rate until soft pity starts, then rises by `soft_pity_step` per
+# pull, and is 100% at hard pity. Because of that, the number of pulls between
+# top-rarity items follows a fixed distribution per starting counter, which is
+# precomputed as a CDF table. A multi-pull draws all of its gaps at once from that
+# table and fills the remaining slots from one alias table over the lower
+# rarities, so no pull is ever resolved in a Python loop.
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+import argparse
+
+import numpy as np
+
+from sampling import AliasTable
+
+# Rarity tiers
+RARITY_COMMON = 0
+RARITY_UNCOMMON = 1
+RARITY_RARE = 2
+RARITY_EPIC = 3
+RARITY_LEGENDARY = 4
+
+g_rarity_names = {
+    RARITY_COMMON: "Common", RARITY_UNCOMMON: "Uncommon", RARITY_RARE: "Rare",
+    RARITY_EPIC: "Epic", RARITY_LEGENDARY: "Legendary",
+}
+g_rarity_icons = {RARITY_COMMON: "⚪", RARITY_UNCOMMON: "🟢", RARITY_RARE: "🔵", RARITY_EPIC: "🟣", RARITY_LEGENDARY: "🟡"}
+
+
+@dataclass(frozen=True)
+class Item:
+    name: str
+    rarity: int
+    description: str = ""
+
+
+g_items = {
+    "potion": Item("Potion", RARITY_COMMON, description="Restores a little HP"),
+    "berry": Item("Oran Berry", RARITY_COMMON, description="A sweet, slightly healing berry"),
+    "smoke_ball": Item("Smoke Ball", RARITY_COMMON, description="Guarantees escape from a wild encounter"),
+    "super_potion": Item("Super Potion", RARITY_UNCOMMON, description="Restores a good amount of HP"),
+    "revive": Item("Revive", RARITY_UNCOMMON, description="Revives a fainted creature"),
+    "exp_candy": Item("Exp Candy", RARITY_UNCOMMON, description="Grants a burst of experience"),
+    "max_potion": Item("Max Potion", RARITY_RARE, description="Fully restores HP"),
+    "lure": Item("Rare Lure", RARITY_RARE, description="Attracts stronger wild creatures"),
+    "fire_stone": Item("Fire Stone", RARITY_EPIC, description="Radiates an everlasting warmth"),
+    "storm_stone": Item("Storm Stone", RARITY_EPIC, description="Crackles with trapped lightning"),
+    "shadow_stone": Item("Shadow Stone", RARITY_EPIC, description="Swallows the light around it"),
+    "fusion_core": Item("Fusion Core", RARITY_LEGENDARY, description="Makes any creature fusion possible"),
+    "golden_egg": Item("Golden Egg", RARITY_LEGENDARY, description="Something precious stirs inside"),
+}
+g_item_keys = tuple(g_items)
+g_item_ids = {key: i for i, key in enumerate(g_item_keys)}
+
+
+@dataclass(frozen=True)
+class Banner:
+    name: str
+    rarity_rates: Tuple[float, ...]  # advertised base rate per rarity tier, summing to 1
+    item_weights: Dict[str, float]  # relative weight of each item within its rarity
+    soft_pity_start: int = 60  # pull (since the last top-rarity item) where the top rate starts rising
+    soft_pity_step: float = 0.06  # added to the top rate per pull past soft pity
+    hard_pity: int = 80  # pull that always gives a top-rarity item
+
+    # Precomputed sampling tables
+    gap_cdf: np.ndarray = field(init=False, repr=False, compare=False)
+    lower_items: AliasTable = field(init=False, repr=False, compare=False)
+    lower_item_ids: np.ndarray = field(init=False, repr=False, compare=False)
+    top_items: AliasTable = field(init=False, repr=False, compare=False)
+    top_item_ids: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if abs(sum(self.rarity_rates) - 1.0) > 1e-9:
+            raise ValueError(f"Rarity rates of banner {self.name} sum to {sum(self.rarity_rates)}, not 1")
+        top = len(self.rarity_rates) - 1
+
+        # gap_cdf[c, n - 1]: chance the next top-rarity item comes within n pulls, having gone c pulls without one
+        rates = np.array([self.top_rate(pull) for pull in range(1, self.hard_pity + 1)])
+        gap_cdf = np.ones((self.hard_pity, self.hard_pity))
+        for c in range(self.hard_pity):
+            survive = np.cumprod(1 - rates[c:])
+            gap_cdf[c, :self.hard_pity - c] = 1 - survive
+        gap_cdf[:, -1] = 1.0
+        object.__setattr__(self, "gap_cdf", gap_cdf)
+
+        # One table over every lower-rarity item: rarity rate x item share within the rarity
+        def item_table(keys, tier_weight):
+            totals = {}
+            for key in keys:
+                totals[g_items[key].rarity] = totals.get(g_items[key].rarity, 0) + self.item_weights[key]
+            weights = [tier_weight(g_items[k].rarity) * self.item_weights[k] / totals[g_items[k].rarity] for k in keys]
+            return AliasTable(weights), np.array([g_item_ids[k] for k in keys])
+
+        lower = [k for k in self.item_weights if g_items[k].rarity < top]
+        upper = [k for k in self.item_weights if g_items[k].rarity == top]
+        lower_alias, lower_ids = item_table(lower, lambda r: self.rarity_rates[r])
+        top_alias, top_ids = item_table(upper, lambda r: 1.0)
+        object.__setattr__(self, "lower_items", lower_alias)
+        object.__setattr__(self, "lower_item_ids", lower_ids)
+        object.__setattr__(self, "top_items", top_alias)
+        object.__setattr__(self, "top_item_ids", top_ids)
+
+    @property
+    def top_rarity(self) -> int:
+        return len(self.rarity_rates) - 1
+
+    def top_rate(self, pull: int) -> float:
+        """Top-rarity chance on the `pull`-th pull since the last top-rarity item."""
+        if pull >= self.hard_pity:
+            return 1.0
+        base = self.rarity_rates[-1]
+        if pull < self.soft_pity_start:
+            return base
+        return min(1.0, base + (pull - self.soft_pity_start + 1) * self.soft_pity_step)
+
+    def expected_pulls_to_top(self, pity: int = 0) -> float:
+        """Exact mean number of pulls until the next top-rarity item."""
+        pmf = np.diff(self.gap_cdf[pity], prepend=0.0)
+        return float(np.sum(pmf * np.arange(1, self.hard_pity + 1)))
+
+    def pull(self, count: int, pity: int, rng: np.random.Generator) -> Tuple[np.ndarray, int]:
+        """`count` pulls for one player; returns (item ids, new pity counter)."""
+        items, new_pity = self.pull_many(1, count, np.array([pity]), rng)
+        return items[0], int(new_pity[0])
+
+    def pull_many(self, players: int, count: int, pity: np.ndarray,
+                  rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """`count` pulls for each of `players` players at once.
+
+        Returns a (players, count) array of item ids and each player's new pity counter.
+        """
+        # Gaps between top-rarity items: the first from each player's current counter, the rest from zero
+        u = rng.random((players, count))
+        first = (self.gap_cdf[pity] <= u[:, :1]).sum(axis=1) + 1
+        rest = np.searchsorted(self.gap_cdf[0], u[:, 1:], side="right") + 1
+        positions = np.cumsum(np.concatenate([first[:, None], rest], axis=1), axis=1)  # 1-based pull numbers
+
+        is_top = np.zeros((players, count + 1), dtype=bool)
+        rows, cols = np.nonzero(positions <= count)
+        is_top[rows, positions[rows, cols]] = True
+        is_top = is_top[:, 1:]
+
+        lower = self.lower_item_ids[self.lower_items.sample_many(rng, players * count)].reshape(players, count)
+        top = self.top_item_ids[self.top_items.sample_many(rng, players * count)].reshape(players, count)
+        items = np.where(is_top, top, lower)
+
+        # New counter: pulls since each player's last top-rarity item
+        last_top = np.where(is_top.any(axis=1), count - np.argmax(is_top[:, ::-1], axis=1), 0)
+        new_pity = np.where(is_top.any(axis=1), count - last_top, pity + count)
+        return items, new_pity
+
+
+g_item_rarities = np.array([g_items[k].rarity for k in g_item_keys])
+
+g_banners = {
+    "standard": Banner(
+        name="Standard Supplies",
+        rarity_rates=(0.55, 0.30, 0.10, 0.04, 0.01),
+        item_weights={k: 1.0 for k in g_item_keys},
+    ),
+    "fusion": Banner(
+        name="Fusion Festival",
+        rarity_rates=(0.50, 0.30, 0.12, 0.06, 0.02),
+        item_weights={**{k: 1.0 for k in g_item_keys}, "fusion_core": 3.0},  # rate-up
+        soft_pity_start=40, soft_pity_step=0.08, hard_pity=55,
+    ),
+}
+
+
+def simulate(banner: Banner, players: int, pulls: int, seed=None) -> dict:
+    """Monte Carlo over `players` fresh accounts doing `pulls` pulls each."""
+    rng = np.random.default_rng(seed)
+    items, _ = banner.pull_many(players, pulls, np.zeros(players, dtype=np.int64), rng)
+    rarities = g_item_rarities[items]
+    stats = {}
+    for rarity, advertised in enumerate(banner.rarity_rates):
+        hit = rarities == rarity
+        got_any = hit.any(axis=1)
+        first = np.argmax(hit, axis=1)[got_any] + 1
+        stats[rarity] = {
+            "advertised_rate": advertised,
+            "observed_rate": float(hit.mean()),
+            "mean_pulls_to_first": float(first.mean()) if len(first) else float("nan"),
+        }
+    stats[banner.top_rarity]["exact_pulls_to_first"] = banner.expected_pulls_to_top()
+    stats[banner.top_rarity]["exact_consolidated_rate"] = 1 / banner.expected_pulls_to_top()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo check of gacha banner rates.")
+    parser.add_argument("--banner", choices=list(g_banners), default="standard")
+    parser.add_argument("--players", type=int, default=100000)
+    parser.add_argument("--pulls", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    banner = g_banners[args.banner]
+    stats = simulate(banner, args.players, args.pulls, args.seed)
+    print(f"{banner.name}: {args.players * args.pulls} pulls")
+    print(f"{'rarity':<10} {'advertised':>10} {'observed':>9} {'pulls to first':>15}")
+    for rarity, s in stats.items():
+        print(f"{g_rarity_names[rarity]:<10} {s['advertised_rate']:>10.4f} {s['observed_rate']:>9.4f} "
+              f"{s['mean_pulls_to_first']:>15.2f}")
+    top = stats[banner.top_rarity]
+    print(f"{g_rarity_names[banner.top_rarity]} with pity: consolidated rate {top['exact_consolidated_rate']:.4f}, "
+          f"expected pulls {top['exact_pulls_to_first']:.2f} (exact)")
+
+
+if __name__ == "__main__":
+    main()
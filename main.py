@@ -1,7 +1,14 @@
+import os
 import streamlit as st
-import numpy as np
-from creature import get_creature_templates, create_creature, TYPE_FIRE, TYPE_WATER, TYPE_EARTH, TYPE_AIR, TYPE_LIGHTNING, TYPE_SHADOW, TYPE_NATURE, TYPE_ICE, get_type_multiplier
+from profiling import (export_timings_csv, export_timings_json, profiling_enabled, profiling_requested,
+                       reset_timings, set_profiling_enabled, timed, timer, timing_summary)
 import random
+import re
+import uuid
+
+# Game modules (creature, world, fusion, ...) load NumPy and build their shared tables
+# on import, so each screen imports what it uses and the menu renders without them.
+# `python startup.py serve` preloads all of them before the first session instead.
 
 st.set_page_config(
     page_title="Creature Collector",
@@ -17,21 +24,131 @@ SCREEN_COLLECTION = "collection"
 SCREEN_GACHA = "gacha"
 SCREEN_COMBINE = "combine"
 
+VIEW_RADIUS = 5  # world tiles shown on each side of the player
+ENCOUNTER_RATE = 0.1  # chance of a wild encounter per step
+START_POSITION = (5, 5)  # where a new game starts in the world
+
+# Enemy AI tiers: random_ai, or the lookahead search in ai.py with a per-decision budget
+AI_TIER_RANDOM = "random"
+AI_TIER_LOOKAHEAD = "lookahead"
+g_ai_tier_names = {AI_TIER_RANDOM: "Wild (random moves)", AI_TIER_LOOKAHEAD: "Tactical (lookahead)"}
+ENEMY_AI_BUDGET_MS = 20.0
+
+COLLECTION_PAGE_SIZE = 24  # creature cards per page of the collection screen
+g_collection_sort_names = {"level": "Level", "hp": "HP", "atk": "ATK", "def": "DEF", "spd": "SPD", "element": "Element"}
+
+# Optional persistent world file shared by every session (see terrain_store.py)
+WORLD_STORE_ENV = "CREATURE_COLLECTOR_WORLD"
+g_world_store = None
+if os.environ.get(WORLD_STORE_ENV):
+    from terrain_store import open_terrain_store
+    from world import attach_terrain_store
+    g_world_store = open_terrain_store(os.environ[WORLD_STORE_ENV])
+    attach_terrain_store(g_world_store)
+
+# Save files live here, one per save slot (see save.py)
+SAVE_DIR_ENV = "CREATURE_COLLECTOR_SAVES"
+SAVE_DIR = os.environ.get(SAVE_DIR_ENV, "saves")
+
 # Initialize session state
 if 'screen' not in st.session_state:
     st.session_state.screen = SCREEN_MENU
 if 'player_creatures' not in st.session_state:
-    st.session_state.player_creatures = []  # Will hold player's creature collection
+    st.session_state.player_creatures = None  # the player's CreatureCollection, created by owned_creatures()
 if 'player_items' not in st.session_state:
     st.session_state.player_items = []  # Will hold player's item collection
+if 'gacha_pity' not in st.session_state:
+    st.session_state.gacha_pity = {}  # pulls since the last top-rarity item, per banner
+if 'gacha_last_pull' not in st.session_state:
+    st.session_state.gacha_last_pull = []
 if 'player_x' not in st.session_state:
-    st.session_state.player_x = 5  # Starting X position in world grid
+    st.session_state.player_x = START_POSITION[0]  # Starting X position in world grid
 if 'player_y' not in st.session_state:
-    st.session_state.player_y = 5  # Starting Y position in world grid
-if 'world_grid' not in st.session_state:
-    # Initialize a simple 10x10 world grid (0 = grass, 1 = water, 2 = forest)
-    st.session_state.world_grid = np.random.choice([0, 1, 2], size=(10, 10), p=[0.5, 0.2, 0.3])
-
+    st.session_state.player_y = START_POSITION[1]  # Starting Y position in world grid
+if 'wild_team' not in st.session_state:
+    st.session_state.wild_team = None  # wild creatures met while exploring, until fought or fled
+if 'world_seed' not in st.session_state:
+    # The world is generated from this seed chunk by chunk; only the seed and position live in the session
+    if g_world_store is not None:
+        st.session_state.world_seed = g_world_store.seed
+    else:
+        st.session_state.world_seed = random.randrange(2**31 - 1)
+
+def save_path(slot: str) -> str:
+    return os.path.join(SAVE_DIR, re.sub(r"[^A-Za-z0-9_-]", "_", slot) + ".sav")
+
+def owned_creatures():
+    """The player's creature collection (column-wise arrays, see collection.py), created on first use."""
+    if st.session_state.player_creatures is None:
+        from collection import CreatureCollection
+        st.session_state.player_creatures = CreatureCollection()
+    return st.session_state.player_creatures
+
+def current_save_state():
+    from save import SaveState
+    return SaveState(
+        world_seed=st.session_state.world_seed,
+        player_x=st.session_state.player_x,
+        player_y=st.session_state.player_y,
+        creatures=owned_creatures(),
+        items=st.session_state.player_items,
+        gacha_pity=st.session_state.gacha_pity,
+    )
+
+def is_new_game() -> bool:
+    """Nothing worth saving yet: no creatures, items or pulls, and still on the starting tile."""
+    state = st.session_state
+    return (not state.player_creatures and not state.player_items and not any(state.gacha_pity.values())
+            and (state.player_x, state.player_y) == START_POSITION)
+
+def new_save_slot() -> str:
+    """A slot name no other session uses, so each new game autosaves to its own file."""
+    return f"game-{uuid.uuid4().hex[:8]}"
+
+def open_save_slot(slot: str) -> bool:
+    """Switch to a save slot: load it if it exists, and autosave to it from now on.
+
+    A save that can't be loaded is left untouched, and the session stays on its current slot.
+    """
+    path = save_path(slot)
+    writer = None
+    if os.path.exists(path):
+        from save import encode, find_save_writer, get_save_writer, load_game
+        existing = find_save_writer(path)
+        if existing is not None:
+            existing.flush()  # another session may have a write of this slot in flight
+        try:
+            state = load_game(path)
+        except (OSError, ValueError) as e:
+            st.error(f"Can't load save slot {slot!r}: {e}")
+            return False
+        st.session_state.world_seed = state.world_seed
+        st.session_state.player_x = state.player_x
+        st.session_state.player_y = state.player_y
+        st.session_state.player_creatures = state.creatures
+        st.session_state.player_items = state.items
+        st.session_state.gacha_pity = state.gacha_pity
+        writer = get_save_writer(path)
+        writer.mark_written(encode(state))
+    st.session_state.save_slot = slot
+    st.session_state.save_writer = writer  # None: set by the first autosave with something to save
+    return True
+
+def autosave():
+    """Hand this rerun's state to the save writer thread; only changed records reach the disk."""
+    if st.session_state.save_writer is None:
+        if is_new_game():
+            return
+        from save import get_save_writer
+        os.makedirs(SAVE_DIR, exist_ok=True)
+        st.session_state.save_writer = get_save_writer(save_path(st.session_state.save_slot))
+    from save import encode
+    st.session_state.save_writer.submit(encode(current_save_state()))
+
+if 'save_slot' not in st.session_state:
+    open_save_slot(new_save_slot())
+
+@timed("screen:menu")
 def show_menu():
     st.title("Creature Collector")
     st.header("Main Menu")
@@ -60,28 +177,46 @@ def show_menu():
             st.session_state.screen = SCREEN_COMBINE
             st.rerun()
 
+def move_player(dx: int, dy: int):
+    """Step the player and roll for a wild encounter on the new tile."""
+    from encounters import spawn_wild_team
+    from world import terrain_at
+    st.session_state.player_x += dx
+    st.session_state.player_y += dy
+    if random.random() < ENCOUNTER_RATE:
+        terrain = terrain_at(st.session_state.world_seed, st.session_state.player_x, st.session_state.player_y)
+        st.session_state.wild_team = spawn_wild_team(terrain, 2, random)
+
+@timed("screen:world")
 def show_world():
+    from world import g_terrain_names, render_viewport, terrain_at
+
     st.title("World Exploration")
 
+    # Wild encounter
+    if st.session_state.wild_team:
+        names = " and ".join(f"{c.sprite_path} {c.name} (Lv.{c.level})" for c in st.session_state.wild_team)
+        st.warning(f"Wild {names} appeared!")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Fight!", use_container_width=True):
+                init_battle(st.session_state.wild_team)
+                st.session_state.wild_team = None
+                st.session_state.screen = SCREEN_BATTLE
+                st.rerun()
+        with col2:
+            if st.button("Run away", use_container_width=True):
+                st.session_state.wild_team = None
+                st.rerun()
+
     # Display current position
     st.write(f"Position: ({st.session_state.player_x}, {st.session_state.player_y})")
 
-    # Render the world grid
-    terrain_symbols = {0: "🟩", 1: "🟦", 2: "🌲"}  # grass, water, forest
-
-    grid_display = []
-    for y in range(st.session_state.world_grid.shape[0]):
-        row = []
-        for x in range(st.session_state.world_grid.shape[1]):
-            if x == st.session_state.player_x and y == st.session_state.player_y:
-                row.append("🧍")  # player character
-            else:
-                terrain_type = st.session_state.world_grid[y, x]
-                row.append(terrain_symbols[terrain_type])
-        grid_display.append(" ".join(row))
+    # Render the part of the world around the player
+    grid_text = render_viewport(st.session_state.world_seed, st.session_state.player_x,
+                                st.session_state.player_y, VIEW_RADIUS)
 
     # Display grid with monospace font
-    grid_text = "\n".join(grid_display)
     st.markdown(f"```\n{grid_text}\n```")
 
     # Movement controls
@@ -92,226 +227,195 @@ def show_world():
 
     with col2:
         if st.button("⬆️ North", use_container_width=True):
-            if st.session_state.player_y > 0:
-                st.session_state.player_y -= 1
-                st.rerun()
+            move_player(0, -1)
+            st.rerun()
 
     col1, col2, col3 = st.columns([1, 1, 1])
 
     with col1:
         if st.button("⬅️ West", use_container_width=True):
-            if st.session_state.player_x > 0:
-                st.session_state.player_x -= 1
-                st.rerun()
+            move_player(-1, 0)
+            st.rerun()
 
     with col2:
         if st.button("⬇️ South", use_container_width=True):
-            if st.session_state.player_y < st.session_state.world_grid.shape[0] - 1:
-                st.session_state.player_y += 1
-                st.rerun()
+            move_player(0, 1)
+            st.rerun()
 
     with col3:
         if st.button("➡️ East", use_container_width=True):
-            if st.session_state.player_x < st.session_state.world_grid.shape[1] - 1:
-                st.session_state.player_x += 1
-                st.rerun()
+            move_player(1, 0)
+            st.rerun()
 
     # Display terrain info
-    current_terrain = st.session_state.world_grid[st.session_state.player_y, st.session_state.player_x]
-    terrain_names = {0: "Grassland", 1: "Water", 2: "Forest"}
-    st.write(f"Current terrain: {terrain_names[current_terrain]}")
+    current_terrain = terrain_at(st.session_state.world_seed, st.session_state.player_x, st.session_state.player_y)
+    st.write(f"Current terrain: {g_terrain_names[current_terrain]}")
 
     st.write("---")
     if st.button("Back to Menu"):
         st.session_state.screen = SCREEN_MENU
         st.rerun()
 
-def init_battle():
-    """Initialize a new double battle with random creatures."""
-    templates = list(get_creature_templates().keys())
+@timed("engine:init_battle")
+def init_battle(enemy_team=None):
+    """Initialize a new double battle against `enemy_team` (wild creatures from the current terrain by default)."""
+    from creature import create_creature, g_species
+    from encounters import spawn_wild_team
+    from engine import Battle
+    from world import terrain_at
 
-    # Pick 2 random creatures for player and 2 for enemy
-    player_picks = random.sample(templates, 2)
-    enemy_picks = random.sample(templates, 2)
+    if enemy_team is None:
+        terrain = terrain_at(st.session_state.world_seed, st.session_state.player_x, st.session_state.player_y)
+        enemy_team = spawn_wild_team(terrain, 2, random)
+    player_team = [create_creature(name, 5) for name in random.sample(list(g_species), 2)]
 
     st.session_state.battle = {
-        "player_team": [create_creature(player_picks[0], 5), create_creature(player_picks[1], 5)],
-        "enemy_team": [create_creature(enemy_picks[0], 5), create_creature(enemy_picks[1], 5)],
-        "turn": 1,
-        "log": ["Battle started!"],
+        "engine": Battle(player_team, enemy_team, enemy_ai=enemy_ai(st.session_state.get("enemy_ai_tier"))),
         "phase": "select_action",  # select_action, select_target, enemy_turn, battle_over
         "selected_creature": 0,  # which player creature is acting (0 or 1)
         "selected_ability": None,
         "player_actions": [None, None],  # stores planned actions for both creatures
     }
 
-def render_creature_card(creature, is_enemy=False):
-    """Render a creature's status card."""
-    element_icons = {
-        TYPE_FIRE: "🔥", TYPE_WATER: "💧", TYPE_EARTH: "🌍", TYPE_AIR: "💨",
-        TYPE_LIGHTNING: "⚡", TYPE_SHADOW: "🌑", TYPE_NATURE: "🌿", TYPE_ICE: "❄️",
-    }
-    hp_pct = creature.current_hp / creature.max_hp
-    hp_bar_filled = int(hp_pct * 10)
-    hp_bar = "█" * hp_bar_filled + "░" * (10 - hp_bar_filled)
+def enemy_ai(tier):
+    """The AIFunction of an enemy AI tier (random by default)."""
+    if tier == AI_TIER_LOOKAHEAD:
+        from ai import LookaheadAI
+        return timed("engine:enemy_ai")(LookaheadAI(budget_ms=ENEMY_AI_BUDGET_MS))
+    from engine import random_ai
+    return random_ai
 
-    status = "💀" if not creature.is_alive() else ""
-    element_icon = element_icons.get(creature.element, "")
+def set_enemy_ai(battle):
+    # Kept outside the widget's key, which Streamlit drops while the battle screen isn't shown
+    st.session_state.enemy_ai_tier = st.session_state.enemy_ai_select
+    battle["engine"].enemy_ai = enemy_ai(st.session_state.enemy_ai_tier)
 
-    st.markdown(f"### {creature.sprite_path} {creature.name} {status}")
-    st.caption(f"{element_icon} {creature.element.capitalize()} | Lv.{creature.level}")
-    st.text(f"HP: [{hp_bar}] {creature.current_hp}/{creature.max_hp}")
-    st.text(f"ATK: {creature.atk}  DEF: {creature.defense}  SPD: {creature.spd}")
+def render_creature_card(creature, is_enemy=False):
+    """Render a creature's status card."""
+    from cards import creature_card_markdown
+    st.markdown(creature_card_markdown(creature.species, creature.level, creature.current_hp, creature.max_hp,
+                                       creature.atk, creature.defense, creature.spd))
 
+@timed("engine:execute_turn")
 def execute_turn(battle):
     """Execute all queued actions for this turn."""
-    # Gather all combatants with their actions
-    actions = []
-
-    for i, action in enumerate(battle["player_actions"]):
-        if action and battle["player_team"][i].is_alive():
-            actions.append({
-                "creature": battle["player_team"][i],
-                "ability": action["ability"],
-                "target": action["target"],
-                "is_player": True,
-                "index": i,
-            })
-
-    # Enemy AI: random ability on random player creature
-    for i, enemy in enumerate(battle["enemy_team"]):
-        if enemy.is_alive():
-            alive_players = [p for p in battle["player_team"] if p.is_alive()]
-            if alive_players and enemy.abilities:
-                target = random.choice(alive_players)
-                ability = random.choice(enemy.abilities)
-                actions.append({
-                    "creature": enemy,
-                    "ability": ability,
-                    "target": target,
-                    "is_player": False,
-                    "index": i,
-                })
-
-    # Sort by speed (faster goes first)
-    actions.sort(key=lambda x: x["creature"].spd, reverse=True)
-
-    # Execute actions
-    for action in actions:
-        attacker = action["creature"]
-        defender = action["target"]
-        ability = action["ability"]
-
-        if not attacker.is_alive():
-            continue  # skip if attacker fainted
-        if not defender.is_alive():
-            # Retarget to another alive enemy
-            if action["is_player"]:
-                alive_targets = [e for e in battle["enemy_team"] if e.is_alive()]
-            else:
-                alive_targets = [p for p in battle["player_team"] if p.is_alive()]
-            if not alive_targets:
-                continue
-            defender = random.choice(alive_targets)
-
-        result = attacker.use_ability(ability, defender)
-
-        if result["hit"]:
-            effectiveness = ""
-            if result["type_effectiveness"] > 1:
-                effectiveness = " It's super effective!"
-            elif result["type_effectiveness"] < 1:
-                effectiveness = " It's not very effective..."
-
-            battle["log"].append(f"{attacker.name} used {ability.name} on {defender.name} for {result['damage']} damage!{effectiveness}")
-
-            if result["defender_fainted"]:
-                battle["log"].append(f"{defender.name} fainted!")
-        else:
-            battle["log"].append(f"{attacker.name}'s {ability.name} missed!")
-
-    # Check win/lose conditions
-    player_alive = any(c.is_alive() for c in battle["player_team"])
-    enemy_alive = any(c.is_alive() for c in battle["enemy_team"])
+    from engine import SIDE_PLAYER
+    engine = battle["engine"]
+    engine.step(battle["player_actions"])
 
-    if not enemy_alive:
-        battle["log"].append("🎉 Victory! You won the battle!")
-        battle["phase"] = "battle_over"
-    elif not player_alive:
-        battle["log"].append("💀 Defeat... Your team was wiped out.")
+    if engine.is_over:
         battle["phase"] = "battle_over"
+        if engine.winner == SIDE_PLAYER:
+            # Defeated wild creatures join the collection
+            for enemy in engine.enemy_team:
+                enemy.full_heal()
+            owned_creatures().extend(engine.enemy_team)
+            battle["caught"] = [enemy.name for enemy in engine.enemy_team]
     else:
-        battle["turn"] += 1
         battle["player_actions"] = [None, None]
         battle["selected_creature"] = 0
         battle["phase"] = "select_action"
 
-def show_battle():
-    st.title("Double Battle")
-
-    # Initialize battle if needed
-    if "battle" not in st.session_state or st.session_state.battle is None:
-        init_battle()
+def choose_ability(battle, ability):
+    battle["selected_ability"] = ability
+    battle["phase"] = "select_target"
+
+def choose_target(battle, target: int):
+    """Queue the selected creature's action; play the turn once every creature has one."""
+    from engine import Action
+    engine = battle["engine"]
+    current_idx = battle["selected_creature"]
+    battle["player_actions"][current_idx] = Action(battle["selected_ability"], target)
+
+    # Move to next creature or execute turn
+    next_idx = current_idx + 1
+    while next_idx < 2 and not engine.player_team[next_idx].is_alive():
+        battle["player_actions"][next_idx] = None
+        next_idx += 1
+
+    if next_idx >= 2:
+        execute_turn(battle)
+    else:
+        battle["selected_creature"] = next_idx
+        battle["phase"] = "select_action"
 
+def cancel_target(battle):
+    battle["phase"] = "select_action"
+    battle["selected_ability"] = None
+
+def undo_selection(battle, previous_idx: int):
+    """Take back the action queued for `previous_idx` and choose it again."""
+    battle["player_actions"][previous_idx] = None
+    battle["selected_creature"] = previous_idx
+    battle["selected_ability"] = None
+    battle["phase"] = "select_action"
+
+def preview_text(engine, actions) -> str:
+    """One possible outcome of playing `actions` this turn, as HP changes (the battle itself is untouched)."""
+    _, hp_after = engine.preview(actions)
+    changes = [f"{c.name} {c.current_hp}→{hp}" for c, hp in zip(engine.combatants, hp_after) if hp != c.current_hp]
+    return "Preview: " + (", ".join(changes) if changes else "no damage")
+
+@st.fragment
+@timed("screen:battle_actions")
+def show_action_panel():
+    """Ability and target selection; picking an action only reruns this fragment, not the cards and log."""
+    from creature import get_type_multiplier
+    from damage import damage_outlook
+    from engine import Action
     battle = st.session_state.battle
+    engine = battle["engine"]
 
-    # Display turn counter
-    st.subheader(f"Turn {battle['turn']}")
-
-    # Enemy team (top)
-    st.markdown("### Enemy Team")
-    enemy_cols = st.columns(2)
-    for i, enemy in enumerate(battle["enemy_team"]):
-        with enemy_cols[i]:
-            render_creature_card(enemy, is_enemy=True)
-
-    st.divider()
-
-    # Player team (bottom)
-    st.markdown("### Your Team")
-    player_cols = st.columns(2)
-    for i, player in enumerate(battle["player_team"]):
-        with player_cols[i]:
-            render_creature_card(player)
-            if battle["phase"] == "select_action" and battle["selected_creature"] == i and player.is_alive():
-                st.markdown("**⬇️ Select an action:**")
-
-    st.divider()
+    # Once a turn has been played, HP and the log above are stale: redraw the whole screen
+    if battle["drawn_at"] != (engine.turn, engine.is_over):
+        st.rerun()
 
     # Action selection phase
     if battle["phase"] == "select_action":
         current_idx = battle["selected_creature"]
-        current_creature = battle["player_team"][current_idx]
+        current_creature = engine.player_team[current_idx]
 
         # Skip fainted creatures
         while not current_creature.is_alive() and current_idx < 2:
-            battle["player_actions"][current_idx] = {"ability": None, "target": None, "skip": True}
+            battle["player_actions"][current_idx] = None
             current_idx += 1
             if current_idx < 2:
-                current_creature = battle["player_team"][current_idx]
+                current_creature = engine.player_team[current_idx]
                 battle["selected_creature"] = current_idx
 
+        if current_idx < 2 and current_creature.is_alive():
+            # Under the acting creature's card, which sits right above this fragment
+            with st.columns(2)[current_idx]:
+                st.markdown("**⬇️ Select an action:**")
+        st.divider()
+
         if current_idx < 2 and current_creature.is_alive():
             st.markdown(f"**{current_creature.sprite_path} {current_creature.name}'s turn - Choose an ability:**")
 
             ability_cols = st.columns(len(current_creature.abilities))
             for i, ability in enumerate(current_creature.abilities):
                 with ability_cols[i]:
-                    if st.button(f"{ability.name}\n(Pow:{ability.power} Acc:{ability.accuracy}%)", key=f"ability_{current_idx}_{i}", use_container_width=True):
-                        battle["selected_ability"] = ability
-                        battle["phase"] = "select_target"
-                        st.rerun()
+                    st.button(f"{ability.name}\n(Pow:{ability.power} Acc:{ability.accuracy}%)", key=f"ability_{current_idx}_{i}",
+                              use_container_width=True, on_click=choose_ability, args=(battle, ability))
+
+            queued = [i for i in range(current_idx) if battle["player_actions"][i] is not None]
+            if queued:
+                st.button(f"↩ Undo {engine.player_team[queued[-1]].name}'s move", on_click=undo_selection,
+                          args=(battle, queued[-1]))
 
     # Target selection phase
     elif battle["phase"] == "select_target":
         current_idx = battle["selected_creature"]
-        current_creature = battle["player_team"][current_idx]
+        current_creature = engine.player_team[current_idx]
         ability = battle["selected_ability"]
 
+        st.divider()
         st.markdown(f"**{current_creature.name} will use {ability.name} - Select target:**")
+        show_preview = st.toggle("Preview outcomes", key="battle_preview",
+                                 help="Plays the turn on a copy of the battle with made-up rolls")
 
         target_cols = st.columns(2)
-        for i, enemy in enumerate(battle["enemy_team"]):
+        for i, enemy in enumerate(engine.enemy_team):
             with target_cols[i]:
                 if enemy.is_alive():
                     type_mult = get_type_multiplier(ability.element, enemy.element)
@@ -321,37 +425,74 @@ def show_battle():
                     elif type_mult < 1:
                         eff_text = " (Not very effective)"
 
-                    if st.button(f"Target {enemy.sprite_path} {enemy.name}{eff_text}", key=f"target_{i}", use_container_width=True):
-                        battle["player_actions"][current_idx] = {"ability": ability, "target": enemy}
-
-                        # Move to next creature or execute turn
-                        next_idx = current_idx + 1
-                        while next_idx < 2 and not battle["player_team"][next_idx].is_alive():
-                            battle["player_actions"][next_idx] = {"ability": None, "target": None, "skip": True}
-                            next_idx += 1
-
-                        if next_idx >= 2:
-                            execute_turn(battle)
-                        else:
-                            battle["selected_creature"] = next_idx
-                            battle["phase"] = "select_action"
-                        st.rerun()
-
-        if st.button("Cancel"):
-            battle["phase"] = "select_action"
-            battle["selected_ability"] = None
-            st.rerun()
+                    outlook = damage_outlook(current_creature, ability, enemy)
+                    if outlook.ko_one_hit > 0:
+                        odds_text = f"KO chance {outlook.ko_one_hit:.0%}"
+                    else:
+                        odds_text = f"2-hit KO chance {outlook.ko_two_hits:.0%}"
+
+                    st.button(f"Target {enemy.sprite_path} {enemy.name}{eff_text}\n"
+                              f"(~{outlook.expected:.0f} dmg, {odds_text})", key=f"target_{i}",
+                              use_container_width=True, on_click=choose_target, args=(battle, i))
+                    if show_preview:
+                        actions = list(battle["player_actions"])
+                        actions[current_idx] = Action(ability, i)
+                        st.caption(preview_text(engine, actions))
+
+        st.button("Cancel", on_click=cancel_target, args=(battle,))
+
+@timed("screen:battle")
+def show_battle():
+    st.title("Double Battle")
+
+    # Initialize battle if needed
+    if "battle" not in st.session_state or st.session_state.battle is None:
+        init_battle()
+
+    battle = st.session_state.battle
+    engine = battle["engine"]
+
+    # Display turn counter
+    st.subheader(f"Turn {engine.turn}")
+    battle["drawn_at"] = (engine.turn, engine.is_over)  # the battle state this page shows
+
+    # Enemy team (top)
+    st.markdown("### Enemy Team")
+    enemy_cols = st.columns(2)
+    for i, enemy in enumerate(engine.enemy_team):
+        with enemy_cols[i]:
+            render_creature_card(enemy, is_enemy=True)
+
+    st.divider()
+
+    # Player team (bottom)
+    st.markdown("### Your Team")
+    player_cols = st.columns(2)
+    for i, player in enumerate(engine.player_team):
+        with player_cols[i]:
+            render_creature_card(player)
+
+    if battle["phase"] in ("select_action", "select_target"):
+        show_action_panel()  # draws its own divider, after the action marker under the team cards
+    else:
+        st.divider()
 
     # Battle over phase
-    elif battle["phase"] == "battle_over":
+    if battle["phase"] == "battle_over":
+        if battle.get("caught"):
+            st.success(f"Caught {' and '.join(battle['caught'])}!")
         if st.button("New Battle", use_container_width=True):
             init_battle()
             st.rerun()
 
+    tiers = list(g_ai_tier_names)
+    st.selectbox("Enemy AI", tiers, index=tiers.index(st.session_state.get("enemy_ai_tier", AI_TIER_RANDOM)),
+                 format_func=g_ai_tier_names.get, key="enemy_ai_select", on_change=set_enemy_ai, args=(battle,))
+
     # Battle log
     st.divider()
     st.markdown("### Battle Log")
-    for msg in battle["log"][-5:]:  # show last 5 messages
+    for msg in engine.log.tail(5):  # show last 5 messages
         st.text(msg)
 
     st.divider()
@@ -360,64 +501,227 @@ def show_battle():
         st.session_state.screen = SCREEN_MENU
         st.rerun()
 
+@timed("screen:collection")
 def show_collection():
+    from cards import collection_sections, creature_card_markdown, g_element_icons
+    from collection import STAT_ATK, STAT_DEF, STAT_HP, STAT_SPD
+    from creature import MAX_LEVEL, g_elements
+    from fusion import get_species_by_id
+
     st.title("Creature Collection")
 
-    # Element display info
-    element_icons = {
-        TYPE_FIRE: "🔥", TYPE_WATER: "💧", TYPE_EARTH: "🌍", TYPE_AIR: "💨",
-        TYPE_LIGHTNING: "⚡", TYPE_SHADOW: "🌑", TYPE_NATURE: "🌿", TYPE_ICE: "❄️",
-    }
-    element_order = [TYPE_FIRE, TYPE_WATER, TYPE_EARTH, TYPE_AIR, TYPE_LIGHTNING, TYPE_SHADOW, TYPE_NATURE, TYPE_ICE]
-
-    templates = get_creature_templates()
-
-    # Group creatures by element
-    creatures_by_element = {e: [] for e in element_order}
-    for name, creature in templates.items():
-        creatures_by_element[creature.element].append(creature)
-
-    # Display creatures by element
-    for element in element_order:
-        creatures = creatures_by_element[element]
-        if not creatures:
-            continue
-
-        st.subheader(f"{element_icons[element]} {element.capitalize()}")
-
-        cols = st.columns(3)
-        for i, creature in enumerate(creatures):
-            with cols[i % 3]:
-                st.markdown(f"### {creature.sprite_path} {creature.name}")
-                st.caption(creature.description)
-                st.text(f"HP: {creature.base_hp}  ATK: {creature.base_atk}")
-                st.text(f"DEF: {creature.base_def}  SPD: {creature.base_spd}")
-                abilities_str = ", ".join([a.name for a in creature.abilities])
-                st.text(f"Moves: {abilities_str}")
-                st.divider()
+    creatures = owned_creatures()
+    if not len(creatures):
+        st.write("No creatures yet. Win battles to catch some.")
+    else:
+        col1, col2, col3, col4 = st.columns([2, 3, 2, 1])
+        with col1:
+            element = st.selectbox("Element", [None, *g_elements], key="collection_element",
+                                   format_func=lambda e: "All" if e is None else f"{g_element_icons[e]} {e.capitalize()}")
+        with col2:
+            min_level, max_level = st.slider("Level", 1, MAX_LEVEL, (1, MAX_LEVEL), key="collection_levels")
+        with col3:
+            sort = st.selectbox("Sort by", list(g_collection_sort_names), format_func=g_collection_sort_names.get,
+                                key="collection_sort")
+        with col4:
+            descending = st.toggle("Highest first", value=True, key="collection_descending")
+
+        rows = creatures.index().query(element, min_level, max_level, sort, descending)
+        pages = max(1, -(-len(rows) // COLLECTION_PAGE_SIZE))
+        query = (element, min_level, max_level, sort, descending)
+        if st.session_state.get("collection_query") != query:
+            st.session_state.collection_query = query
+            st.session_state.collection_page = 0
+        page = min(st.session_state.get("collection_page", 0), pages - 1)
+
+        st.caption(f"{len(rows)} of {len(creatures)} creatures · page {page + 1} of {pages}")
+        shown = rows[page * COLLECTION_PAGE_SIZE:(page + 1) * COLLECTION_PAGE_SIZE]
+        page_creatures = creatures.take(shown)
+        stats = page_creatures.stats()
+        for start in range(0, len(shown), 3):
+            for col, k in zip(st.columns(3), range(start, min(start + 3, len(shown)))):
+                with col:
+                    st.markdown(creature_card_markdown(
+                        get_species_by_id(int(page_creatures.species_ids[k])), int(page_creatures.levels[k]),
+                        int(page_creatures.current_hp[k]), *(int(stats[k, s]) for s in (STAT_HP, STAT_ATK, STAT_DEF, STAT_SPD))))
+
+        col1, _, col2 = st.columns([1, 4, 1])
+        with col1:
+            if st.button("← Previous", disabled=page == 0, use_container_width=True):
+                st.session_state.collection_page = page - 1
+                st.rerun()
+        with col2:
+            if st.button("Next →", disabled=page >= pages - 1, use_container_width=True):
+                st.session_state.collection_page = page + 1
+                st.rerun()
+
+    # Every species' card, by element (built once per process, drawn only on request)
+    if st.toggle("Species guide", key="collection_species_guide"):
+        for element, columns in collection_sections():
+            st.subheader(f"{g_element_icons[element]} {element.capitalize()}")
+            for col, markdown in zip(st.columns(3), columns):
+                with col:
+                    st.markdown(markdown)
 
     if st.button("Back to Menu"):
         st.session_state.screen = SCREEN_MENU
         st.rerun()
 
+@timed("screen:gacha")
 def show_gacha():
+    import numpy as np
+    from gacha import g_banners, g_item_keys, g_items, g_rarity_icons, g_rarity_names
+
     st.title("Item Gacha")
-    st.write("Gacha system for items - coming soon")
+
+    banner_key = st.selectbox("Banner", list(g_banners), format_func=lambda k: g_banners[k].name)
+    banner = g_banners[banner_key]
+    pity = st.session_state.gacha_pity.get(banner_key, 0)
+
+    rates = "  ".join(f"{g_rarity_icons[r]} {g_rarity_names[r]} {rate:.1%}" for r, rate in enumerate(banner.rarity_rates))
+    st.caption(rates)
+    st.write(f"Pity: {pity}/{banner.hard_pity} pulls since your last {g_rarity_names[banner.top_rarity]} item "
+             f"(rates rise from pull {banner.soft_pity_start})")
+
+    cols = st.columns(3)
+    for col, count in zip(cols, (1, 10, 100)):
+        with col:
+            if st.button(f"Pull x{count}", use_container_width=True):
+                items, st.session_state.gacha_pity[banner_key] = banner.pull(count, pity, np.random.default_rng())
+                st.session_state.player_items.extend(g_item_keys[i] for i in items)
+                st.session_state.gacha_last_pull = [g_item_keys[i] for i in items]
+                st.rerun()
+
+    if st.session_state.gacha_last_pull:
+        st.subheader("Results")
+        best_first = sorted(st.session_state.gacha_last_pull, key=lambda k: -g_items[k].rarity)
+        st.text("\n".join(f"{g_rarity_icons[g_items[k].rarity]} {g_items[k].name}" for k in best_first))
+
+    if st.session_state.player_items:
+        st.subheader("Your Items")
+        counts = {}
+        for key in st.session_state.player_items:
+            counts[key] = counts.get(key, 0) + 1
+        for key in sorted(counts, key=lambda k: (-g_items[k].rarity, g_items[k].name)):
+            item = g_items[key]
+            st.text(f"{g_rarity_icons[item.rarity]} {item.name} x{counts[key]} - {item.description}")
 
     if st.button("Back to Menu"):
         st.session_state.screen = SCREEN_MENU
         st.rerun()
 
+@timed("engine:fuse")
+def fuse_collection_pair(i: int, j: int):
+    """Replace collection creatures i and j with their fusion (i is the primary parent)."""
+    from fusion import fuse
+    creatures = owned_creatures()
+    fused = fuse(creatures[i], creatures[j])
+    creatures.remove([i, j])
+    creatures.append(fused)
+    st.session_state.last_fusion = fused.name
+
+@timed("screen:combine")
 def show_combine():
+    import numpy as np
+    from fusion import g_fusion_table
+
     st.title("Combine Creatures")
-    st.write("Creature combination system - coming soon")
+
+    creatures = owned_creatures()
+    last_fusion = st.session_state.pop("last_fusion", None)
+    if last_fusion:
+        st.success(f"Created {last_fusion}!")
+
+    species_ids = creatures.species_ids.astype(np.int64)
+    levels = creatures.levels.astype(np.int64)
+    best = g_fusion_table.best_fusions(species_ids, levels, 5) if len(creatures) >= 2 else []
+
+    if not best:
+        st.write("Catch at least two creatures (that aren't fusions themselves) by winning battles to combine them.")
+    else:
+        st.subheader("Best Fusions")
+        for i, j, score in best:
+            result = g_fusion_table.result_species(int(species_ids[i]), int(species_ids[j]))
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.text(f"{creatures[i].name} (Lv.{creatures[i].level}) + {creatures[j].name} (Lv.{creatures[j].level})"
+                        f" → {result.sprite_path} {result.name} ({result.element.capitalize()}, stat total {score})")
+            with col2:
+                if st.button("Fuse", key=f"fuse_{i}_{j}", use_container_width=True):
+                    fuse_collection_pair(i, j)
+                    st.rerun()
+
+        st.subheader("Choose Your Own")
+        labels = [f"{c.sprite_path} {c.name} (Lv.{c.level})" for c in creatures]
+        col1, col2 = st.columns(2)
+        with col1:
+            i = st.selectbox("Primary", range(len(creatures)), format_func=lambda k: labels[k], key="fuse_primary")
+        with col2:
+            j = st.selectbox("Secondary", range(len(creatures)), index=1, format_func=lambda k: labels[k],
+                             key="fuse_secondary")
+        score = g_fusion_table.score_pairs(species_ids[[i, j]], levels[[i, j]])[0, 1]
+        if i == j or score < 0:
+            st.write("Pick two different creatures that aren't fusions themselves.")
+        else:
+            result = g_fusion_table.result_species(int(species_ids[i]), int(species_ids[j]))
+            st.text(f"→ {result.sprite_path} {result.name} ({result.element.capitalize()}, stat total {score})")
+            if st.button("Fuse Selected"):
+                fuse_collection_pair(i, j)
+                st.rerun()
 
     if st.button("Back to Menu"):
         st.session_state.screen = SCREEN_MENU
         st.rerun()
 
+def show_save_sidebar():
+    with st.sidebar:
+        slot = st.text_input("Save slot", value=st.session_state.save_slot)
+        if slot and slot != st.session_state.save_slot and open_save_slot(slot):
+            st.rerun()
+        writer = st.session_state.save_writer
+        if writer is not None and writer.error is not None:
+            st.error(f"Autosave failed: {writer.error}")
+        else:
+            st.caption(f"Autosaving to {save_path(st.session_state.save_slot)}. "
+                       "Enter this slot name next time to continue.")
+
+def show_profiling_sidebar():
+    """Developer panel with per-screen rerun latency (process-wide, across sessions).
+
+    Only shown when the server runs with CREATURE_COLLECTOR_PROFILE set, since it
+    controls and resets recording for every player.
+    """
+    with st.sidebar:
+        enabled = st.checkbox("Profiling", value=profiling_enabled(), help="Record rerun timings for every session")
+        if enabled != profiling_enabled():
+            set_profiling_enabled(enabled)
+        if not enabled:
+            return
+        rows = timing_summary()
+        if not rows:
+            st.caption("No timings yet")
+            return
+        st.dataframe([{k: round(v, 2) if isinstance(v, float) else v for k, v in row.items()} for row in rows],
+                     hide_index=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("JSON", export_timings_json(), file_name="timings.json", mime="application/json")
+        with col2:
+            st.download_button("CSV", export_timings_csv(), file_name="timings.csv", mime="text/csv")
+        if st.button("Reset timings"):
+            reset_timings()
+            st.rerun()
+
 # Main app routing
 def main():
+    with timer(f"rerun:{st.session_state.screen}"):
+        route()
+
+def route():
+    show_save_sidebar()
+    if profiling_requested():
+        show_profiling_sidebar()
+
     # Route to appropriate screen
     if st.session_state.screen == SCREEN_MENU:
         show_menu()
@@ -434,5 +738,8 @@ def main():
     else:
         show_menu()  # Fallback to menu
 
+    with timer("save:encode"):
+        autosave()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,157 @@
+# Lightweight wall-time instrumentation with process-wide histograms
+#
+# Wrap code with the `timed` decorator or the `timer` context manager to record its
+# wall time under a name. Timings go into log-spaced histograms shared by every
+# session in the process, from which p50/p99 are read. Recording is off unless
+# enabled (CREATURE_COLLECTOR_PROFILE=1 or `set_profiling_enabled`); while off, an
+# instrumented call costs one flag check. The game's developer panel, which can
+# switch recording and reset timings for every session, is only shown when the
+# environment variable is set.
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+import csv
+import io
+import json
+import math
+import os
+import threading
+import time
+
+PROFILE_ENV = "CREATURE_COLLECTOR_PROFILE"
+
+# Histogram buckets: 8 per doubling (~9% wide) from 1 us up to ~70 s
+HISTOGRAM_MIN = 1e-6
+BUCKETS_PER_DOUBLING = 8
+HISTOGRAM_BUCKETS = 26 * BUCKETS_PER_DOUBLING
+
+g_requested = os.environ.get(PROFILE_ENV, "") not in ("", "0")  # at launch
+g_enabled = g_requested
+g_lock = threading.Lock()
+
+
+class Histogram:
+    """Call count, total and a log-bucketed distribution of one timed name."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if seconds <= HISTOGRAM_MIN:
+            index = 0
+        else:
+            index = min(int(math.log2(seconds / HISTOGRAM_MIN) * BUCKETS_PER_DOUBLING), HISTOGRAM_BUCKETS - 1)
+        self.buckets[index] += 1
+
+    def percentile(self, q: float) -> float:
+        """Approximate `q`-quantile (0..1) in seconds: the middle of the bucket it falls in."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(HISTOGRAM_MIN * 2 ** ((index + 0.5) / BUCKETS_PER_DOUBLING), self.max)
+        return self.max
+
+
+g_histograms: Dict[str, Histogram] = {}
+
+
+def profiling_requested() -> bool:
+    """Whether the process was launched with CREATURE_COLLECTOR_PROFILE set."""
+    return g_requested
+
+
+def profiling_enabled() -> bool:
+    return g_enabled
+
+
+def set_profiling_enabled(enabled: bool):
+    global g_enabled
+    g_enabled = enabled
+
+
+def record(name: str, seconds: float):
+    with g_lock:
+        histogram = g_histograms.get(name)
+        if histogram is None:
+            histogram = g_histograms[name] = Histogram()
+        histogram.add(seconds)
+
+
+def reset_timings():
+    with g_lock:
+        g_histograms.clear()
+
+
+class timer:
+    """Context manager recording the wall time of its block under `name`."""
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if g_enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            record(self.name, time.perf_counter() - self.start)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorator recording each call's wall time under `name` (the function name by default).
+
+    Calls that raise, including Streamlit's rerun and stop signals, are recorded too.
+    """
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not g_enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def timing_summary() -> List[dict]:
+    """One row per timed name, slowest total first; times in milliseconds."""
+    with g_lock:
+        rows = [{
+            "name": name,
+            "count": h.count,
+            "total_ms": h.total * 1e3,
+            "mean_ms": h.total / h.count * 1e3,
+            "p50_ms": h.percentile(0.5) * 1e3,
+            "p99_ms": h.percentile(0.99) * 1e3,
+            "max_ms": h.max * 1e3,
+        } for name, h in g_histograms.items() if h.count]
+    return sorted(rows, key=lambda row: -row["total_ms"])
+
+
+def export_timings_json() -> str:
+    return json.dumps({"enabled": g_enabled, "timings": timing_summary()}, indent=2)
+
+
+def export_timings_csv() -> str:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=["name", "count", "total_ms", "mean_ms", "p50_ms", "p99_ms", "max_ms"])
+    writer.writeheader()
+    writer.writerows(timing_summary())
+    return out.getvalue()
@@ -0,0 +1,209 @@
+# Compact binary battle replays with keyframes
+#
+# A replay file is a 16-byte header followed by fixed-size 16-byte records, so a
+# whole archive of battles can be memory-mapped as one NumPy structured array.
+# Field meaning depends on the record kind:
+#
+#   kind      a              b             c           flags              turn  value      pos
+#   BATTLE    player size    enemy size    -           1 = seeded         -     -          seed
+#   KEYFRAME  slot count     -             -           -                  turn  -          RNG position
+#   STATE     slot           species id    level       -                  -     current HP experience
+#   ACTION    attacker slot  target slot   ability id  1 = hit, 2 = faint turn  damage     RNG position
+#   END       winner         -             -           -                  turn  -          RNG position
+#
+# A keyframe record is followed by one STATE record per slot and holds the state at
+# the start of its turn. Every battle opens with a keyframe for turn 1.
+from typing import BinaryIO, List, Optional, Sequence
+import argparse
+import struct
+
+import numpy as np
+
+from creature import Creature, g_species_by_id, g_species_ids
+from engine import (EVENT_ATTACK, SIDE_ENEMY, SIDE_PLAYER, Action, AIFunction, Battle, CountingRandom,
+                    random_ai)
+
+REPLAY_MAGIC = b"CCREPLAY"
+REPLAY_VERSION = 1
+g_replay_header = struct.Struct("<8sII")  # magic, version, reserved
+g_replay_record = struct.Struct("<BBBBBBHII")
+
+REPLAY_DTYPE = np.dtype([
+    ("kind", "u1"), ("a", "u1"), ("b", "u1"), ("c", "u1"), ("flags", "u1"), ("pad", "u1"),
+    ("turn", "<u2"), ("value", "<u4"), ("pos", "<u4"),
+])
+assert REPLAY_DTYPE.itemsize == g_replay_record.size == g_replay_header.size == 16
+
+# Record kinds
+KIND_BATTLE = 1
+KIND_KEYFRAME = 2
+KIND_STATE = 3
+KIND_ACTION = 4
+KIND_END = 5
+
+FLAG_HIT = 1
+FLAG_FAINTED = 2
+
+WINNER_CODES = {None: 0, SIDE_PLAYER: 1, SIDE_ENEMY: 2}
+
+
+class ReplayRecorder:
+    """Appends battles to a replay file as they are played.
+
+    Attach a battle with `begin()`, then drive it through `step()` (or play it out
+    with `record()`). Give battles a `CountingRandom` to get real RNG positions.
+    """
+
+    def __init__(self, path: str, keyframe_interval: int = 10):
+        self.keyframe_interval = keyframe_interval
+        self.file: BinaryIO = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(g_replay_header.pack(REPLAY_MAGIC, REPLAY_VERSION, 0))
+        self._battle: Optional[Battle] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def _write(self, kind: int, a: int = 0, b: int = 0, c: int = 0, flags: int = 0,
+               turn: int = 0, value: int = 0, pos: int = 0):
+        self.file.write(g_replay_record.pack(kind, a, b, c, flags, 0, turn, value, pos))
+
+    def _rng_pos(self) -> int:
+        return getattr(self._battle.rng, "draws", 0) & 0xFFFFFFFF
+
+    def _write_keyframe(self):
+        battle = self._battle
+        combatants = battle.combatants
+        self._write(KIND_KEYFRAME, a=len(combatants), turn=battle.turn, pos=self._rng_pos())
+        for slot, creature in enumerate(combatants):
+            self._write(KIND_STATE, a=slot, b=g_species_ids[creature.species], c=creature.level,
+                        value=creature.current_hp, pos=creature.experience)
+
+    def _on_event(self, event: dict):
+        if event["type"] != EVENT_ATTACK:
+            return
+        flags = (FLAG_HIT if event["hit"] else 0) | (FLAG_FAINTED if event["defender_fainted"] else 0)
+        self._write(KIND_ACTION, a=event["attacker_slot"], b=event["defender_slot"], c=event["ability_id"] & 0xFF,
+                    flags=flags, turn=event["turn"], value=event["damage"], pos=self._rng_pos())
+
+    def begin(self, battle: Battle, seed: Optional[int] = None):
+        """Start recording `battle`, writing its header and turn 1 keyframe."""
+        self._battle = battle
+        self._write(KIND_BATTLE, a=len(battle.player_team), b=len(battle.enemy_team),
+                    flags=0 if seed is None else 1, pos=(seed or 0) & 0xFFFFFFFF)
+        self._write_keyframe()
+        battle.listeners.append(self._on_event)
+
+    def step(self, player_actions: Sequence[Optional[Action]],
+             enemy_actions: Optional[Sequence[Optional[Action]]] = None) -> List[dict]:
+        """`Battle.step()` on the recorded battle, adding keyframes and the end record."""
+        battle = self._battle
+        if battle.turn > 1 and (battle.turn - 1) % self.keyframe_interval == 0:
+            self._write_keyframe()
+        events = battle.step(player_actions, enemy_actions)
+        if battle.is_over:
+            self.end()
+        return events
+
+    def end(self):
+        battle = self._battle
+        self._write(KIND_END, a=WINNER_CODES[battle.winner], turn=battle.turn, pos=self._rng_pos())
+        battle.listeners.remove(self._on_event)
+        self._battle = None
+
+    def record(self, battle: Battle, seed: Optional[int] = None, player_ai: AIFunction = random_ai,
+               max_turns: int = 200) -> Optional[str]:
+        """Play `battle` to completion with AIs on both sides, recording every action."""
+        self.begin(battle, seed)
+        while self._battle is not None and battle.turn <= max_turns:
+            self.step(player_ai(battle, battle.player_team, battle.enemy_team))
+        if self._battle is not None:
+            self.end()  # unfinished
+        return battle.winner
+
+
+class ReplayReader:
+    """Memory-mapped view over a replay file, with keyframe seeking."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            magic, version, _ = g_replay_header.unpack(f.read(g_replay_header.size))
+            empty = f.seek(0, 2) == g_replay_header.size
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"Not a version {REPLAY_VERSION} replay file: {path}")
+        if empty:  # np.memmap refuses to map zero bytes
+            self.records = np.zeros(0, dtype=REPLAY_DTYPE)
+        else:
+            self.records = np.memmap(path, dtype=REPLAY_DTYPE, mode="r", offset=g_replay_header.size)
+        kind = self.records["kind"]
+        self.battle_starts = np.flatnonzero(kind == KIND_BATTLE)
+        self._battle_ends = np.append(self.battle_starts[1:], len(self.records))
+
+    def __len__(self) -> int:
+        return len(self.battle_starts)
+
+    def battle(self, index: int) -> np.ndarray:
+        """All records of one battle."""
+        return self.records[self.battle_starts[index]:self._battle_ends[index]]
+
+    def actions(self, index: Optional[int] = None) -> np.ndarray:
+        """Action records of one battle, or of the whole archive when `index` is None."""
+        records = self.records if index is None else self.battle(index)
+        return records[records["kind"] == KIND_ACTION]
+
+    def winners(self) -> np.ndarray:
+        """Winner code of every battle (0 unfinished, 1 player, 2 enemy)."""
+        return self.records[self.records["kind"] == KIND_END]["a"]
+
+    def state_at(self, index: int, turn: int) -> List[Creature]:
+        """Creatures by slot at the start of `turn`, from the nearest keyframe at or before it."""
+        records = self.battle(index)
+        kind = records["kind"]
+        keyframes = np.flatnonzero((kind == KIND_KEYFRAME) & (records["turn"] <= turn))
+        start = keyframes[-1]
+        n_slots = records[start]["a"]
+
+        creatures = []
+        for state in records[start + 1:start + 1 + n_slots]:
+            creatures.append(Creature(g_species_by_id[state["b"]], level=int(state["c"]),
+                                      experience=int(state["pos"]), current_hp=int(state["value"])))
+
+        # Replay only the actions between the keyframe and the requested turn
+        after = records[start + 1 + n_slots:]
+        pending = after[(after["kind"] == KIND_ACTION) & (after["turn"] < turn)
+                        & ((after["flags"] & FLAG_HIT) != 0)]
+        for action in pending:
+            creatures[action["b"]].take_damage(int(action["value"]))
+        return creatures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record random battles to a replay archive and summarize it.")
+    parser.add_argument("path")
+    parser.add_argument("--battles", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keyframe-interval", type=int, default=10)
+    args = parser.parse_args()
+
+    with ReplayRecorder(args.path, keyframe_interval=args.keyframe_interval) as recorder:
+        for i in range(args.battles):
+            seed = args.seed + i
+            battle = Battle.random_battle(rng=CountingRandom(seed))
+            recorder.record(battle, seed=seed)
+
+    reader = ReplayReader(args.path)
+    actions = reader.actions()
+    hits = (actions["flags"] & FLAG_HIT) != 0
+    print(f"{len(reader)} battles, {len(actions)} actions, {reader.records.nbytes / max(1, len(reader)):.0f} bytes/battle")
+    print(f"hit rate {hits.mean():.3f}, mean damage on hit {actions['value'][hits].mean():.2f}")
+    print(f"player win rate {np.mean(reader.winners() == 1):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
 #!/bin/bash
 
 source venv/bin/activate
-streamlit run main.py
+python startup.py serve
@@ -0,0 +1,40 @@
+# Sampling from fixed discrete distributions, shared by encounters and gacha
+from typing import Sequence
+import random
+
+import numpy as np
+
+
+class AliasTable:
+    """Walker/Vose alias table: constant-time draws from a fixed discrete distribution."""
+
+    def __init__(self, weights: Sequence[float]):
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(weights) == 0 or (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError(f"Alias table needs non-negative weights with a positive sum: {weights}")
+        n = len(weights)
+        scaled = weights * n / weights.sum()
+        prob = np.ones(n)
+        alias = np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s, g = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = g
+            scaled[g] -= 1.0 - scaled[s]
+            (small if scaled[g] < 1.0 else large).append(g)
+        # Anything left over is 1.0 up to rounding error
+        self.prob = prob
+        self.alias = alias
+        self._prob = prob.tolist()
+        self._alias = alias.tolist()
+        self.n = n
+
+    def sample(self, rng: random.Random) -> int:
+        i = int(rng.random() * self.n)
+        return i if rng.random() < self._prob[i] else self._alias[i]
+
+    def sample_many(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        i = rng.integers(0, self.n, size=size)
+        return np.where(rng.random(size) < self.prob[i], i, self.alias[i])
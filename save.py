@@ -0,0 +1,239 @@
+# Compact binary save files with incremental, write-behind autosave
+#
+# A save file is a 36-byte header, then the player's item counts and gacha pity,
+# then one fixed-size 12-byte record per owned creature:
+#
+#   header     magic, version, creature count, item kinds, banners, world seed, x, y
+#   items      uint32 count per item (gacha.g_item_keys order)
+#   pity       uint16 pity counter per banner (gacha.g_banners order)
+#   creatures  species id, experience, current HP, level, reserved
+#
+# Species ids are fusion.get_species_id ids, so fused creatures round-trip too.
+# Because records have a fixed size, an autosave only rewrites the records that
+# changed since the last write, and the writing happens on a background thread
+# shared by every save file.
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Sequence, Union
+import os
+import struct
+import threading
+
+import numpy as np
+
+from collection import CreatureCollection
+from creature import Creature
+from fusion import get_species_id
+from gacha import g_banners, g_item_ids, g_item_keys
+
+SAVE_MAGIC = b"CCSAVE\0\0"
+SAVE_VERSION = 1
+g_save_header = struct.Struct("<8sIIHHqii")  # magic, version, creatures, item kinds, banners, seed, x, y
+
+SAVE_CREATURE_DTYPE = np.dtype([
+    ("species_id", "<u4"), ("experience", "<u4"), ("current_hp", "<u2"), ("level", "u1"), ("reserved", "u1"),
+])
+assert g_save_header.size == 36 and SAVE_CREATURE_DTYPE.itemsize == 12
+
+g_banner_keys = tuple(g_banners)
+
+
+@dataclass
+class SaveState:
+    """Everything a save file holds."""
+    world_seed: int
+    player_x: int
+    player_y: int
+    # Loaded as a CreatureCollection; a plain list of creatures can be saved too
+    creatures: Union[CreatureCollection, List[Creature]] = field(default_factory=CreatureCollection)
+    items: List[str] = field(default_factory=list)  # item keys, one per owned item (loaded in catalog order)
+    gacha_pity: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class SaveSnapshot:
+    """A save state encoded into the on-disk layout, ready to hand to the writer thread."""
+    header: bytes  # header, item counts and pity
+    records: np.ndarray  # SAVE_CREATURE_DTYPE
+
+
+def encode_creatures(creatures: Union[CreatureCollection, Sequence[Creature]]) -> np.ndarray:
+    records = np.zeros(len(creatures), dtype=SAVE_CREATURE_DTYPE)
+    if isinstance(creatures, CreatureCollection):
+        records["species_id"] = creatures.species_ids
+        records["experience"] = creatures.experience
+        records["current_hp"] = creatures.current_hp
+        records["level"] = creatures.levels
+        return records
+    records["species_id"] = [get_species_id(c.species) for c in creatures]
+    records["experience"] = [c.experience for c in creatures]
+    records["current_hp"] = [c.current_hp for c in creatures]
+    records["level"] = [c.level for c in creatures]
+    return records
+
+
+def encode(state: SaveState) -> SaveSnapshot:
+    counts = np.bincount([g_item_ids[k] for k in state.items], minlength=len(g_item_keys)).astype("<u4")
+    pity = np.array([state.gacha_pity.get(k, 0) for k in g_banner_keys], dtype="<u2")
+    records = encode_creatures(state.creatures)
+    header = g_save_header.pack(SAVE_MAGIC, SAVE_VERSION, len(records), len(counts), len(pity),
+                                state.world_seed, state.player_x, state.player_y)
+    return SaveSnapshot(header + counts.tobytes() + pity.tobytes(), records)
+
+
+def decode_creatures(records: np.ndarray) -> CreatureCollection:
+    return CreatureCollection.from_columns(records["species_id"], records["level"], records["experience"],
+                                           records["current_hp"])
+
+
+def load_game(path: str) -> SaveState:
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < g_save_header.size:
+        raise ValueError(f"Not a version {SAVE_VERSION} save file (too short): {path}")
+    magic, version, n_creatures, n_items, n_banners, seed, x, y = g_save_header.unpack_from(data)
+    if magic != SAVE_MAGIC or version != SAVE_VERSION:
+        raise ValueError(f"Not a version {SAVE_VERSION} save file: {path}")
+    if n_items > len(g_item_keys) or n_banners > len(g_banner_keys):
+        raise ValueError(f"Save file has more item kinds or banners than this game: {path}")
+    offset = g_save_header.size
+    if len(data) < offset + 4 * n_items + 2 * n_banners:
+        raise ValueError(f"Save file is truncated: {path}")
+    counts = np.frombuffer(data, dtype="<u4", count=n_items, offset=offset)
+    offset += counts.nbytes
+    pity = np.frombuffer(data, dtype="<u2", count=n_banners, offset=offset)
+    offset += pity.nbytes
+    # A save interrupted mid-write may hold fewer records than its header says; keep the complete ones
+    n_creatures = min(n_creatures, (len(data) - offset) // SAVE_CREATURE_DTYPE.itemsize)
+    records = np.frombuffer(data, dtype=SAVE_CREATURE_DTYPE, count=n_creatures, offset=offset)
+    return SaveState(
+        world_seed=seed, player_x=x, player_y=y,
+        creatures=decode_creatures(records),
+        items=[g_item_keys[i] for i in np.repeat(np.arange(n_items), counts)],
+        gacha_pity={k: int(p) for k, p in zip(g_banner_keys, pity)},
+    )
+
+
+def write_snapshot(path: str, snapshot: SaveSnapshot, previous: Optional[SaveSnapshot] = None) -> int:
+    """Write `snapshot` over a file holding `previous` (None: a new file); returns bytes written.
+
+    Only the span from the first to the last changed creature record is rewritten,
+    and the header only when it changed. Records are written before the header, so
+    the header never counts records that aren't on disk yet.
+    """
+    if previous is not None and not os.path.exists(path):
+        previous = None
+    records_offset = len(snapshot.header)
+    new = snapshot.records
+    if previous is None or len(previous.header) != records_offset:
+        start, stop = 0, len(new)
+        header_changed = True
+    else:
+        old = previous.records
+        common = min(len(old), len(new))
+        changed = np.flatnonzero(old[:common] != new[:common])
+        start = int(changed[0]) if len(changed) else common
+        stop = len(new) if len(new) > common else (int(changed[-1]) + 1 if len(changed) else common)
+        header_changed = snapshot.header != previous.header
+
+    written = 0
+    with open(path, "wb" if previous is None else "r+b") as f:
+        if stop > start:
+            f.seek(records_offset + start * SAVE_CREATURE_DTYPE.itemsize)
+            written += f.write(new[start:stop].tobytes())
+        if header_changed:
+            f.seek(0)
+            written += f.write(snapshot.header)
+        f.truncate(records_offset + new.nbytes)
+    return written
+
+
+class SaveWriter:
+    """Write-behind autosave for one save file, shared by every session saving to it.
+
+    Get one with get_save_writer(). `submit()` only hands a snapshot over and
+    returns; the process's single writer thread writes each file's latest pending
+    snapshot, so a burst of autosaves collapses into one write and writes to the
+    same file never interleave.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.bytes_written = 0
+        self.writes = 0
+        self.error: Optional[BaseException] = None  # from the last write, cleared by the next one that succeeds
+        self._written: Optional[SaveSnapshot] = None
+        self._pending: Optional[SaveSnapshot] = None
+        self._queued = False
+        self._busy = False
+
+    def mark_written(self, snapshot: SaveSnapshot):
+        """Tell the writer the file already holds `snapshot` (e.g. it was just loaded)."""
+        with g_save_cond:
+            self._written = snapshot
+
+    def submit(self, snapshot: SaveSnapshot):
+        global g_save_thread
+        with g_save_cond:
+            self._pending = snapshot
+            if not self._queued:
+                self._queued = True
+                g_dirty_writers.append(self)
+            if g_save_thread is None:
+                g_save_thread = threading.Thread(target=_write_pending_saves, name="save-writer", daemon=True)
+                g_save_thread.start()
+            g_save_cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted snapshot is on disk; False on timeout."""
+        with g_save_cond:
+            return g_save_cond.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def _write_pending(self):
+        """Write the pending snapshot; called on the writer thread with g_save_cond held, released while writing."""
+        snapshot, self._pending, self._queued, self._busy = self._pending, None, False, True
+        previous = self._written
+        g_save_cond.release()
+        try:
+            written = write_snapshot(self.path, snapshot, previous)
+            error = None
+        except Exception as e:  # keep the shared thread alive for every other save file
+            written, snapshot, error = 0, None, e  # rewrite everything next time
+        finally:
+            g_save_cond.acquire()
+        self.bytes_written += written
+        self.writes += 1
+        self.error = error
+        self._written = snapshot
+        self._busy = False
+        g_save_cond.notify_all()
+
+
+# One writer per save file and one thread for all of them, shared by every session in the process
+g_save_writers: Dict[str, SaveWriter] = {}
+g_dirty_writers: Deque[SaveWriter] = deque()
+g_save_cond = threading.Condition()
+g_save_thread: Optional[threading.Thread] = None
+
+
+def get_save_writer(path: str) -> SaveWriter:
+    """The process-wide writer of the save file at `path`."""
+    key = os.path.abspath(path)
+    with g_save_cond:
+        writer = g_save_writers.get(key)
+        if writer is None:
+            writer = g_save_writers[key] = SaveWriter(path)
+        return writer
+
+
+def find_save_writer(path: str) -> Optional[SaveWriter]:
+    """The writer of the save file at `path`, if some session has opened one."""
+    with g_save_cond:
+        return g_save_writers.get(os.path.abspath(path))
+
+
+def _write_pending_saves():
+    with g_save_cond:
+        while True:
+            g_save_cond.wait_for(lambda: g_dirty_writers)
+            g_dirty_writers.popleft()._write_pending()
@@ -0,0 +1,132 @@
+# Cold-start report and pre-warmed server launcher
+#
+#   python startup.py report           # where startup time goes: imports, warm-up, first render of each screen
+#   python startup.py serve [ARGS...]  # warm up, then start the Streamlit server in this process
+#
+# Streamlit executes main.py inside the server process, so every module warm_up()
+# imports and every per-process cache it fills is already there when the first
+# session connects.
+from typing import Callable, List, Tuple
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+WORLD_STORE_ENV = "CREATURE_COLLECTOR_WORLD"  # as in main.py
+
+# Game modules, in dependency order, so each import is timed on its own
+g_warmup_modules = ("numpy", "profiling", "creature", "sampling", "engine", "damage", "ai", "world", "encounters",
+                    "fusion", "gacha", "save", "collection", "cards")
+
+
+def _warm_cards():
+    from cards import collection_sections, creature_card_markdown
+    from creature import g_species
+    collection_sections()
+    for species in g_species.values():  # battle cards of full-HP level-5 teams
+        hp, atk, defense, spd = (table[5] for table in (species.hp_by_level, species.atk_by_level,
+                                                        species.def_by_level, species.spd_by_level))
+        creature_card_markdown(species, 5, hp, hp, atk, defense, spd)
+
+
+def _warm_damage():
+    from creature import create_creature, g_species
+    from damage import ability_damage, damage_outlook
+    from encounters import g_terrain_levels
+    # Level-5 player creatures against full-HP wild creatures at every wild level: the target
+    # hints one way, the lookahead AI's damage tables the other
+    low, high = min(low for low, _ in g_terrain_levels.values()), max(high for _, high in g_terrain_levels.values())
+    wild = [create_creature(name, level) for name in g_species for level in range(low, high + 1)]
+    for name in g_species:
+        player = create_creature(name, 5)
+        for creature in wild:
+            for ability in player.abilities:
+                damage_outlook(player, ability, creature)
+            for ability in creature.abilities:
+                ability_damage(creature, ability, player)
+
+
+def _warm_world():
+    from world import render_viewport
+    render_viewport(0, 0, 0, 5)
+
+
+def _warm_terrain_store():
+    if os.environ.get(WORLD_STORE_ENV):
+        from terrain_store import open_terrain_store
+        open_terrain_store(os.environ[WORLD_STORE_ENV])  # main.py reuses this mapping
+
+
+def warmup_steps() -> List[Tuple[str, Callable[[], object]]]:
+    steps = [(f"import {name}", lambda name=name: importlib.import_module(name)) for name in g_warmup_modules]
+    steps.append(("collection and battle cards", _warm_cards))
+    steps.append(("damage tables", _warm_damage))
+    steps.append(("world renderer", _warm_world))
+    steps.append(("terrain store", _warm_terrain_store))
+    return steps
+
+
+def warm_up() -> List[Tuple[str, float]]:
+    """Import the game modules and pre-build the shared, per-process content; returns (step, seconds)."""
+    timings = []
+    for label, step in warmup_steps():
+        start = time.perf_counter()
+        step()
+        timings.append((label, time.perf_counter() - start))
+    return timings
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def report() -> List[Tuple[str, float]]:
+    """Cold-start breakdown, measured in this (fresh) process with Streamlit's headless test runner."""
+    os.environ.setdefault("CREATURE_COLLECTOR_SAVES", tempfile.mkdtemp(prefix="startup-report-"))
+    rows = [("import streamlit", _timed(lambda: importlib.import_module("streamlit")))]
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(MAIN_SCRIPT, default_timeout=60)
+    rows.append(("render menu (cold)", _timed(app.run)))
+    rows += [(f"warm-up: {label}", seconds) for label, seconds in warm_up()]
+    for screen in ("world", "battle", "collection", "gacha", "combine", "menu"):
+        app.session_state.screen = screen
+        rows.append((f"render {screen} (first)", _timed(app.run)))
+        rows.append((f"render {screen} (again)", _timed(app.run)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup-time report and pre-warmed launcher.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_parser = sub.add_parser("report")
+    report_parser.add_argument("--json", help="also write the timings to this file")
+    sub.add_parser("serve", help="extra arguments are passed on to `streamlit run`")
+    args, streamlit_args = parser.parse_known_args()
+
+    if args.command == "report":
+        if streamlit_args:
+            parser.error(f"unrecognized arguments: {' '.join(streamlit_args)}")
+        rows = report()
+        for label, seconds in rows:
+            print(f"{label:<40} {seconds * 1000:>9.1f} ms")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump([{"stage": label, "ms": seconds * 1000} for label, seconds in rows], f, indent=2)
+        return
+
+    total = sum(seconds for _, seconds in warm_up())
+    print(f"Warmed up in {total * 1000:.0f} ms")
+    from streamlit.web import cli
+    sys.argv = ["streamlit", "run", MAIN_SCRIPT, *streamlit_args]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
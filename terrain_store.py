@@ -0,0 +1,117 @@
+# Memory-mapped on-disk terrain store
+#
+# File layout: a 64-byte header (magic, version, width, height, seed, origin x/y)
+# followed by width * height uint8 terrain codes in row-major [y, x] order. Stores
+# are opened read-only with np.memmap, so every process and session reading the
+# same file shares the OS page cache and only touched pages become resident.
+from functools import lru_cache
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+
+from world import generate_terrain, get_region
+
+TERRAIN_STORE_MAGIC = b"CCTERRN\0"
+TERRAIN_STORE_VERSION = 1
+TERRAIN_STORE_HEADER_SIZE = 64
+g_terrain_store_header = struct.Struct("<8sIIIqii")  # magic, version, width, height, seed, origin x, origin y
+
+GENERATE_BAND_ROWS = 256  # rows generated per pass when creating a store
+
+
+class TerrainStore:
+    """A rectangle of the world on disk, starting at world position (origin_x, origin_y)."""
+
+    def __init__(self, path: str, writable: bool = False):
+        with open(path, "rb") as f:
+            header = f.read(g_terrain_store_header.size)
+        magic, version, width, height, seed, origin_x, origin_y = g_terrain_store_header.unpack(header)
+        if magic != TERRAIN_STORE_MAGIC or version != TERRAIN_STORE_VERSION:
+            raise ValueError(f"Not a version {TERRAIN_STORE_VERSION} terrain store: {path}")
+        self.path = path
+        self.width, self.height, self.seed = width, height, seed
+        self.origin_x, self.origin_y = origin_x, origin_y
+        self.tiles = np.memmap(path, dtype=np.uint8, mode="r+" if writable else "r",
+                               offset=TERRAIN_STORE_HEADER_SIZE, shape=(height, width))
+
+    def contains(self, x: int, y: int, width: int = 1, height: int = 1) -> bool:
+        return (self.origin_x <= x and x + width <= self.origin_x + self.width
+                and self.origin_y <= y and y + height <= self.origin_y + self.height)
+
+    def terrain_at(self, x: int, y: int) -> int:
+        return int(self.tiles[y - self.origin_y, x - self.origin_x])
+
+    def region(self, x0: int, y0: int, width: int, height: int) -> np.ndarray:
+        """Terrain codes of a rectangle, indexed [y, x].
+
+        Inside the store this is a zero-copy view of the mapped file; anything
+        outside it is filled in from the procedural world with the same seed.
+        """
+        if self.contains(x0, y0, width, height):
+            top, left = y0 - self.origin_y, x0 - self.origin_x
+            return self.tiles[top:top + height, left:left + width]
+        region = get_region(self.seed, x0, y0, width, height)
+        self.overlay(region, x0, y0)
+        return region
+
+    def overlay(self, region: np.ndarray, x0: int, y0: int):
+        """Copy the store's tiles over the part of `region` (at world position x0, y0) it covers."""
+        left, right = max(x0, self.origin_x), min(x0 + region.shape[1], self.origin_x + self.width)
+        top, bottom = max(y0, self.origin_y), min(y0 + region.shape[0], self.origin_y + self.height)
+        if left < right and top < bottom:
+            region[top - y0:bottom - y0, left - x0:right - x0] = self.tiles[
+                top - self.origin_y:bottom - self.origin_y, left - self.origin_x:right - self.origin_x]
+
+
+def create_terrain_store(path: str, seed: int, width: int, height: int,
+                         origin_x: int = 0, origin_y: int = 0) -> TerrainStore:
+    """Write the procedural terrain of a rectangle to a new store file."""
+    with open(path, "wb") as f:
+        header = g_terrain_store_header.pack(TERRAIN_STORE_MAGIC, TERRAIN_STORE_VERSION,
+                                             width, height, seed, origin_x, origin_y)
+        f.write(header.ljust(TERRAIN_STORE_HEADER_SIZE, b"\0"))
+        f.truncate(TERRAIN_STORE_HEADER_SIZE + width * height)
+
+    tiles = np.memmap(path, dtype=np.uint8, mode="r+", offset=TERRAIN_STORE_HEADER_SIZE, shape=(height, width))
+    for top in range(0, height, GENERATE_BAND_ROWS):
+        rows = min(GENERATE_BAND_ROWS, height - top)
+        tiles[top:top + rows] = generate_terrain(seed, origin_x, origin_y + top, width, rows)
+    tiles.flush()
+    del tiles
+    return TerrainStore(path)
+
+
+@lru_cache(maxsize=None)
+def open_terrain_store(path: str) -> TerrainStore:
+    """Read-only store, mapped once per process and shared by every session."""
+    return TerrainStore(os.path.abspath(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or inspect a memory-mapped terrain store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    create = sub.add_parser("create")
+    create.add_argument("path")
+    create.add_argument("--seed", type=int, required=True)
+    create.add_argument("--width", type=int, default=4096)
+    create.add_argument("--height", type=int, default=4096)
+    create.add_argument("--origin", type=int, nargs=2, default=(0, 0), metavar=("X", "Y"))
+    info = sub.add_parser("info")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "create":
+        store = create_terrain_store(args.path, args.seed, args.width, args.height, *args.origin)
+    else:
+        store = TerrainStore(args.path)
+    elapsed = time.perf_counter() - start
+    print(f"{store.path}: {store.width}x{store.height} tiles from ({store.origin_x}, {store.origin_y}), "
+          f"seed {store.seed} ({elapsed * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
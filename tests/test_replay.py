@@ -0,0 +1,28 @@
+from engine import Battle, CountingRandom
+from replay import ReplayReader, ReplayRecorder
+
+
+def test_header_only_replay(tmp_path):
+    path = str(tmp_path / "empty.replay")
+    ReplayRecorder(path).close()
+
+    reader = ReplayReader(path)
+    assert len(reader) == 0
+    assert len(reader.records) == 0
+    assert len(reader.actions()) == 0
+    assert len(reader.winners()) == 0
+
+
+def test_zero_turn_battle(tmp_path):
+    path = str(tmp_path / "unplayed.replay")
+    battle = Battle.random_battle(rng=CountingRandom(1))
+    start = [(c.species, c.current_hp) for c in battle.combatants]
+    with ReplayRecorder(path) as recorder:
+        recorder.begin(battle, seed=1)
+        recorder.end()
+
+    reader = ReplayReader(path)
+    assert len(reader) == 1
+    assert len(reader.actions(0)) == 0
+    assert list(reader.winners()) == [0]  # unfinished
+    assert [(c.species, c.current_hp) for c in reader.state_at(0, 1)] == start
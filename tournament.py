@@ -0,0 +1,131 @@
+# Round-robin species tournament across worker processes
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import argparse
+import csv
+import os
+import random
+import time
+
+import numpy as np
+
+from creature import g_species, create_creature
+from engine import SIDE_PLAYER, Battle
+
+
+def play_matchup(a: str, b: str, games: int, level: int, seed: int, max_turns: int = 200) -> Tuple[int, int, int]:
+    """Play `games` 2v2 battles of two `a` against two `b`; returns (a wins, b wins, unfinished).
+
+    Sides alternate every game so that `a` and `b` each get the speed-tie advantage
+    of the player slot half the time.
+    """
+    rng = random.Random(seed)
+    a_wins = b_wins = 0
+    for game in range(games):
+        a_is_player = game % 2 == 0
+        first, second = (a, b) if a_is_player else (b, a)
+        battle = Battle(
+            [create_creature(first, level), create_creature(first, level)],
+            [create_creature(second, level), create_creature(second, level)],
+            rng=rng,
+        )
+        winner = battle.run(max_turns=max_turns)
+        if winner is None:
+            continue
+        if (winner == SIDE_PLAYER) == a_is_player:
+            a_wins += 1
+        else:
+            b_wins += 1
+    return a_wins, b_wins, games - a_wins - b_wins
+
+
+def _play_matchup_task(task: tuple) -> tuple:
+    i, j, a, b, games, level, seed = task
+    return (i, j) + play_matchup(a, b, games, level, seed)
+
+
+def fit_elo(wins: np.ndarray, games: np.ndarray, iterations: int = 1000) -> np.ndarray:
+    """Bradley-Terry strengths fitted to a win matrix, on the Elo scale (mean 1500).
+
+    `wins[i, j]` counts i's wins over j (unfinished games count half to each side)
+    and `games[i, j]` the games played between them.
+    """
+    strength = np.ones(len(wins))
+    total_wins = wins.sum(axis=1)
+    for _ in range(iterations):
+        denom = (games / (strength[:, None] + strength[None, :])).sum(axis=1)
+        updated = np.maximum(total_wins, 1e-9) / np.maximum(denom, 1e-12)
+        updated /= np.exp(np.mean(np.log(updated)))
+        if np.allclose(updated, strength, rtol=1e-10, atol=0):
+            strength = updated
+            break
+        strength = updated
+    elo = 400 * np.log10(strength)
+    return elo - elo.mean() + 1500
+
+
+def run_tournament(species: List[str], games: int, level: int = 5, seed: Optional[int] = None,
+                   workers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Play every pairing; returns (win_rate[i, j] of i against j, Elo per species)."""
+    pairs = [(i, j) for i in range(len(species)) for j in range(i + 1, len(species))]
+    # One independent RNG stream per matchup, so results don't depend on scheduling or worker count
+    streams = np.random.SeedSequence(seed).spawn(len(pairs))
+    tasks = [(i, j, species[i], species[j], games, level, int(s.generate_state(1)[0]))
+             for (i, j), s in zip(pairs, streams)]
+
+    wins = np.zeros((len(species), len(species)))
+    played = np.zeros((len(species), len(species)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+        for i, j, a_wins, b_wins, unfinished in executor.map(_play_matchup_task, tasks, chunksize=chunksize):
+            wins[i, j] = a_wins + unfinished / 2
+            wins[j, i] = b_wins + unfinished / 2
+            played[i, j] = played[j, i] = games
+
+    win_rate = np.divide(wins, played, out=np.full_like(wins, 0.5), where=played > 0)
+    return win_rate, fit_elo(wins, played)
+
+
+def write_results(out_dir: str, species: List[str], win_rate: np.ndarray, elo: np.ndarray):
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "win_rate.npy"), win_rate)
+    np.save(os.path.join(out_dir, "elo.npy"), elo)
+
+    with open(os.path.join(out_dir, "win_rate.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["species"] + species)
+        for name, row in zip(species, win_rate):
+            writer.writerow([name] + [f"{rate:.4f}" for rate in row])
+
+    overall = (win_rate.sum(axis=1) - 0.5) / max(1, len(species) - 1)  # excludes the diagonal
+    with open(os.path.join(out_dir, "elo.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "species", "elo", "win_rate"])
+        for rank, i in enumerate(np.argsort(-elo), start=1):
+            writer.writerow([rank, species[i], f"{elo[i]:.1f}", f"{overall[i]:.4f}"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin 2v2 tournament between all species.")
+    parser.add_argument("--games", type=int, default=1000, help="battles per pairing")
+    parser.add_argument("--level", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--species", nargs="+", default=list(g_species), choices=list(g_species))
+    parser.add_argument("--out", default="tournament_results")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    win_rate, elo = run_tournament(args.species, args.games, level=args.level, seed=args.seed, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    write_results(args.out, args.species, win_rate, elo)
+
+    n_pairs = len(args.species) * (len(args.species) - 1) // 2
+    print(f"{n_pairs * args.games} battles in {elapsed:.1f}s ({n_pairs * args.games / elapsed:.0f} battles/s)")
+    for rank, i in enumerate(np.argsort(-elo)[:5], start=1):
+        print(f"{rank}. {args.species[i]:<14} {elo[i]:.0f}")
+    print(f"Results written to {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
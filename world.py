@@ -0,0 +1,153 @@
+# Chunked, procedurally generated world
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+# Terrain codes
+TERRAIN_GRASS = 0
+TERRAIN_WATER = 1
+TERRAIN_FOREST = 2
+
+g_terrain_names = {TERRAIN_GRASS: "Grassland", TERRAIN_WATER: "Water", TERRAIN_FOREST: "Forest"}
+
+CHUNK_SIZE = 16
+CHUNK_CACHE_SIZE = 4096  # chunks kept per process (256 bytes each)
+
+# Noise octaves as (cell size in tiles, amplitude)
+g_noise_octaves = ((16, 0.5), (8, 0.3), (4, 0.2))
+
+# Noise thresholds giving roughly 20% water, 50% grass and 30% forest,
+# the same mix the old fixed 10x10 grid was drawn with
+WATER_THRESHOLD = 0.385
+FOREST_THRESHOLD = 0.575
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _hash_lattice(seed: int, octave: int, ix: np.ndarray, iy: np.ndarray) -> np.ndarray:
+    """Deterministic value in [0, 1) for each integer lattice point (splitmix64-style mixing)."""
+    h = (ix.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+         ^ iy.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+         ^ np.uint64((seed * 0x165667B19E3779F9 + octave * 0x27D4EB2F165667C5) & 0xFFFFFFFFFFFFFFFF))
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9) & _MASK64
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB) & _MASK64
+    h = h ^ (h >> np.uint64(31))
+    return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def terrain_noise(seed: int, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Smooth fractal value noise in [0, 1) at integer world coordinates."""
+    total = np.zeros(np.broadcast(xs, ys).shape)
+    for octave, (cell, amplitude) in enumerate(g_noise_octaves):
+        ix, fx = np.divmod(xs, cell)
+        iy, fy = np.divmod(ys, cell)
+        # Smoothstep interpolation between the four surrounding lattice values
+        u = (fx / cell) ** 2 * (3 - 2 * fx / cell)
+        v = (fy / cell) ** 2 * (3 - 2 * fy / cell)
+        top = _hash_lattice(seed, octave, ix, iy) * (1 - u) + _hash_lattice(seed, octave, ix + 1, iy) * u
+        bottom = _hash_lattice(seed, octave, ix, iy + 1) * (1 - u) + _hash_lattice(seed, octave, ix + 1, iy + 1) * u
+        total += amplitude * (top * (1 - v) + bottom * v)
+    return total
+
+
+def generate_terrain(seed: int, x0: int, y0: int, width: int, height: int) -> np.ndarray:
+    """Procedural terrain codes of a rectangle, indexed [y, x] (uncached)."""
+    ys, xs = np.mgrid[y0:y0 + height, x0:x0 + width]
+    noise = terrain_noise(seed, xs, ys)
+    terrain = np.full(noise.shape, TERRAIN_GRASS, dtype=np.uint8)
+    terrain[noise < WATER_THRESHOLD] = TERRAIN_WATER
+    terrain[noise >= FOREST_THRESHOLD] = TERRAIN_FOREST
+    return terrain
+
+
+# On-disk terrain stores by seed; their tiles take precedence over generated terrain
+g_terrain_stores = {}
+
+
+def attach_terrain_store(store):
+    """Serve chunks of `store.seed` from an on-disk store (see terrain_store.py) where it has them."""
+    if g_terrain_stores.get(store.seed) is store:
+        return
+    g_terrain_stores[store.seed] = store
+    get_chunk.cache_clear()
+    render_chunk_rows.cache_clear()
+
+
+@lru_cache(maxsize=CHUNK_CACHE_SIZE)
+def get_chunk(seed: int, cx: int, cy: int) -> np.ndarray:
+    """Terrain codes of one chunk, indexed [y, x]. Cached per process and shared, so read-only."""
+    store = g_terrain_stores.get(seed)
+    if store is not None and store.contains(cx * CHUNK_SIZE, cy * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE):
+        chunk = np.array(store.region(cx * CHUNK_SIZE, cy * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE))
+    else:
+        chunk = generate_terrain(seed, cx * CHUNK_SIZE, cy * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+        if store is not None:
+            store.overlay(chunk, cx * CHUNK_SIZE, cy * CHUNK_SIZE)  # chunk straddles the store's edge
+    chunk.setflags(write=False)
+    return chunk
+
+
+def chunk_coords(x: int, y: int) -> Tuple[int, int, int, int]:
+    """(chunk x, chunk y, x within chunk, y within chunk) for a world position."""
+    cx, lx = divmod(x, CHUNK_SIZE)
+    cy, ly = divmod(y, CHUNK_SIZE)
+    return cx, cy, lx, ly
+
+
+def terrain_at(seed: int, x: int, y: int) -> int:
+    cx, cy, lx, ly = chunk_coords(x, y)
+    return int(get_chunk(seed, cx, cy)[ly, lx])
+
+
+def get_region(seed: int, x0: int, y0: int, width: int, height: int) -> np.ndarray:
+    """Terrain codes of a rectangle of the world, indexed [y, x], stitched from cached chunks."""
+    region = np.empty((height, width), dtype=np.uint8)
+    cx0, cy0, _, _ = chunk_coords(x0, y0)
+    cx1, cy1, _, _ = chunk_coords(x0 + width - 1, y0 + height - 1)
+    for cy in range(cy0, cy1 + 1):
+        for cx in range(cx0, cx1 + 1):
+            # Overlap of this chunk with the region, in world coordinates
+            left, right = max(x0, cx * CHUNK_SIZE), min(x0 + width, (cx + 1) * CHUNK_SIZE)
+            top, bottom = max(y0, cy * CHUNK_SIZE), min(y0 + height, (cy + 1) * CHUNK_SIZE)
+            region[top - y0:bottom - y0, left - x0:right - x0] = get_chunk(seed, cx, cy)[
+                top - cy * CHUNK_SIZE:bottom - cy * CHUNK_SIZE, left - cx * CHUNK_SIZE:right - cx * CHUNK_SIZE]
+    return region
+
+
+# Map symbols by terrain code; each is a single code point so rendered rows can be sliced by tile
+g_terrain_symbols = np.array(["🟩", "🟦", "🌲"])
+PLAYER_SYMBOL = "🧍"
+assert all(len(s) == 1 for s in g_terrain_symbols) and len(PLAYER_SYMBOL) == 1
+
+
+@lru_cache(maxsize=CHUNK_CACHE_SIZE)
+def render_chunk_rows(seed: int, cx: int, cy: int) -> Tuple[str, ...]:
+    """Text rows of one chunk (tiles separated by spaces), rendered once with a single lookup pass."""
+    symbols = np.take(g_terrain_symbols, get_chunk(seed, cx, cy))
+    return tuple(" ".join(row) for row in symbols.tolist())
+
+
+def render_viewport(seed: int, x: int, y: int, radius: int) -> str:
+    """The square window of the map centered on (x, y), with the player drawn in the middle.
+
+    Rows are sliced out of cached chunk renders, so the cost depends only on the
+    window size, never on how much of the world has been generated.
+    """
+    x0, y0, size = x - radius, y - radius, 2 * radius + 1
+    cx0, _, lx0, _ = chunk_coords(x0, y0)
+    cx1, _, lx1, _ = chunk_coords(x0 + size - 1, y0)
+
+    rows = []
+    for world_y in range(y0, y0 + size):
+        cy, ly = divmod(world_y, CHUNK_SIZE)
+        pieces = []
+        for cx in range(cx0, cx1 + 1):
+            first = lx0 if cx == cx0 else 0
+            last = lx1 if cx == cx1 else CHUNK_SIZE - 1
+            pieces.append(render_chunk_rows(seed, cx, cy)[ly][2 * first:2 * last + 1])
+        rows.append(" ".join(pieces))
+
+    center = rows[radius]
+    rows[radius] = center[:2 * radius] + PLAYER_SYMBOL + center[2 * radius + 1:]
+    return "\n".join(rows)